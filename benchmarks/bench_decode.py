@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Compares the installed JSON decoders on realistically shaped payloads.
+
+Run with ``python -m benchmarks.bench_decode``.
+"""
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+
+from blaser.decoders import available_decoders
+
+from benchmarks.payloads import build
+
+
+def time_decoder(decoder, body: bytes, repeat: int) -> float:
+    """Returns the median seconds taken to decode body."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        decoder(body)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def trace_decoder(decoder, body: bytes) -> tuple:
+    """
+    Traces the memory of decoding body once.
+
+    Returns:
+      A tuple of (peak bytes, blocks allocated for the result).
+    """
+    tracemalloc.start()
+    try:
+        result = decoder(body)
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak, sum(stat.count for stat in snapshot.statistics("filename"))
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--scale", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    decoders = available_decoders()
+    payloads = {
+        name: json.dumps(records).encode("utf-8")
+        for name, records in build(scale=args.scale).items()
+    }
+    header = f"{'payload':<12} {'size':>10}" + "".join(
+        f" {name:>12}" for name in decoders
+    )
+    print(header)
+    print("-" * len(header))
+    for name, body in payloads.items():
+        row = f"{name:<12} {len(body):>10,}"
+        baseline = None
+        for decoder in decoders.values():
+            seconds = time_decoder(decoder, body, args.repeat)
+            baseline = baseline or seconds
+            row += f" {seconds * 1000:>7.2f}ms{baseline / seconds:>3.0f}x"
+        print(row)
+
+    print()
+    header = f"{'peak KiB/blocks':<23}" + "".join(f" {name:>12}" for name in decoders)
+    print(header)
+    print("-" * len(header))
+    for name, body in payloads.items():
+        row = f"{name:<23}"
+        for decoder in decoders.values():
+            peak, blocks = trace_decoder(decoder, body)
+            row += f" {f'{peak / 1024:.0f}/{blocks}':>12}"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
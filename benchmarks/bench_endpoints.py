@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Measures every client endpoint against a local stub server.
+
+Run with ``python -m benchmarks.bench_endpoints``. Results can be saved with
+--output and compared with a run of an earlier release with --compare.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import time
+import tracemalloc
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from blaser.blaseball_api import BlaseballAPI, BlaseballReferenceAPI
+from blaser.__version__ import __version__
+from blaser.cache import ResponseCache
+
+from benchmarks import stub_server
+
+ID = "3f8bbb15-61c0-4e3f-8e4a-907a5fb1565e"
+IDS = [ID] * 9
+
+# (client, method, args, kwargs) for every endpoint benchmarked.
+ENDPOINTS = [
+    ("main", "get_league_info", (ID,), {}),
+    ("main", "get_subleague_info", (ID,), {}),
+    ("main", "get_division_info", (ID,), {}),
+    ("main", "get_team_info", (ID,), {}),
+    ("main", "get_player_info", (IDS,), {}),
+    ("main", "get_season_info", (7,), {}),
+    ("main", "get_game_by_date", (7, 1), {}),
+    ("main", "get_game_by_id", (ID,), {}),
+    ("main", "get_playoff_details", (7,), {}),
+    ("main", "get_playoff_round_details", (ID,), {}),
+    ("main", "get_playoff_matchups", (IDS,), {}),
+    ("main", "get_simulation_data", (), {}),
+    ("main", "list_idol_leaderboard", (), {}),
+    ("main", "list_hall_of_flame", (), {}),
+    ("main", "list_all_divisions", (), {}),
+    ("main", "list_all_teams", (), {}),
+    ("main", "list_global_events", (), {}),
+    ("main", "get_standings", (ID,), {}),
+    ("main", "get_tiebreakers", (ID,), {}),
+    ("main", "get_blessing_results", (IDS,), {}),
+    ("main", "get_decree_results", (IDS,), {}),
+    ("main", "get_election_recap", (7,), {}),
+    ("main", "list_election_details", (), {}),
+    ("main", "get_season_statsheets", (ID,), {}),
+    ("main", "get_game_statsheets", (ID,), {}),
+    ("main", "get_team_statsheets", (IDS,), {}),
+    ("main", "get_player_statsheets", (ID,), {}),
+    ("reference", "get_raw_data", (7,), {}),
+    ("reference", "get_game_events", (), {}),
+    ("reference", "count_by_type", ("HOME_RUN", "batter", ID), {}),
+    ("reference", "list_deceased_players", (), {}),
+    ("reference", "list_player_ids_by_name", ("Jessica Telephone",), {}),
+    ("reference", "get_player_info", (), {}),
+    ("reference", "list_tagged_players", (), {}),
+    ("reference", "list_all_players", (), {}),
+    ("reference", "list_all_players_for_gameday", (7, 1), {}),
+    ("reference", "get_current_roster", (ID,), {}),
+    ("reference", "list_all_teams", (), {}),
+    ("reference", "list_team_stars", (), {}),
+    ("reference", "get_season_leaders", (7, "batting", "batting_average"), {}),
+    ("reference", "get_player_stats", ("batting", IDS), {}),
+]
+MODES = ("sync", "cached", "models", "async")
+
+
+class Result(NamedTuple):
+    """
+    The measurements for one endpoint in one client mode.
+
+    Attributes:
+      endpoint: The client and method name, e.g. "main.list_all_teams"
+      mode: The client mode
+      calls: The number of timed calls
+      p50: The median latency in milliseconds
+      p95: The 95th percentile latency in milliseconds
+      p99: The 99th percentile latency in milliseconds
+      throughput: Calls completed per second, one at a time
+      allocated: The KiB allocated during a single call at its peak
+      retained: The KiB still allocated after a call, mostly the result
+      blocks: The number of memory blocks still allocated after a call
+    """
+
+    endpoint: str
+    mode: str
+    calls: int
+    p50: float
+    p95: float
+    p99: float
+    throughput: float
+    allocated: float
+    retained: float
+    blocks: int = 0
+
+
+def percentile(timings: List[float], pct: float) -> float:
+    """Returns the nearest-rank percentile of a list of numbers."""
+    ordered = sorted(timings)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def make_clients(mode: str, server: stub_server.StubServer) -> Dict[str, object]:
+    """Builds a main and a reference client pointed at the stub server."""
+    if mode == "async":
+        from blaser.async_api import AsyncBlaseballAPI, AsyncBlaseballReferenceAPI
+
+        main, reference = AsyncBlaseballAPI, AsyncBlaseballReferenceAPI
+    else:
+        main, reference = BlaseballAPI, BlaseballReferenceAPI
+    options = {"limiter": False, "models": mode == "models"}
+    clients = {}
+    for name, cls, url in (
+        ("main", main, server.base_url),
+        ("reference", reference, server.reference_url),
+    ):
+        if mode == "cached":
+            options["cache"] = ResponseCache()
+        client = cls(**options)
+        client.base_url = url
+        clients[name] = client
+    return clients
+
+
+def measure(call: Callable[[], object], repeat: int) -> tuple:
+    """
+    Times repeat calls, then traces the memory of one more.
+
+    Returns:
+      A tuple of (latencies in seconds, peak bytes, retained bytes, retained
+          blocks).
+    """
+    call()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        result = call()
+        retained, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        blocks = sum(stat.count for stat in snapshot.statistics("filename"))
+    finally:
+        tracemalloc.stop()
+    del result
+    return timings, peak, retained, blocks
+
+
+def run_endpoints(
+    server: stub_server.StubServer, mode: str, repeat: int, only: Optional[str]
+) -> List[Result]:
+    clients = make_clients(mode, server)
+    loop = asyncio.new_event_loop() if mode == "async" else None
+    results = []
+    try:
+        for client_name, method, args, kwargs in ENDPOINTS:
+            endpoint = f"{client_name}.{method}"
+            if only and only not in endpoint:
+                continue
+            fn = getattr(clients[client_name], method)
+            if loop is None:
+
+                def call():
+                    return fn(*args, **kwargs)
+
+            else:
+
+                def call():
+                    return loop.run_until_complete(fn(*args, **kwargs))
+
+            timings, peak, retained, blocks = measure(call, repeat)
+            results.append(
+                Result(
+                    endpoint,
+                    mode,
+                    repeat,
+                    percentile(timings, 50) * 1000,
+                    percentile(timings, 95) * 1000,
+                    percentile(timings, 99) * 1000,
+                    len(timings) / sum(timings),
+                    peak / 1024,
+                    retained / 1024,
+                    blocks,
+                )
+            )
+    finally:
+        if loop is not None:
+            for client in clients.values():
+                loop.run_until_complete(client.close())
+            loop.close()
+    return results
+
+
+def run_stream(
+    server: stub_server.StubServer, mode: str, repeat: int
+) -> List[Result]:
+    """Times reading every event the stub sends, as snapshots and as deltas."""
+    count = len(server.events)
+    results = []
+    for delta in (False, True):
+        if mode == "async":
+            from blaser.async_api import AsyncBlaseballAPI
+
+            api = AsyncBlaseballAPI(limiter=False)
+            api.base_url = server.base_url
+            loop = asyncio.new_event_loop()
+
+            async def consume():
+                received = []
+                async for event in api.stream_data(delta=delta):
+                    received.append(event)
+                    if len(received) == count:
+                        break
+                return received
+
+            def call():
+                return loop.run_until_complete(consume())
+
+        else:
+            api = BlaseballAPI(limiter=False, models=mode == "models")
+            api.base_url = server.base_url
+            loop = None
+
+            def call():
+                received = []
+                for event in api.stream_data(delta=delta):
+                    received.append(event)
+                    if len(received) == count:
+                        break
+                return received
+
+        try:
+            timings, peak, retained, blocks = measure(call, repeat)
+        finally:
+            if loop is not None:
+                loop.run_until_complete(api.close())
+                loop.close()
+        per_event = [t / count for t in timings]
+        results.append(
+            Result(
+                "main.stream_data" + ("(delta)" if delta else ""),
+                mode,
+                repeat * count,
+                percentile(per_event, 50) * 1000,
+                percentile(per_event, 95) * 1000,
+                percentile(per_event, 99) * 1000,
+                count * len(timings) / sum(timings),
+                peak / 1024,
+                retained / 1024,
+                blocks,
+            )
+        )
+    return results
+
+
+def print_results(results: List[Result], baseline: Optional[dict] = None) -> None:
+    header = (
+        f"{'endpoint':<42} {'mode':<7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+        f" {'req/s':>8} {'alloc KiB':>10} {'kept KiB':>9} {'blocks':>7}"
+    )
+    if baseline:
+        header += f" {'p50 vs base':>11}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        row = (
+            f"{r.endpoint:<42} {r.mode:<7} {r.p50:>8.2f} {r.p95:>8.2f} {r.p99:>8.2f}"
+            f" {r.throughput:>8.0f} {r.allocated:>10.0f} {r.retained:>9.0f}"
+            f" {r.blocks:>7}"
+        )
+        if baseline:
+            old = baseline.get((r.endpoint, r.mode))
+            row += f" {(r.p50 / old - 1) * 100:>+10.0f}%" if old else f" {'-':>11}"
+        print(row)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--only", help="only run endpoints containing this string")
+    parser.add_argument(
+        "--recordings", help="a directory of recorded responses to serve instead"
+    )
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="a JSON file from an earlier --output")
+    args = parser.parse_args(argv)
+
+    routes = stub_server.synthetic_routes(scale=args.scale)
+    if args.recordings:
+        routes = stub_server.load_recordings(args.recordings, routes)
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = {
+                (r["endpoint"], r["mode"]): r["p50"] for r in json.load(f)["results"]
+            }
+
+    results = []
+    with stub_server.StubServer(routes) as server:
+        for mode in args.modes:
+            if mode == "async":
+                try:
+                    import aiohttp  # noqa: F401
+                except ImportError:
+                    print("Skipping async mode: aiohttp is not installed.")
+                    continue
+            results.extend(run_endpoints(server, mode, args.repeat, args.only))
+            if not args.only or args.only in "main.stream_data":
+                results.extend(run_stream(server, mode, max(1, args.repeat // 10)))
+    print_results(results, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": __version__,
+                    "python": platform.python_version(),
+                    "repeat": args.repeat,
+                    "scale": args.scale,
+                    "results": [r._asdict() for r in results],
+                },
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Checks the cold import time of blaser against the budget in import_budget.json.
+
+Run with ``python -m benchmarks.bench_import``. Exits non-zero when any module's
+median cold import is over its budget, so it can gate CI without joining the unit
+tests.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BUDGET_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "import_budget.json"
+)
+_PROBE = (
+    "import time; start = time.perf_counter(); import {module}; "
+    "print(time.perf_counter() - start)"
+)
+
+
+def cold_import(module: str) -> float:
+    """
+    Imports module in a fresh interpreter.
+
+    Args:
+        module: The dotted name of the module to import.
+    Returns:
+        The seconds the import took.
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module)],
+        stdout=subprocess.PIPE,
+        check=True,
+        universal_newlines=True,
+    )
+    return float(result.stdout)
+
+
+def load_budget(path: str = BUDGET_FILE) -> dict:
+    """Returns the per-module budgets, in milliseconds."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--budget", default=BUDGET_FILE)
+    args = parser.parse_args(argv)
+
+    over = []
+    print(f"{'module':<24} {'median':>10} {'budget':>10}")
+    print("-" * 46)
+    for module, budget in load_budget(args.budget).items():
+        median = statistics.median(cold_import(module) for _ in range(args.repeat))
+        millis = median * 1000
+        flag = "" if millis <= budget else "  OVER"
+        print(f"{module:<24} {millis:>8.2f}ms {budget:>8}ms{flag}")
+        if flag:
+            over.append(module)
+    if over:
+        sys.exit(f"import budget exceeded: {', '.join(over)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Measures bulk statsheet loading with different numbers of decoding processes.
+
+Run with ``python -m benchmarks.bench_statsheets``. The stub answers every chunk
+with the same synthetic statsheets, so the numbers show how decoding throughput
+scales with the process count rather than anything about the network.
+"""
+import argparse
+import time
+
+from blaser.blaseball_api import BlaseballAPI
+from blaser.statsheets import StatsheetLoader
+
+from benchmarks import stub_server
+
+
+def run(server: stub_server.StubServer, processes: int, chunks: int) -> tuple:
+    """
+    Loads chunks chunks of player statsheets once to warm up, then times it.
+
+    Returns:
+      A tuple of (seconds, rows loaded).
+    """
+    api = BlaseballAPI(limiter=False, chunk_size=1)
+    api.base_url = server.base_url
+    ids = [f"sheet-{n}" for n in range(chunks)]
+    with StatsheetLoader(api, processes=processes) as loader:
+        loader.players(ids[: max(1, processes)])
+        start = time.perf_counter()
+        table = loader.players(ids)
+        return time.perf_counter() - start, len(table.rows)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=64)
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--processes", type=int, nargs="+", default=[0, 1, 2, 4])
+    args = parser.parse_args(argv)
+
+    routes = stub_server.synthetic_routes(scale=args.scale)
+    print(f"{'processes':>9} {'seconds':>8} {'rows/s':>10}")
+    with stub_server.StubServer(routes) as server:
+        for processes in args.processes:
+            seconds, rows = run(server, processes, args.chunks)
+            print(f"{processes:>9} {seconds:>8.3f} {rows / seconds:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Synthetic payloads shaped like real API responses, for benchmarks.
+
+Every generator is seeded so repeated runs (and different releases) are compared
+on identical data.
+"""
+import random
+import uuid
+from typing import Dict, List
+
+PLAYER_ATTRIBUTES = (
+    "anticapitalism",
+    "baseThirst",
+    "buoyancy",
+    "chasiness",
+    "coldness",
+    "continuation",
+    "divinity",
+    "groundFriction",
+    "indulgence",
+    "laserlikeness",
+    "martyrdom",
+    "moxie",
+    "musclitude",
+    "omniscience",
+    "overpowerment",
+    "patheticism",
+    "ruthlessness",
+    "shakespearianism",
+    "suppression",
+    "tenaciousness",
+    "thwackability",
+    "tragicness",
+    "unthwackability",
+    "watchfulness",
+    "pressurization",
+    "cinnamon",
+)
+EVENT_TYPES = ("OUT", "STRIKEOUT", "SINGLE", "DOUBLE", "TRIPLE", "HOME_RUN", "WALK")
+
+
+def _id(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def player(rng: random.Random) -> dict:
+    """A database/players entry."""
+    data = {
+        "id": _id(rng),
+        "name": f"Player {rng.randrange(10 ** 6)}",
+        "leagueTeamId": _id(rng),
+        "tournamentTeamId": None,
+        "deceased": rng.random() < 0.05,
+        "peanutAllergy": rng.random() < 0.3,
+        "totalFingers": 10,
+        "soul": rng.randrange(1, 10),
+        "fate": rng.randrange(100),
+        "bat": "",
+        "armor": "",
+        "ritual": "Yoga",
+        "coffee": rng.randrange(10),
+        "blood": rng.randrange(10),
+        "permAttr": rng.sample(["SHELLED", "SIPHON", "FLINCH", "ALTERNATE"], 1),
+        "seasAttr": [],
+        "weekAttr": [],
+        "gameAttr": [],
+    }
+    for name in PLAYER_ATTRIBUTES:
+        data[name] = rng.random()
+    return data
+
+
+def reference_player(rng: random.Random) -> dict:
+    """An allPlayers row from the reference API."""
+    data = {
+        "player_id": _id(rng),
+        "player_name": f"Player {rng.randrange(10 ** 6)}",
+        "team_id": _id(rng),
+        "team": "Tacos",
+        "deceased": False,
+        "valid_from": "2020-09-01T00:00:00Z",
+        "valid_until": None,
+        "batting_rating": rng.random(),
+        "pitching_rating": rng.random(),
+        "baserunning_rating": rng.random(),
+        "defense_rating": rng.random(),
+    }
+    for name in PLAYER_ATTRIBUTES:
+        data[name] = rng.random()
+    return data
+
+
+def team(rng: random.Random) -> dict:
+    """A database/team entry."""
+    return {
+        "id": _id(rng),
+        "fullName": "Los Angeles Tacos",
+        "location": "Los Angeles",
+        "nickname": "Tacos",
+        "shorthand": "LAT",
+        "slogan": "Taco Tuesday",
+        "emoji": "0x1F32E",
+        "mainColor": "#64376e",
+        "secondaryColor": "#a07aa8",
+        "lineup": [_id(rng) for _ in range(9)],
+        "rotation": [_id(rng) for _ in range(5)],
+        "bullpen": [_id(rng) for _ in range(11)],
+        "bench": [_id(rng) for _ in range(3)],
+        "permAttr": [],
+        "seasAttr": [],
+        "weekAttr": [],
+        "gameAttr": [],
+        "championships": rng.randrange(3),
+        "totalShames": rng.randrange(30),
+        "totalShamings": rng.randrange(30),
+        "seasonShames": 0,
+        "seasonShamings": 0,
+    }
+
+
+def game(rng: random.Random, season: int = 7, day: int = 0) -> dict:
+    """A database/games entry."""
+    return {
+        "id": _id(rng),
+        "season": season,
+        "day": day,
+        "phase": 6,
+        "gameComplete": True,
+        "finalized": True,
+        "isPostseason": False,
+        "inning": 8,
+        "topOfInning": False,
+        "halfInningOuts": 0,
+        "atBatBalls": 0,
+        "atBatStrikes": 0,
+        "lastUpdate": "Game over.",
+        "statsheet": _id(rng),
+        "weather": rng.randrange(20),
+        "homeTeam": _id(rng),
+        "homeTeamName": "Hellmouth Sunbeams",
+        "homeTeamNickname": "Sunbeams",
+        "homeScore": rng.randrange(12),
+        "homeOdds": rng.random(),
+        "homePitcher": _id(rng),
+        "homePitcherName": "Pitcher",
+        "awayTeam": _id(rng),
+        "awayTeamName": "Hades Tigers",
+        "awayTeamNickname": "Tigers",
+        "awayScore": rng.randrange(12),
+        "awayOdds": rng.random(),
+        "awayPitcher": _id(rng),
+        "awayPitcherName": "Pitcher",
+        "basesOccupied": [],
+        "baseRunners": [],
+        "baseRunnerNames": [],
+        "outcomes": [],
+    }
+
+
+def event(rng: random.Random, season: int = 7) -> dict:
+    """A game event row from the reference API."""
+    event_type = rng.choice(EVENT_TYPES)
+    return {
+        "id": rng.randrange(10 ** 9),
+        "game_id": _id(rng),
+        "season": season,
+        "day": rng.randrange(99),
+        "event_type": event_type,
+        "event_index": rng.randrange(300),
+        "inning": rng.randrange(9),
+        "top_of_inning": rng.random() < 0.5,
+        "outs_before_play": rng.randrange(3),
+        "batter_id": _id(rng),
+        "batter_team_id": _id(rng),
+        "pitcher_id": _id(rng),
+        "pitcher_team_id": _id(rng),
+        "home_score": rng.randrange(10),
+        "away_score": rng.randrange(10),
+        "pitches": [rng.choice("SBFX") for _ in range(rng.randrange(1, 7))],
+        "total_strikes": rng.randrange(3),
+        "total_balls": rng.randrange(4),
+        "outs_on_play": 1 if event_type in ("OUT", "STRIKEOUT") else 0,
+        "runs_batted_in": 1 if event_type == "HOME_RUN" else 0,
+        "is_double_play": False,
+        "batted_ball_type": rng.choice(["GROUNDER", "FLY", None]),
+        "event_text": ["Batter hits a ground out to Fielder."],
+        "base_runners": [],
+    }
+
+
+def statsheet(rng: random.Random) -> dict:
+    """A database/playerStatsheets entry."""
+    return {
+        "id": _id(rng),
+        "playerId": _id(rng),
+        "teamId": _id(rng),
+        "team": "Tigers",
+        "name": f"Player {rng.randrange(10 ** 6)}",
+        "atBats": rng.randrange(6),
+        "caughtStealing": 0,
+        "doubles": rng.randrange(2),
+        "earnedRuns": rng.randrange(5),
+        "groundIntoDp": 0,
+        "hits": rng.randrange(4),
+        "hitsAllowed": rng.randrange(10),
+        "homeRuns": rng.randrange(2),
+        "losses": 0,
+        "outsRecorded": rng.randrange(27),
+        "rbis": rng.randrange(4),
+        "runs": rng.randrange(3),
+        "stolenBases": 0,
+        "strikeouts": rng.randrange(10),
+        "struckouts": rng.randrange(3),
+        "triples": 0,
+        "walks": rng.randrange(3),
+        "walksIssued": rng.randrange(5),
+        "wins": 0,
+        "hitByPitch": 0,
+        "hitBatters": 0,
+        "quadruples": 0,
+        "pitchesThrown": rng.randrange(120),
+    }
+
+
+def build(seed: int = 8, scale: float = 1.0) -> Dict[str, List[dict]]:
+    """
+    Builds one payload per response shape.
+
+    Args:
+      seed: The random seed
+      scale: A multiplier for the number of records in each payload
+    Returns:
+      A dict mapping payload names to lists of records.
+    """
+    rng = random.Random(seed)
+
+    def count(n: int) -> int:
+        return max(1, int(n * scale))
+
+    return {
+        "players": [player(rng) for _ in range(count(1000))],
+        "all_players": [reference_player(rng) for _ in range(count(4000))],
+        "teams": [team(rng) for _ in range(count(40))],
+        "games": [game(rng) for _ in range(count(12))],
+        "events": [event(rng) for _ in range(count(20000))],
+        "statsheets": [statsheet(rng) for _ in range(count(500))],
+    }
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+A local HTTP server that replays canned responses for every API endpoint.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from benchmarks import payloads
+
+STREAM_PATH = "/database/streamData"
+
+# URL path served for each client method; paths ending in "/" match any suffix.
+MAIN_PATHS = {
+    "get_league_info": "/database/league",
+    "get_subleague_info": "/database/subleague",
+    "get_division_info": "/database/division",
+    "get_team_info": "/database/team",
+    "get_player_info": "/database/players",
+    "get_season_info": "/database/season",
+    "get_game_by_date": "/database/games",
+    "get_game_by_id": "/database/gameById/",
+    "get_playoff_details": "/database/playoffs",
+    "get_playoff_round_details": "/database/playoffRound",
+    "get_playoff_matchups": "/database/playoffMatchups",
+    "get_simulation_data": "/database/simulationData",
+    "list_idol_leaderboard": "/api/getIdols",
+    "list_hall_of_flame": "/api/getTribute",
+    "list_all_divisions": "/database/allDivisions",
+    "list_all_teams": "/database/allTeams",
+    "list_global_events": "/database/globalEvents",
+    "get_standings": "/database/standings",
+    "get_tiebreakers": "/database/tiebreakers",
+    "get_blessing_results": "/database/bonusResults",
+    "get_decree_results": "/database/decreeResults",
+    "get_election_recap": "/database/offseasonRecap",
+    "list_election_details": "/database/offseasonSetup",
+    "get_season_statsheets": "/database/seasonStatSheets",
+    "get_game_statsheets": "/database/gameStatSheet",
+    "get_team_statsheets": "/database/teamStatSheets",
+    "get_player_statsheets": "/database/playerSeasonStats",
+}
+REFERENCE_PATHS = {
+    "get_raw_data": "/v1/data/events",
+    "get_game_events": "/v1/events",
+    "count_by_type": "/v1/countByType",
+    "list_deceased_players": "/v1/deceased",
+    "list_player_ids_by_name": "/v1/playerIdsByName",
+    "get_player_info": "/v1/playerInfo",
+    "list_tagged_players": "/v1/taggedPlayers",
+    "list_all_players": "/v1/allPlayers",
+    "list_all_players_for_gameday": "/v1/allPlayersForGameday",
+    "get_current_roster": "/v1/currentRoster",
+    "list_all_teams": "/v1/allTeams",
+    "list_team_stars": "/v1/allTeamStars",
+    "get_season_leaders": "/v1/seasonLeaders",
+    "get_player_stats": "/v1/playerStats",
+}
+
+
+def synthetic_routes(seed: int = 8, scale: float = 1.0) -> Dict[str, object]:
+    """
+    Builds a decoded response for every endpoint from the synthetic payloads.
+
+    Args:
+      seed: The random seed
+      scale: A multiplier for the size of list responses
+    Returns:
+      A dict mapping URL paths to decoded bodies.
+    """
+    data = payloads.build(seed=seed, scale=scale)
+    players, teams, games = data["players"], data["teams"], data["games"]
+    one = {"id": teams[0]["id"], "name": "The Wild High", "teams": []}
+    routes = {path: one for path in MAIN_PATHS.values()}
+    routes.update(
+        {
+            "/database/team": teams[0],
+            "/database/players": players[:9],
+            "/database/games": games,
+            "/database/gameById/": games[0],
+            "/database/allTeams": teams,
+            "/database/allDivisions": [one] * 4,
+            "/database/simulationData": {"id": "thisidisstaticyo", "day": 43},
+            "/database/globalEvents": [{"id": "1", "msg": "BLASEBALL"}] * 5,
+            "/database/playerSeasonStats": data["statsheets"],
+            "/database/teamStatSheets": data["statsheets"][:2],
+            "/database/gameStatSheet": data["statsheets"][:2],
+            "/api/getIdols": [{"playerId": p["id"], "total": 10} for p in players[:20]],
+            "/api/getTribute": [{"playerId": p["id"], "peanuts": 5} for p in players],
+        }
+    )
+    rows = data["all_players"]
+    leaders = [
+        {"player_id": r["player_id"], "player_name": r["player_name"], "value": n}
+        for n, r in enumerate(rows[:10])
+    ]
+    routes.update({path: rows[:10] for path in REFERENCE_PATHS.values()})
+    routes.update(
+        {
+            "/v1/data/events": data["events"],
+            "/v1/events": {"count": len(data["events"]), "results": data["events"]},
+            "/v1/allPlayers": rows,
+            "/v1/allPlayersForGameday": rows,
+            "/v1/deceased": rows[:50],
+            "/v1/allTeams": teams,
+            "/v1/seasonLeaders": leaders,
+        }
+    )
+    return routes
+
+
+def load_recordings(directory: str, routes: Dict[str, object]) -> Dict[str, object]:
+    """
+    Replaces routes with recorded responses where available.
+
+    A recording for a path such as /database/allTeams is read from
+        <directory>/database/allTeams.json.
+
+    Args:
+      directory: A string specifying the directory holding the recordings
+      routes: A dict mapping URL paths to decoded bodies
+    Returns:
+      A new dict of routes.
+    """
+    routes = dict(routes)
+    for path in routes:
+        filename = os.path.join(directory, path.strip("/") + ".json")
+        if os.path.isfile(filename):
+            with open(filename, "r", encoding="utf-8") as f:
+                routes[path] = json.load(f)
+    return routes
+
+
+def stream_events(count: int = 20, seed: int = 8) -> List[dict]:
+    """Builds streamData snapshots in which one game's score changes each event."""
+    data = payloads.build(seed=seed, scale=0.05)
+    events = []
+    schedule = data["games"]
+    for index in range(count):
+        schedule = [dict(g) for g in schedule]
+        schedule[index % len(schedule)]["homeScore"] += 1
+        events.append(
+            {
+                "value": {
+                    "games": {"sim": {"day": 43}, "schedule": schedule},
+                    "leagues": {"teams": data["teams"], "players": data["players"]},
+                }
+            }
+        )
+    return events
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        path = urlsplit(self.path).path
+        if path == STREAM_PATH:
+            self._stream()
+            return
+        body = self.server.lookup(path)
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for event in self.server.events:
+            self.wfile.write(b"data: " + event + b"\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+
+class StubServer:
+    """
+    Serves canned responses on a local port from a background thread.
+
+    Use as a context manager; base_url and reference_url point the clients at it.
+    """
+
+    def __init__(
+        self,
+        routes: Optional[Dict[str, object]] = None,
+        events: Optional[List[dict]] = None,
+    ) -> None:
+        """
+        Args:
+          routes: A dict mapping URL paths to decoded bodies (defaults to
+              synthetic_routes())
+          events: A list of streamData snapshots (defaults to stream_events())
+        """
+        routes = synthetic_routes() if routes is None else routes
+        self.routes = {p: json.dumps(b).encode("utf-8") for p, b in routes.items()}
+        self.prefixes = sorted(
+            (p for p in self.routes if p.endswith("/")), key=len, reverse=True
+        )
+        events = stream_events() if events is None else events
+        self.events = [json.dumps(e).encode("utf-8") for e in events]
+        self._httpd = None
+        self._thread = None
+
+    def lookup(self, path: str) -> Optional[bytes]:
+        if path in self.routes:
+            return self.routes[path]
+        for prefix in self.prefixes:
+            if path.startswith(prefix):
+                return self.routes[prefix]
+        return None
+
+    def start(self) -> "StubServer":
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.lookup = self.lookup
+        self._httpd.events = self.events
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def reference_url(self) -> str:
+        return f"{self.base_url}/v1"
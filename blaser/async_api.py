@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Asyncio counterparts to the blocking Blaseball API clients.
+
+Requires the optional ``aiohttp`` dependency (``pip install blaser[async]``).
+"""
+import asyncio
+import time
+from typing import AsyncGenerator, List, Optional, Tuple
+
+import aiohttp
+
+from blaser.blaseball_api import (
+    BlaseballAPI,
+    BlaseballReferenceAPI,
+    _merge_chunks,
+    _page_items,
+)
+from blaser.cache import cache_key
+from blaser.metrics import COALESCED, ERROR, HIT, MISS, NOT_MODIFIED
+from blaser.singleflight import AsyncSingleFlight
+from blaser.stream import AsyncSubscription
+
+DEFAULT_CONCURRENCY = 100
+
+
+def _encode_params(payload: Optional[dict]) -> Optional[List[Tuple[str, str]]]:
+    """
+    Encodes a params dict the same way requests would.
+
+    aiohttp refuses booleans and does not expand lists, so both are converted here
+        and None values are dropped.
+
+    Args:
+      payload: A dict containing the params to URL-encode into the URI (optional)
+    Returns:
+      A list of (key, value) tuples suitable for aiohttp, or None.
+    """
+    if payload is None:
+        return None
+    params = []
+    for key, value in payload.items():
+        values = value if isinstance(value, (list, tuple)) else [value]
+        for item in values:
+            if item is not None:
+                params.append((key, str(item)))
+    return params
+
+
+class _AsyncClientMixin:
+    """
+    Replaces the blocking transport of a client with a pooled aiohttp session.
+
+    Every public method of the wrapped client builds its request and returns
+        self._get(...), so overriding _get with a coroutine turns each of them into
+        an awaitable without restating the method surface.
+    """
+
+    # The aiohttp session; a plain attribute, shadowing the lazily created blocking
+    # transport of the wrapped client.
+    sess = None
+
+    @staticmethod
+    def _check_kwargs(kwargs: dict) -> None:
+        """Rejects the blocking client options that aiohttp has no use for."""
+        for name in ("transport", "limiter"):
+            if kwargs.get(name):
+                raise TypeError(
+                    "The async clients send requests through aiohttp; "
+                    f"'{name}' is only supported by the blocking clients."
+                )
+
+    def _init_async(self, concurrency: int) -> None:
+        if concurrency < 1:
+            raise ValueError("'concurrency' must be at least 1.")
+        self.concurrency = concurrency
+        self.sess = None
+        self._semaphore = None
+        self._inflight_async = AsyncSingleFlight()
+
+    def _session(self) -> aiohttp.ClientSession:
+        """Lazily creates the session so it binds to the running event loop."""
+        if self.sess is None or self.sess.closed:
+            connector = aiohttp.TCPConnector(limit=self.concurrency)
+            self.sess = aiohttp.ClientSession(connector=connector)
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self.sess
+
+    async def close(self) -> None:
+        """Closes the underlying connection pool."""
+        if self.sess is not None and not self.sess.closed:
+            await self.sess.close()
+
+    async def __aenter__(self):
+        self._session()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def _get(self, request: str, payload: Optional[dict] = None) -> dict:
+        """
+        Performs an HTTP GET request without blocking the event loop.
+
+        Identical requests (same URL and params) awaited concurrently share a single
+            network call, and every caller receives the same object.
+
+        Args:
+          request: A string containing the URI of the requested API endpoint
+          payload: A dict containing the params to URL-encode into the URI (optional)
+        Returns:
+          A dict containing the JSON output of the GET request.
+        Raises:
+          aiohttp.ClientResponseError: The server returned an error status.
+        """
+        start = time.perf_counter()
+        url = f"{self.base_url}/{request}"
+        key = cache_key(url, payload)
+        if self.cache is not None:
+            hit, value = self.cache.get(request, key)
+            if hit:
+                self._observe(request, start, HIT)
+                return value
+        data, shared = await self._inflight_async.do(
+            key, self._fetch, url, payload, request
+        )
+        if shared:
+            self._observe(request, start, COALESCED)
+        elif self.cache is not None:
+            self.cache.set(request, key, data)
+        return data
+
+    async def _fetch(
+        self, url: str, payload: Optional[dict] = None, request: Optional[str] = None
+    ) -> dict:
+        """
+        Performs the network round trip for _get.
+
+        Args:
+          url: A string containing the full URL of the request
+          payload: A dict containing the params to URL-encode into the URI (optional)
+          request: The URI relative to base_url, which names the endpoint reported to
+              the hooks (derived from url by default)
+        Returns:
+          A dict containing the JSON output of the GET request.
+        Raises:
+          aiohttp.ClientResponseError: The server returned an error status.
+        """
+        start = time.perf_counter()
+        if request is None:
+            request = url[len(self.base_url) + 1 :]
+        key = cache_key(url, payload)
+        headers, previous = self._conditional_headers(key)
+        session = self._session()
+        refetched = False
+        async with self._semaphore:
+            try:
+                while True:
+                    sent = time.perf_counter()
+                    async with session.get(
+                        url, params=_encode_params(payload), headers=headers
+                    ) as resp:
+                        ttfb = time.perf_counter() - sent
+                        status = resp.status
+                        if status == 304 and previous is not None:
+                            self._observe(
+                                request, start, NOT_MODIFIED, ttfb, status=304
+                            )
+                            data = previous
+                            break
+                        if status == 304 and not refetched:
+                            # Nothing is stored to reuse, so ask once more for the
+                            # full body.
+                            headers, refetched = self._refetch_headers(), True
+                            continue
+                        body = await resp.read()
+                        if status >= 400 or status == 304:
+                            self._observe(
+                                request, start, ERROR, ttfb, None, len(body), status
+                            )
+                            if status == 304:
+                                raise aiohttp.ClientResponseError(
+                                    resp.request_info,
+                                    resp.history,
+                                    status=status,
+                                    message="Not Modified, with no body to reuse",
+                                )
+                            resp.raise_for_status()
+                        decode_start = time.perf_counter()
+                        data = self.decode(body)
+                        decode = time.perf_counter() - decode_start
+                        self._remember_validators(key, resp.headers, data)
+                        self._observe(
+                            request, start, MISS, ttfb, decode, len(body), status
+                        )
+                        break
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                self._observe(request, start, ERROR)
+                raise
+        return data
+
+    async def _get_bytes(self, request: str, payload: Optional[dict] = None) -> bytes:
+        """
+        Performs an HTTP GET request and returns the response body undecoded.
+
+        Like the blocking version, this bypasses the response cache and validators.
+
+        Args:
+          request: A string containing the URI of the requested API endpoint
+          payload: A dict containing the params to URL-encode into the URI (optional)
+        Returns:
+          The raw JSON response body.
+        Raises:
+          aiohttp.ClientResponseError: The server returned an error status.
+        """
+        start = time.perf_counter()
+        url = f"{self.base_url}/{request}"
+        session = self._session()
+        async with self._semaphore:
+            sent = time.perf_counter()
+            try:
+                async with session.get(
+                    url, params=_encode_params(payload), headers=self.headers
+                ) as resp:
+                    ttfb = time.perf_counter() - sent
+                    body = await resp.read()
+                    cache = ERROR if resp.status >= 400 else MISS
+                    self._observe(
+                        request, start, cache, ttfb, None, len(body), resp.status
+                    )
+                    resp.raise_for_status()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                self._observe(request, start, ERROR)
+                raise
+        return body
+
+    async def _paginate(
+        self, request: str, payload: dict, page_size: int, prefetch: bool
+    ) -> AsyncGenerator[dict, None]:
+        """
+        Yields the items of a paginated endpoint, requesting it page by page.
+
+        With prefetch, the next page is requested in a task while the current one is
+            being consumed; the task is cancelled if iteration stops early.
+        """
+
+        async def fetch(offset: int) -> list:
+            params = dict(payload, limit=page_size, offset=offset)
+            return _page_items(self.decode(await self._get_bytes(request, params)))
+
+        offset = 0
+        pending = asyncio.ensure_future(fetch(offset))
+        try:
+            while pending is not None:
+                page = await pending
+                offset += page_size
+                pending = None
+                if len(page) == page_size:
+                    pending = fetch(offset)
+                    if prefetch:
+                        pending = asyncio.ensure_future(pending)
+                for item in page:
+                    yield item
+        finally:
+            if isinstance(pending, asyncio.Future):
+                pending.cancel()
+            elif pending is not None:
+                pending.close()
+
+    async def _get_many(
+        self,
+        request: str,
+        id_param: str,
+        ids: List[str],
+        payload: Optional[dict] = None,
+        id_field: str = "id",
+    ) -> list:
+        """
+        Performs GET requests against a multi-ID endpoint, gathering the chunks.
+
+        Args:
+          request: A string containing the URI of the requested API endpoint
+          id_param: The name of the param holding the comma-separated IDs
+          ids: A string or list of strings specifying the IDs to look up
+          payload: A dict containing any other params to URL-encode (optional)
+          id_field: The key holding each returned object's ID
+        Returns:
+          A list containing the requested objects.
+        """
+        if not isinstance(ids, list):
+            return await self._get(
+                request, payload=dict(payload or {}, **{id_param: ids})
+            )
+        payloads = self._chunk_payloads(id_param, ids, payload)
+        results = await asyncio.gather(*(self._get(request, p) for p in payloads))
+        return _merge_chunks(results, ids, id_field)
+
+    async def _sse(
+        self, request: str, payload: Optional[dict] = None
+    ) -> AsyncGenerator[dict, None]:
+        """
+        Subscribes to a Server Sent Event stream.
+
+        Args:
+          request: A string containing the URI of the requested API endpoint
+          payload: A dict containing the params to URL-encode into the URI (optional)
+        Yields:
+          A dict for each data event received.
+        """
+        url = f"{self.base_url}/{request}"
+        session = self._session()
+        timeout = aiohttp.ClientTimeout(total=None, sock_read=None)
+        async with session.get(
+            url,
+            params=_encode_params(payload),
+            headers={"Accept": "text/event-stream"},
+            timeout=timeout,
+        ) as resp:
+            resp.raise_for_status()
+            data = []
+            async for raw_line in resp.content:
+                line = raw_line.decode("utf-8").rstrip("\r\n")
+                if line.startswith("data:"):
+                    data.append(line[5:].lstrip(" "))
+                elif not line and data:
+                    yield self.decode("\n".join(data))
+                    data = []
+
+    def _subscribe(self) -> AsyncSubscription:
+        """
+        Subscribes to the shared stream hub from the running event loop.
+
+        The hub reads the upstream connection on a thread of its own, so a shared
+            stream_data() costs one connection however many coroutines consume it.
+        """
+        return self.stream_hub().subscribe_async()
+
+
+class AsyncBlaseballAPI(_AsyncClientMixin, BlaseballAPI):
+    """
+    Asyncio version of BlaseballAPI.
+
+    Exposes the same methods as BlaseballAPI, each as a coroutine, and
+        stream_data() as an async generator.
+    """
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY, **kwargs) -> None:
+        """
+        Interacts with the internal Blaseball API over a pooled aiohttp session.
+
+        Args:
+          concurrency: The maximum number of requests in flight at once
+          kwargs: Passed through to BlaseballAPI, except transport and limiter;
+              requests are only bounded by concurrency, never throttled or retried
+        Raises:
+          TypeError: A transport or limiter was given.
+          ValueError: concurrency is less than 1.
+        """
+        self._check_kwargs(kwargs)
+        super().__init__(**kwargs)
+        self._init_async(concurrency)
+
+
+class AsyncBlaseballReferenceAPI(_AsyncClientMixin, BlaseballReferenceAPI):
+    """
+    Asyncio version of BlaseballReferenceAPI.
+
+    Exposes the same methods as BlaseballReferenceAPI, each as a coroutine.
+    """
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY, **kwargs) -> None:
+        """
+        Interacts with the Blaseball Reference API over a pooled aiohttp session.
+
+        Args:
+          concurrency: The maximum number of requests in flight at once
+          kwargs: Passed through to BlaseballReferenceAPI, except transport and
+              limiter; requests are only bounded by concurrency, never throttled or
+              retried
+        Raises:
+          TypeError: A transport or limiter was given.
+          ValueError: concurrency is less than 1.
+        """
+        self._check_kwargs(kwargs)
+        super().__init__(**kwargs)
+        self._init_async(concurrency)
+
+    def iter_raw_data(self, season: int, key: Optional[str] = None):
+        """
+        Not available asynchronously; use get_raw_data, or the blocking client.
+
+        Raises:
+          TypeError: Always.
+        """
+        raise TypeError(
+            "iter_raw_data streams through the blocking BlaseballReferenceAPI; "
+            "await get_raw_data instead."
+        )
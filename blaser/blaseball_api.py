@@ -1,28 +1,536 @@
 #!/usr/bin/env python3
 """
 """
-# import logging
+import inspect
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Callable, Generator, List, Optional, Union
+from urllib.parse import urlparse
 
-from typing import Generator, List, Optional
+from blaser.__version__ import __title__, __version__
+from blaser.cache import LRUCache, ResponseCache, cache_key
+from blaser.decoders import Decoder, get_decoder
+from blaser.jsonstream import iter_json_items
+from blaser.metrics import (
+    COALESCED,
+    ERROR,
+    HIT,
+    MISS,
+    NOT_MODIFIED,
+    Hook,
+    RequestRecord,
+    endpoint_template,
+)
+from blaser.models import Division, Game, League, Player, Team, to_models
+from blaser.ratelimit import HostLimiter, get_limiter
+from blaser.singleflight import SingleFlight
+from blaser.stream import (
+    BLOCK,
+    POLICIES,
+    BufferedStream,
+    DeltaStream,
+    StreamHub,
+    Subscription,
+)
+from blaser.transport import (
+    DEFAULT_POOL_SIZE,
+    RequestsTransport,
+    Transport,
+    _http_error,
+)
+
+if TYPE_CHECKING:
+    from sseclient import SSEClient
+
+DEFAULT_CHUNK_SIZE = 100
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_VALIDATOR_SIZE = 256
+DEFAULT_PAGE_SIZE = 500
+
+logger = logging.getLogger(__name__)
+
+
+def _chunks(ids: List[str], size: int) -> List[List[str]]:
+    """Splits a list of IDs into consecutive chunks of at most size IDs."""
+    if not ids:
+        return [[]]
+    return [ids[i : i + size] for i in range(0, len(ids), size)]
+
+
+def _merge_chunks(results: list, ids: List[str], id_field: str) -> list:
+    """
+    Concatenates the results of chunked requests in the order the IDs were given.
+
+    Args:
+      results: A list of the decoded responses, one per chunk
+      ids: The list of requested IDs
+      id_field: The key holding each returned object's ID
+    Returns:
+      A single list of the returned objects.
+    """
+    merged = []
+    for result in results:
+        if isinstance(result, list):
+            merged.extend(result)
+        else:
+            merged.append(result)
+    position = {}
+    for index, object_id in enumerate(ids):
+        position.setdefault(object_id, index)
+    if all(isinstance(item, dict) and id_field in item for item in merged):
+        merged.sort(key=lambda item: position.get(item[id_field], len(ids)))
+    return merged
+
+
+def _page_items(page) -> list:
+    """Extracts the items of a page, whether sent bare or as {"results": [...]}."""
+    if isinstance(page, dict):
+        page = page.get("results", page.get("data"))
+    return page or []
+
+
+class _APIClient:
+    """Request plumbing shared by the API clients."""
+
+    base_url = ""
+    headers = None
+    cache = None
+    _inflight = None
+    _validators = None
+    models = False
+    limiter = None
+    hooks = ()
+    _hub = None
+    decode = staticmethod(get_decoder())
+    chunk_size = DEFAULT_CHUNK_SIZE
+    max_workers = DEFAULT_MAX_WORKERS
+    _sess = None
 
-import requests
-from sseclient import SSEClient
+    def __repr__(self) -> str:
+        """REPR returns the name of the class."""
+        return f"{self.__class__.__name__}"
 
-from blaser.__version__ import __title__, __version__
+    def _configure(
+        self,
+        cache: Optional[ResponseCache],
+        chunk_size: int,
+        max_workers: int,
+        models: bool,
+        limiter: Union[HostLimiter, bool, None],
+        decoder: Union[str, Decoder, None],
+        hooks: Optional[List[Hook]],
+        transport: Optional[Transport],
+        validators: int = DEFAULT_VALIDATOR_SIZE,
+    ) -> None:
+        """Sets the options shared by both clients; base_url must already be set."""
+        if validators < 0:
+            raise ValueError("'validators' must not be negative.")
+        self._sess = transport
+        self.cache = cache
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.models = models
+        if limiter is True:
+            limiter = get_limiter(urlparse(self.base_url).hostname)
+        self.limiter = limiter or None
+        self.decode = get_decoder(decoder)
+        self.hooks = list(hooks or [])
+        self._inflight = SingleFlight()
+        self._validators = LRUCache(validators) if validators else None
+
+    @property
+    def sess(self) -> Any:
+        """
+        The transport requests are sent through.
+
+        Unless one was passed in, a RequestsTransport is created on first use, so
+            that requests is only imported once something is actually sent.
+        """
+        if self._sess is None:
+            self._sess = RequestsTransport(
+                pool_size=max(DEFAULT_POOL_SIZE, self.max_workers)
+            )
+        return self._sess
+
+    @sess.setter
+    def sess(self, transport: Any) -> None:
+        self._sess = transport
+
+    def _get(self, request: str, payload: Optional[dict] = None) -> dict:
+        """
+        Performs an HTTP GET request.
+
+        If the client has a cache, responses are looked up in and stored to it
+            according to the policy for the requested endpoint. Identical requests
+            made concurrently from several threads (same URL and params) share a
+            single network call, and every caller receives the same object. Each
+            call is reported to the client's hooks.
+
+        Args:
+          request: A string containing the URI of the requested API endpoint
+          payload: A dict containing the params to URL-encode into the URI (optional)
+        Returns:
+          A dict containing the JSON output of the GET request.
+        """
+        start = time.perf_counter()
+        url = f"{self.base_url}/{request}"
+        key = cache_key(url, payload)
+        if self.cache is not None:
+            hit, value = self.cache.get(request, key)
+            if hit:
+                self._observe(request, start, HIT)
+                return value
+        if self._inflight is None:
+            data = self._fetch(url, payload, request)
+            shared = False
+        else:
+            data, shared = self._inflight.do(key, self._fetch, url, payload, request)
+        if shared:
+            self._observe(request, start, COALESCED)
+        elif self.cache is not None:
+            self.cache.set(request, key, data)
+        return data
+
+    def _fetch(
+        self, url: str, payload: Optional[dict] = None, request: Optional[str] = None
+    ) -> dict:
+        """
+        Performs the network round trip for _get.
+
+        The request is made conditional if an earlier response for the same URL and
+            params carried an ETag or Last-Modified validator; a 304 Not Modified
+            answer returns the previously decoded object without decoding anything.
 
+        Args:
+          url: A string containing the full URL of the request
+          payload: A dict containing the params to URL-encode into the URI (optional)
+          request: The URI relative to base_url, which names the endpoint reported to
+              the hooks (derived from url by default)
+        Returns:
+          A dict containing the JSON output of the GET request.
+        """
+        start = time.perf_counter()
+        if request is None:
+            request = url[len(self.base_url) + 1 :]
+        key = cache_key(url, payload)
+        headers, previous = self._conditional_headers(key)
+        try:
+            resp = self._send(url, payload, headers)
+            if resp.status_code == 304 and previous is None:
+                # Nothing is stored to reuse (it was evicted, or the validators
+                # were sent by someone else), so ask once more for the full body.
+                resp = self._send(url, payload, self._refetch_headers())
+        except Exception:
+            self._observe(request, start, ERROR)
+            raise
+        ttfb = resp.elapsed.total_seconds()
+        if resp.status_code == 304:
+            if previous is None:
+                self._observe(request, start, ERROR, ttfb, status=304)
+                raise _http_error(resp)
+            self._observe(request, start, NOT_MODIFIED, ttfb, status=304)
+            return previous
+        body = resp.content
+        if resp.ok:
+            decode_start = time.perf_counter()
+            data = self.decode(body)
+            decode = time.perf_counter() - decode_start
+            self._remember_validators(key, resp.headers, data)
+            self._observe(
+                request, start, MISS, ttfb, decode, len(body), resp.status_code
+            )
+            return data
+        else:
+            self._observe(
+                request, start, ERROR, ttfb, None, len(body), resp.status_code
+            )
+            resp.raise_for_status()
 
-class BlaseballAPI:
+    def _get_bytes(self, request: str, payload: Optional[dict] = None) -> bytes:
+        """
+        Performs an HTTP GET request and returns the response body undecoded.
+
+        This is for callers that decode elsewhere, e.g. in another process. The
+            response cache and request coalescing hold decoded objects, so both are
+            bypassed; the call is still rate limited and reported to the hooks.
+
+        Args:
+          request: A string containing the URI of the requested API endpoint
+          payload: A dict containing the params to URL-encode into the URI (optional)
+        Returns:
+          The raw JSON response body.
+        Raises:
+          requests.HTTPError: The server answered with an error status.
+        """
+        start = time.perf_counter()
+        url = f"{self.base_url}/{request}"
+        try:
+            resp = self._send(url, payload, self.headers)
+        except Exception:
+            self._observe(request, start, ERROR)
+            raise
+        body = resp.content
+        self._observe(
+            request,
+            start,
+            MISS if resp.ok else ERROR,
+            resp.elapsed.total_seconds(),
+            None,
+            len(body),
+            resp.status_code,
+        )
+        resp.raise_for_status()
+        return body
+
+    def _observe(
+        self,
+        request: str,
+        start: float,
+        cache: str,
+        ttfb: Optional[float] = None,
+        decode: Optional[float] = None,
+        size: Optional[int] = None,
+        status: Optional[int] = None,
+    ) -> None:
+        """
+        Passes a RequestRecord for a finished call to every hook.
+
+        A failing hook is logged and skipped, so metrics can never break a request.
+        """
+        if not self.hooks:
+            return
+        record = RequestRecord(
+            endpoint_template(request),
+            cache,
+            time.perf_counter() - start,
+            ttfb,
+            decode,
+            size,
+            status,
+        )
+        for hook in self.hooks:
+            try:
+                hook(record)
+            except Exception:
+                logger.exception("Request hook %r failed", hook)
+
+    def add_hook(self, hook: Hook) -> None:
+        """
+        Registers a callable to receive a blaser.metrics.RequestRecord per request.
+
+        Args:
+          hook: A callable, such as a blaser.metrics.MetricsRegistry
+        """
+        self.hooks.append(hook)
+
+    def _send(
+        self,
+        url: str,
+        payload: Optional[dict],
+        headers: Optional[dict],
+        stream: bool = False,
+    ):
+        """Sends a GET request, through the host's rate limiter if there is one."""
+
+        # Only streaming requests pass stream, so minimal transports need not take it.
+        options = {"stream": True} if stream else {}
+
+        def send():
+            return self.sess.get(url, params=payload, headers=headers, **options)
+
+        if self.limiter is None:
+            return send()
+        return self.limiter.call(send)
+
+    def _conditional_headers(self, key: str) -> tuple:
+        """
+        Builds the request headers for a key, adding any stored validators.
+
+        Returns:
+          A tuple of (headers, previously decoded object or None).
+        """
+        if self._validators is None:
+            return self.headers, None
+        found, entry, _ = self._validators.get(key)
+        if not found:
+            return self.headers, None
+        etag, last_modified, data = entry
+        headers = dict(self.headers or {})
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers, data
+
+    def _refetch_headers(self) -> dict:
+        """Builds request headers asking every cache on the way for a full body."""
+        return dict(self.headers or {}, **{"Cache-Control": "no-cache"})
+
+    def _remember_validators(self, key: str, resp_headers, data) -> None:
+        """Stores the validators of a response alongside its decoded body."""
+        if self._validators is None:
+            return
+        etag = resp_headers.get("ETag")
+        last_modified = resp_headers.get("Last-Modified")
+        if etag or last_modified:
+            self._validators.set(key, (etag, last_modified, data), None)
+
+    def _apply(self, fn, data, *args):
+        """
+        Calls fn(data, *args), awaiting data first if it is a coroutine.
+
+        This lets methods post-process the result of _get the same way whether the
+            client is blocking or asynchronous.
+        """
+        if inspect.isawaitable(data):
+            return self._apply_async(fn, data, *args)
+        return fn(data, *args)
+
+    async def _apply_async(self, fn, data, *args):
+        return fn(await data, *args)
+
+    def _as_model(self, model: type, data):
+        """Converts a response into models if the client was asked to."""
+        if not self.models:
+            return data
+        return self._apply(lambda d: to_models(model, d), data)
+
+    def _paginate(
+        self, request: str, payload: dict, page_size: int, prefetch: bool
+    ) -> Generator[dict, None, None]:
+        """
+        Yields the items of a paginated endpoint, requesting it page by page.
+
+        Pages are requested with limit and offset params until one comes back short.
+            With prefetch, the next page is requested on a background thread while
+            the current one is being consumed, so at most two pages are held at a
+            time. Pages bypass the response cache for the same reason.
+
+        Args:
+          request: A string containing the URI of the requested API endpoint
+          payload: A dict containing the other params to URL-encode into the URI
+          page_size: The number of items to request at a time
+          prefetch: If False, only request a page once the previous one is consumed
+        Yields:
+          Each item of each page.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        def fetch(offset: int) -> list:
+            params = dict(payload, limit=page_size, offset=offset)
+            return _page_items(self.decode(self._get_bytes(request, params)))
+
+        if not prefetch:
+            offset = 0
+            while True:
+                page = fetch(offset)
+                yield from page
+                if len(page) < page_size:
+                    return
+                offset += page_size
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pending, offset = pool.submit(fetch, 0), 0
+            while pending is not None:
+                page = pending.result()
+                offset += page_size
+                full = len(page) == page_size
+                pending = pool.submit(fetch, offset) if full else None
+                yield from page
+
+    def _chunk_payloads(
+        self, id_param: str, ids: List[str], payload: Optional[dict] = None
+    ) -> List[dict]:
+        """Builds one payload per chunk of IDs, each carrying the other params."""
+        return [
+            dict(payload or {}, **{id_param: ",".join(chunk)})
+            for chunk in _chunks(ids, self.chunk_size)
+        ]
+
+    def _get_many(
+        self,
+        request: str,
+        id_param: str,
+        ids: List[str],
+        payload: Optional[dict] = None,
+        id_field: str = "id",
+    ) -> list:
+        """
+        Performs GET requests against a multi-ID endpoint.
+
+        A list of IDs is split into chunks of at most chunk_size IDs to keep the URL
+            short enough, the chunks are fetched concurrently using up to max_workers
+            threads, and the results are merged in the order the IDs were given. A
+            string is passed through unchanged as a single request.
+
+        Args:
+          request: A string containing the URI of the requested API endpoint
+          id_param: The name of the param holding the comma-separated IDs
+          ids: A string or list of strings specifying the IDs to look up
+          payload: A dict containing any other params to URL-encode (optional)
+          id_field: The key holding each returned object's ID
+        Returns:
+          A list containing the requested objects.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        if not isinstance(ids, list):
+            return self._get(request, payload=dict(payload or {}, **{id_param: ids}))
+        payloads = self._chunk_payloads(id_param, ids, payload)
+        if len(payloads) == 1:
+            results = [self._get(request, payload=payloads[0])]
+        else:
+            workers = min(self.max_workers, len(payloads))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(lambda p: self._get(request, p), payloads))
+        return _merge_chunks(results, ids, id_field)
+
+
+class BlaseballAPI(_APIClient):
     """Class to interact with the internal API for IBL blaseball."""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        cache: Optional[ResponseCache] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        models: bool = False,
+        limiter: Union[HostLimiter, bool, None] = None,
+        decoder: Union[str, Decoder, None] = None,
+        hooks: Optional[List[Hook]] = None,
+        transport: Optional[Transport] = None,
+        validators: int = DEFAULT_VALIDATOR_SIZE,
+    ) -> None:
         """
         Interacts with the internal Blaseball API.
 
+        Args:
+          cache: A ResponseCache to serve repeated requests from (optional)
+          chunk_size: The maximum number of IDs sent in a single request
+          max_workers: The maximum number of chunks fetched concurrently
+          models: If True, return Player, Team, Game, Division and League objects
+              instead of dicts from the methods that fetch them
+          limiter: A HostLimiter to throttle and retry requests through, or True
+              for the one shared by all clients of the same host (see
+              blaser.ratelimit.configure_host); by default requests are sent
+              without throttling or retries
+          decoder: A callable decoding JSON from bytes, or the name of one in
+              blaser.decoders.DECODERS; by default orjson if installed, else json
+          hooks: A list of callables each passed a blaser.metrics.RequestRecord
+              after every request, e.g. a blaser.metrics.MetricsRegistry (optional)
+          transport: The blaser.transport.Transport to send requests through, which
+              may be shared with other clients; by default a RequestsTransport
+              with a pool of max(DEFAULT_POOL_SIZE, max_workers) connections
+          validators: The number of responses whose ETag or Last-Modified is kept
+              for conditional requests, or 0 to send none; each entry holds the
+              full decoded body, so large payloads such as get_raw_data or
+              allPlayers cost their whole size in memory until evicted
+
         Attributes:
           user_agent:
           headers:
           base_url:
-          sess: A requests Session() object
+          sess: The Transport requests are sent through
+          cache: The ResponseCache in use, if any
         """
         self.user_agent = f"{__title__}/{__version__}"
         self.headers = {
@@ -30,28 +538,39 @@ class BlaseballAPI:
             "User-Agent": self.user_agent,
         }
         self.base_url = "https://www.blaseball.com"
-        self.sess = requests.Session()
-
-    def __repr__(self) -> str:
-        """REPR returns the name of the class."""
-        return f"{self.__class__.__name__}"
-
-    def _get(self, request: str, payload: Optional[dict] = None) -> dict:
+        self._configure(
+            cache,
+            chunk_size,
+            max_workers,
+            models,
+            limiter,
+            decoder,
+            hooks,
+            transport,
+            validators,
+        )
+
+    def _sse_messages(
+        self,
+        request: str,
+        payload: Optional[dict] = None,
+        last_event_id: Optional[str] = None,
+    ) -> "SSEClient":
         """
-        Performs an HTTP GET request.
+        Connects to a Server Sent Event stream.
 
         Args:
           request: A string containing the URI of the requested API endpoint
           payload: A dict containing the params to URL-encode into the URI (optional)
+          last_event_id: The ID of the last event received, to resume from (optional)
         Returns:
-          A dict containing the JSON output of the GET request.
+          An SSEClient yielding messages with id and data attributes.
         """
+        from sseclient import SSEClient
+
         url = f"{self.base_url}/{request}"
-        resp = self.sess.get(url, params=payload, headers=self.headers)
-        if resp.ok:
-            return resp.json()
-        else:
-            resp.raise_for_status()
+        session = getattr(self.sess, "session", None)
+        return SSEClient(url, last_id=last_event_id, params=payload, session=session)
 
     def _sse(
         self, request: str, payload: Optional[dict] = None
@@ -63,25 +582,76 @@ class BlaseballAPI:
           request: A string containing the URI of the requested API endpoint
           payload: A dict containing the params to URL-encode into the URI (optional)
         Yields:
-          Something once this actually starts working.
+          A dict for each data event received.
         """
-        url = f"{self.base_url}/{request}"
-        messages = SSEClient(url)
-        for msg in messages:
-            yield msg.json()
+        for msg in self._sse_messages(request, payload):
+            if msg.data:
+                yield self.decode(msg.data)
 
     # Live Data
-    def stream_data(self) -> dict:
+    def stream_hub(self) -> StreamHub:
+        """
+        Returns the StreamHub sharing this client's streamData connection.
+
+        The hub is created on first use; it connects when its first subscriber
+            arrives and stays connected until closed.
+        """
+        if self._hub is None or self._hub.closed:
+            self._hub = StreamHub(
+                lambda last_event_id: self._sse_messages(
+                    "database/streamData", last_event_id=last_event_id
+                ),
+                decoder=self.decode,
+            )
+        return self._hub
+
+    def _subscribe(self) -> Subscription:
+        return self.stream_hub().subscribe()
+
+    def stream_data(
+        self,
+        delta: bool = False,
+        shared: bool = False,
+        buffer: int = 0,
+        policy: str = BLOCK,
+        key: Optional[Callable[[Any], Any]] = None,
+    ) -> dict:
         """
         Subscribes to the same datastream the API uses to power the www.blaseball.com
             site using Server-sent Events.
 
         Every few seconds a data event will be sent.
 
+        Args:
+          delta: If True, yield lists of StreamChange describing only what changed
+              since the previous event instead of full snapshots
+          shared: If True, subscribe to this client's stream_hub() instead of
+              opening a connection of its own, so that any number of consumers
+              share one upstream connection and each event is decoded once
+          buffer: If set, read events on a background thread (or task) into a
+              BufferedStream holding up to this many unread events, so a slow
+              consumer does not stall the connection
+          policy: What the buffer does when full; one of BLOCK, DROP_OLDEST or
+              COALESCE (see BufferedStream)
+          key: For COALESCE, a callable returning the key of an event; events with
+              equal keys replace each other (defaults to one key for all events)
         Returns:
+          A generator (or Subscription, if shared, or BufferedStream, if buffered)
+              of full snapshots, or a DeltaStream over it if delta is set.
+        Raises:
+          ValueError: buffer is negative or policy is unknown.
         """
         request = "database/streamData"
-        return self._sse(request)
+        if buffer < 0:
+            raise ValueError("'buffer' must not be negative.")
+        if policy not in POLICIES:
+            raise ValueError(f"'policy' must be one of {list(POLICIES)}.")
+        messages = self._subscribe() if shared else self._sse(request)
+        if buffer:
+            messages = BufferedStream(messages, buffer, policy, key)
+        if delta:
+            return DeltaStream(messages)
+        return messages
 
     # Objects
     def get_league_info(self, league_id: str) -> dict:
@@ -94,7 +664,7 @@ class BlaseballAPI:
         """
         request = "database/league"
         params = {"id": league_id}
-        return self._get(request, payload=params)
+        return self._as_model(League, self._get(request, payload=params))
 
     def get_subleague_info(self, subleague_id: str) -> dict:
         """
@@ -116,7 +686,7 @@ class BlaseballAPI:
         """
         request = "database/division"
         params = {"id": division_id}
-        return self._get(request, payload=params)
+        return self._as_model(Division, self._get(request, payload=params))
 
     def get_team_info(self, team_id: str) -> dict:
         """
@@ -129,7 +699,7 @@ class BlaseballAPI:
         """
         request = "database/team"
         params = {"id": team_id}
-        return self._get(request, params)
+        return self._as_model(Team, self._get(request, params))
 
     def get_player_info(self, player_ids: List[str]) -> dict:
         """
@@ -142,10 +712,7 @@ class BlaseballAPI:
           A dict
         """
         request = "database/players"
-        if isinstance(player_ids, list):
-            player_ids = ",".join(player_ids)
-        params = {"ids": player_ids}
-        return self._get(request, params)
+        return self._as_model(Player, self._get_many(request, "ids", player_ids))
 
     def get_season_info(self, season_number: int) -> dict:
         """
@@ -179,7 +746,7 @@ class BlaseballAPI:
         """
         request = "database/games"
         params = {"day": day - 1, "season": season - 1}
-        return self._get(request, payload=params)
+        return self._as_model(Game, self._get(request, payload=params))
 
     def get_game_by_id(self, game_id: str) -> dict:
         """
@@ -194,7 +761,7 @@ class BlaseballAPI:
         Returns:
         """
         request = f"database/gameById/{game_id}"
-        return self._get(request)
+        return self._as_model(Game, self._get(request))
 
     def get_playoff_details(self, season: int) -> dict:
         """
@@ -229,10 +796,7 @@ class BlaseballAPI:
         Returns:
         """
         request = "database/playoffMatchups"
-        if isinstance(matchup_ids, list):
-            matchup_ids = ",".join(matchup_ids)
-        params = {"ids": matchup_ids}
-        return self._get(request, params)
+        return self._get_many(request, "ids", matchup_ids)
 
     def get_simulation_data(self) -> dict:
         """
@@ -271,7 +835,7 @@ class BlaseballAPI:
         Returns:
         """
         request = "database/allDivisions"
-        return self._get(request)
+        return self._as_model(Division, self._get(request))
 
     def list_all_teams(self):
         """
@@ -280,7 +844,7 @@ class BlaseballAPI:
         Returns:
         """
         request = "database/allTeams"
-        return self._get(request)
+        return self._as_model(Team, self._get(request))
 
     def list_global_events(self):
         """
@@ -327,10 +891,7 @@ class BlaseballAPI:
           A list of dicts containing information about the requested blessings.
         """
         request = "database/bonusResults"
-        if isinstance(blessing_ids, list):
-            blessing_ids = ",".join(blessing_ids)
-        params = {"ids": blessing_ids}
-        return self._get(request, payload=params)
+        return self._get_many(request, "ids", blessing_ids)
 
     def get_decree_results(self, decree_ids: List[str]) -> List[dict]:
         """
@@ -342,10 +903,7 @@ class BlaseballAPI:
           A list of dicts containing information about the requested decrees.
         """
         request = "database/decreeResults"
-        if isinstance(decree_ids, list):
-            decree_ids = ",".join(decree_ids)
-        params = {"ids": decree_ids}
-        return self._get(request, payload=params)
+        return self._get_many(request, "ids", decree_ids)
 
     def get_election_recap(self, season: int) -> dict:
         """
@@ -413,10 +971,7 @@ class BlaseballAPI:
           A list of dicts containing the requested teams' statsheets.
         """
         request = "database/teamStatSheets"
-        if isinstance(teams, list):
-            teams = ",".join(teams)
-        params = {"ids": teams}
-        return self._get(request, payload=params)
+        return self._get_many(request, "ids", teams)
 
     def get_player_statsheets(self, players: List[str]) -> dict:
         """
@@ -435,7 +990,7 @@ class BlaseballAPI:
         return self._get(request, payload=params)
 
 
-class BlaseballReferenceAPI:
+class BlaseballReferenceAPI(_APIClient):
 
     VALID_CATEGORIES = ["batting", "pitching", "fielding", "running"]
     VALID_STATS = {
@@ -481,21 +1036,55 @@ class BlaseballReferenceAPI:
         "running": ["stolen_bases", "caught_stealing", "runs"],
     }
 
-    def __init__(self) -> None:
-        self.base_url = "https://api.blaseball-reference.com/v1"
-        self.sess = requests.Session()
-
-    def __repr__(self) -> str:
-        """"""
-        return f"{self.__class__.__name__}"
+    def __init__(
+        self,
+        cache: Optional[ResponseCache] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        models: bool = False,
+        limiter: Union[HostLimiter, bool, None] = None,
+        decoder: Union[str, Decoder, None] = None,
+        hooks: Optional[List[Hook]] = None,
+        transport: Optional[Transport] = None,
+        validators: int = DEFAULT_VALIDATOR_SIZE,
+    ) -> None:
+        """
+        Interacts with the Blaseball Reference API.
 
-    def _get(self, request: str, payload: Optional[dict] = None) -> dict:
-        url = f"{self.base_url}/{request}"
-        resp = self.sess.get(url, params=payload)
-        if resp.ok:
-            return resp.json()
-        else:
-            resp.raise_for_status()
+        Args:
+          cache: A ResponseCache to serve repeated requests from (optional)
+          chunk_size: The maximum number of IDs sent in a single request
+          max_workers: The maximum number of chunks fetched concurrently
+          models: If True, return Player, Team, Game, Division and League objects
+              instead of dicts from the methods that fetch them
+          limiter: A HostLimiter to throttle and retry requests through, or True
+              for the one shared by all clients of the same host (see
+              blaser.ratelimit.configure_host); by default requests are sent
+              without throttling or retries
+          decoder: A callable decoding JSON from bytes, or the name of one in
+              blaser.decoders.DECODERS; by default orjson if installed, else json
+          hooks: A list of callables each passed a blaser.metrics.RequestRecord
+              after every request, e.g. a blaser.metrics.MetricsRegistry (optional)
+          transport: The blaser.transport.Transport to send requests through, which
+              may be shared with other clients; by default a RequestsTransport
+              with a pool of max(DEFAULT_POOL_SIZE, max_workers) connections
+          validators: The number of responses whose ETag or Last-Modified is kept
+              for conditional requests, or 0 to send none; each entry holds the
+              full decoded body, so large payloads such as get_raw_data or
+              allPlayers cost their whole size in memory until evicted
+        """
+        self.base_url = "https://api.blaseball-reference.com/v1"
+        self._configure(
+            cache,
+            chunk_size,
+            max_workers,
+            models,
+            limiter,
+            decoder,
+            hooks,
+            transport,
+            validators,
+        )
 
     # Raw Data
     def get_raw_data(self, season: int) -> dict:
@@ -506,20 +1095,131 @@ class BlaseballReferenceAPI:
         Returns:
           A dict
         """
-        method = "/data/events"
+        method = "data/events"
         params = {"season": season - 1}
         return self._get(method, payload=params)
 
+    def iter_raw_data(
+        self, season: int, key: Optional[str] = None
+    ) -> Generator[dict, None, None]:
+        """
+        Streams the raw event data for a season, yielding one event at a time.
+
+        Unlike get_raw_data, the response body is parsed as it arrives, so memory use
+            stays flat regardless of the size of the season. Responses streamed this
+            way bypass the cache; the request is still rate limited and reported to
+            the hooks once the stream ends, without a size.
+
+        Args:
+          season: An int specifying the season number
+          key: The name of the top-level member holding the events, if the body is
+              an object; by default the first array found is used
+        Yields:
+          A dict for each event.
+        """
+        request = "data/events"
+        params = {"season": season - 1}
+        start = time.perf_counter()
+        url = f"{self.base_url}/{request}"
+        try:
+            resp = self._send(url, params, self.headers, stream=True)
+        except Exception:
+            self._observe(request, start, ERROR)
+            raise
+        ttfb = resp.elapsed.total_seconds()
+        cache = MISS if resp.ok else ERROR
+        try:
+            with resp:
+                resp.raise_for_status()
+                resp.raw.decode_content = True
+                yield from iter_json_items(resp.raw, key=key)
+        finally:
+            self._observe(request, start, cache, ttfb, None, None, resp.status_code)
+
     # Game Events
-    def get_game_events(self) -> dict:
+    @staticmethod
+    def _event_params(
+        game_id: Optional[str] = None,
+        season: Optional[int] = None,
+        batter_id: Optional[str] = None,
+        pitcher_id: Optional[str] = None,
+        event_type: Optional[str] = None,
+    ) -> dict:
+        """Builds the filter params of the events endpoint."""
+        params = {}
+        if game_id:
+            params["gameId"] = game_id
+        if season:
+            params["season"] = season - 1
+        if batter_id:
+            params["batterId"] = batter_id
+        if pitcher_id:
+            params["pitcherId"] = pitcher_id
+        if event_type:
+            params["eventType"] = event_type
+        return params
+
+    def get_game_events(
+        self,
+        game_id: Optional[str] = None,
+        season: Optional[int] = None,
+        batter_id: Optional[str] = None,
+        pitcher_id: Optional[str] = None,
+        event_type: Optional[str] = None,
+    ) -> dict:
         """
         Queries for game events.
 
+        Every filter is optional; see iter_game_events to page through many events.
+
         Args:
+          game_id: A string specifying a game ID
+          season: An int specifying the season number
+          batter_id: A string specifying the batter's player ID
+          pitcher_id: A string specifying the pitcher's player ID
+          event_type: A string specifying the event type, e.g. "HOME_RUN"
         Returns:
+          The events matching the filters.
         """
         method = "events"
-        return self._get(method)
+        params = self._event_params(game_id, season, batter_id, pitcher_id, event_type)
+        return self._get(method, payload=params or None)
+
+    def iter_game_events(
+        self,
+        game_id: Optional[str] = None,
+        season: Optional[int] = None,
+        batter_id: Optional[str] = None,
+        pitcher_id: Optional[str] = None,
+        event_type: Optional[str] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        prefetch: bool = True,
+    ) -> Generator[dict, None, None]:
+        """
+        Iterates over game events page by page, fetching the next page ahead.
+
+        While the caller handles one page, the next is already being requested, and
+            no more than two pages are held in memory. Pages are not cached.
+
+        Args:
+          game_id: A string specifying a game ID
+          season: An int specifying the season number
+          batter_id: A string specifying the batter's player ID
+          pitcher_id: A string specifying the pitcher's player ID
+          event_type: A string specifying the event type, e.g. "HOME_RUN"
+          page_size: The number of events requested at a time
+          prefetch: If False, only request a page once the previous one is used up
+        Returns:
+          A generator yielding a dict per event (an async generator, for an async
+              client).
+        Raises:
+          ValueError: page_size is less than 1.
+        """
+        if page_size < 1:
+            raise ValueError("'page_size' must be at least 1.")
+        method = "events"
+        params = self._event_params(game_id, season, batter_id, pitcher_id, event_type)
+        return self._paginate(method, params, page_size, prefetch)
 
     def count_by_type(self, event_type: str, player_type: str, player_id: str) -> dict:
         """
@@ -547,7 +1247,7 @@ class BlaseballReferenceAPI:
         Returns:
         """
         method = "deceased"
-        return self._get(method)
+        return self._as_model(Player, self._get(method))
 
     def list_player_ids_by_name(
         self, name: str, current: Optional[bool] = False
@@ -593,7 +1293,7 @@ class BlaseballReferenceAPI:
         """
         method = "allPlayers"
         params = {"includeShadows": include_shadows}
-        return self._get(method, payload=params)
+        return self._as_model(Player, self._get(method, payload=params))
 
     def list_all_players_for_gameday(self, season: int, day: int) -> dict:
         """
@@ -609,7 +1309,7 @@ class BlaseballReferenceAPI:
         """
         method = "allPlayersForGameday"
         params = {"season": season - 1, "day": day - 1}
-        return self._get(method, payload=params)
+        return self._as_model(Player, self._get(method, payload=params))
 
     # Teams
     def get_current_roster(self, team_id: str = None, slug: str = None) -> dict:
@@ -637,7 +1337,7 @@ class BlaseballReferenceAPI:
         Returns:
         """
         method = "allTeams"
-        return self._get(method)
+        return self._as_model(Team, self._get(method))
 
     def list_team_stars(self) -> dict:
         """
@@ -655,6 +1355,7 @@ class BlaseballReferenceAPI:
         stat: str,
         order: str = "DESC",
         limit: int = 10,
+        columnar: bool = False,
     ) -> dict:
         """
         Gets the season leaders for a given category and stat.
@@ -665,6 +1366,8 @@ class BlaseballReferenceAPI:
           stat:
           order:
           limit:
+          columnar: If True, return a dict of NumPy arrays (the ID and name columns
+              plus one for the stat) instead of a list of rows; requires numpy
         Returns:
         """
         valid_orders = ["ASC", "DESC"]
@@ -682,21 +1385,40 @@ class BlaseballReferenceAPI:
             "order": order.upper(),
             "limit": limit,
         }
-        return self._get(method, payload=params)
+        leaders = self._get(method, payload=params)
+        if columnar:
+            return self._as_columns(leaders, [stat])
+        return leaders
 
     def get_player_stats(
-        self, category: str, player_ids: list, season: int = None
+        self,
+        category: str,
+        player_ids: list,
+        season: int = None,
+        columnar: bool = False,
     ) -> dict:
         """
         Args:
+          columnar: If True, return a dict of NumPy arrays (the ID and name columns
+              plus one per stat in VALID_STATS[category]) instead of a list of rows;
+              requires numpy
         Returns:
         """
         method = "playerStats"
         if category.lower() not in self.VALID_CATEGORIES:
             raise ValueError(f"'category' must be one of {self.VALID_CATEGORIES}")
-        if isinstance(player_ids, list):
-            player_ids = ",".join(player_ids)
-        params = {"category": category, "playerIds": player_ids}
+        params = {"category": category}
         if season:
             params["season"] = season - 1
-        return self._get(method, payload=params)
+        rows = self._get_many(
+            method, "playerIds", player_ids, payload=params, id_field="player_id"
+        )
+        if columnar:
+            return self._as_columns(rows, self.VALID_STATS[category.lower()])
+        return rows
+
+    def _as_columns(self, rows, stats: List[str]):
+        """Converts stat rows into a dict of NumPy arrays."""
+        from blaser.columnar import to_columns
+
+        return self._apply(to_columns, rows, stats)
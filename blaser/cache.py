@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Endpoint-aware response caching for the API clients.
+"""
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+
+def cache_key(url: str, payload: Optional[dict] = None) -> str:
+    """
+    Builds a stable key for a request from its URL and sorted params.
+
+    Args:
+      url: A string containing the full URL of the request
+      payload: A dict containing the params to URL-encode into the URI (optional)
+    Returns:
+      A string uniquely identifying the request.
+    """
+    if not payload:
+        return url
+    params = sorted((str(k), repr(v)) for k, v in payload.items())
+    return f"{url}?{params}"
+
+
+def _game_complete(value: Any) -> bool:
+    """Returns True if a game (or every game in a list) has finished."""
+    if isinstance(value, list):
+        return bool(value) and all(_game_complete(game) for game in value)
+    return isinstance(value, dict) and bool(value.get("gameComplete"))
+
+
+class CachePolicy(NamedTuple):
+    """
+    Caching rules for an endpoint.
+
+    Attributes:
+      ttl: Seconds to keep a response; None keeps it indefinitely and 0 disables
+          caching
+      is_final: An optional callable that returns True if a response can never
+          change again, in which case it is kept indefinitely regardless of ttl
+      season_field: The key holding the (zero-indexed) season number of a
+          response; a response from before the current season is kept
+          indefinitely, as past seasons never change
+    """
+
+    ttl: Optional[float]
+    is_final: Optional[Callable[[Any], bool]] = None
+    season_field: Optional[str] = None
+
+    @property
+    def cacheable(self) -> bool:
+        """True unless the policy can never keep a response."""
+        return self.ttl != 0 or self.is_final is not None or bool(self.season_field)
+
+    def expiry(
+        self, value: Any, now: float, current_season: Optional[int] = None
+    ) -> Optional[float]:
+        """
+        Returns the time the value expires at, or None if it never does.
+
+        Args:
+          value: The decoded response
+          now: The current time
+          current_season: The API's (zero-indexed) current season, if known
+        """
+        if self.is_final is not None and self.is_final(value):
+            return None
+        if (
+            self.season_field
+            and current_season is not None
+            and isinstance(value, dict)
+            and isinstance(value.get(self.season_field), int)
+            and value[self.season_field] < current_season
+        ):
+            return None
+        if self.ttl is None:
+            return None
+        return now + self.ttl
+
+
+NO_CACHE = CachePolicy(ttl=0)
+
+# The endpoint whose responses tell a ResponseCache the current season.
+SEASON_SOURCE = "database/simulationData"
+
+# Keys are fnmatch patterns matched against the request path (without base URL).
+DEFAULT_POLICIES = {
+    # www.blaseball.com
+    "database/gameById/*": CachePolicy(ttl=5, is_final=_game_complete),
+    "database/games": CachePolicy(ttl=5, is_final=_game_complete),
+    "database/gameStatSheet": CachePolicy(ttl=5),
+    "database/simulationData": CachePolicy(ttl=5),
+    "database/globalEvents": CachePolicy(ttl=30),
+    "database/season": CachePolicy(ttl=300, season_field="seasonNumber"),
+    "database/playoffs": CachePolicy(ttl=300),
+    "database/offseasonRecap": CachePolicy(ttl=3600, season_field="season"),
+    "database/bonusResults": CachePolicy(ttl=3600),
+    "database/decreeResults": CachePolicy(ttl=3600),
+    "database/league": CachePolicy(ttl=300),
+    "database/subleague": CachePolicy(ttl=300),
+    "database/division": CachePolicy(ttl=300),
+    "database/allDivisions": CachePolicy(ttl=300),
+    "database/team": CachePolicy(ttl=30),
+    "database/allTeams": CachePolicy(ttl=30),
+    "database/players": CachePolicy(ttl=30),
+    # api.blaseball-reference.com
+    "data/events": CachePolicy(ttl=3600),
+    "allPlayers": CachePolicy(ttl=300),
+    "allPlayersForGameday": CachePolicy(ttl=3600),
+    "allTeams": CachePolicy(ttl=300),
+    "deceased": CachePolicy(ttl=300),
+    "playerStats": CachePolicy(ttl=300),
+    "seasonLeaders": CachePolicy(ttl=300),
+}
+
+
+class LRUCache:
+    """A bounded, thread-safe, in-memory least-recently-used store."""
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        """
+        Args:
+          maxsize: The maximum number of entries held before evicting
+        """
+        if maxsize < 1:
+            raise ValueError("'maxsize' must be at least 1.")
+        self.maxsize = maxsize
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Tuple[bool, Any, Optional[float]]:
+        """
+        Looks up a key, marking it as recently used.
+
+        Returns:
+          A tuple of (found, value, expiry).
+        """
+        with self._lock:
+            try:
+                value, expires = self._data[key]
+            except KeyError:
+                return False, None, None
+            self._data.move_to_end(key)
+            return True, value, expires
+
+    def set(self, key: str, value: Any, expires: Optional[float]) -> None:
+        """Stores a value, evicting the least recently used entry when full."""
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class DiskCache:
+    """
+    An on-disk store keeping one JSON file per entry.
+
+    Once it holds more than max_entries files, expired entries are deleted, then
+        the least recently written ones until a tenth of the room is free again.
+    """
+
+    def __init__(self, path: str, max_entries: Optional[int] = 4096) -> None:
+        """
+        Args:
+          path: A string specifying the directory to store entries in
+          max_entries: The most entries kept on disk; None lets it grow unbounded
+        Raises:
+          ValueError: max_entries is less than 1.
+        """
+        if max_entries is not None and max_entries < 1:
+            raise ValueError("'max_entries' must be at least 1.")
+        self.path = path
+        self.max_entries = max_entries
+        self.evictions = 0
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.Lock()
+        self._count = len(self._entries())
+
+    def __len__(self) -> int:
+        return len(self._entries())
+
+    def _entries(self) -> list:
+        return [name for name in os.listdir(self.path) if name.endswith(".json")]
+
+    def _file(self, key: str) -> str:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.path, f"{digest}.json")
+
+    def get(self, key: str) -> Tuple[bool, Any, Optional[float]]:
+        try:
+            with open(self._file(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return False, None, None
+        return True, entry["value"], entry["expires"]
+
+    def set(self, key: str, value: Any, expires: Optional[float]) -> None:
+        """Stores a value, pruning the directory once it holds too many entries."""
+        filename = self._file(key)
+        tmp = f"{filename}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"expires": expires, "value": value}, f)
+        added = not os.path.exists(filename)
+        os.replace(tmp, filename)
+        if added and self.max_entries is not None:
+            with self._lock:
+                self._count += 1
+                if self._count > self.max_entries:
+                    self._prune()
+
+    def prune(self) -> None:
+        """
+        Deletes expired entries, then the least recently written ones until no
+            more than nine tenths of max_entries remain.
+        """
+        with self._lock:
+            self._prune()
+
+    def _prune(self) -> None:
+        now = time.time()
+        kept = []
+        for name in self._entries():
+            filename = os.path.join(self.path, name)
+            try:
+                with open(filename, "r", encoding="utf-8") as f:
+                    expires = json.load(f)["expires"]
+                if expires is not None and expires <= now:
+                    os.remove(filename)
+                    continue
+                kept.append((os.path.getmtime(filename), filename))
+            except (OSError, ValueError, KeyError):
+                continue
+        if self.max_entries is not None:
+            limit = self.max_entries - self.max_entries // 10
+            kept.sort()
+            for _, filename in kept[: max(0, len(kept) - limit)]:
+                try:
+                    os.remove(filename)
+                    self.evictions += 1
+                except OSError:
+                    pass
+        # Deletes and other processes sharing the directory are not counted, so
+        # the count is only an estimate until the next prune.
+        self._count = len(self._entries())
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._file(key))
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        for name in self._entries():
+            os.remove(os.path.join(self.path, name))
+        with self._lock:
+            self._count = 0
+
+
+class ResponseCache:
+    """
+    Caches decoded API responses according to per-endpoint policies.
+
+    Lookups go to a bounded in-memory LRU first and then, if configured, to an
+        on-disk tier whose hits are promoted back into memory. Cached objects are
+        shared between callers, so they should be treated as read-only.
+
+    Responses of past seasons (see CachePolicy.season_field) are only pinned once
+        the current season is known: it is learned from every simulationData
+        response stored, or can be given up front.
+    """
+
+    def __init__(
+        self,
+        policies: Optional[Dict[str, CachePolicy]] = None,
+        maxsize: int = 1024,
+        disk_path: Optional[str] = None,
+        disk_max_entries: Optional[int] = 4096,
+        default_policy: CachePolicy = NO_CACHE,
+        current_season: Optional[int] = None,
+    ) -> None:
+        """
+        Args:
+          policies: A dict mapping fnmatch patterns of request paths to policies;
+              these are merged over DEFAULT_POLICIES
+          maxsize: The maximum number of responses held in memory
+          disk_path: A string specifying a directory for the on-disk tier (optional)
+          disk_max_entries: The most responses kept on disk; None keeps them all
+          default_policy: The policy for endpoints not matching any pattern
+          current_season: The API's zero-indexed current season, if already known
+        """
+        self.policies = dict(DEFAULT_POLICIES)
+        if policies:
+            self.policies.update(policies)
+        self.default_policy = default_policy
+        self.current_season = current_season
+        self.memory = LRUCache(maxsize)
+        self.disk = DiskCache(disk_path, disk_max_entries) if disk_path else None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}"
+
+    def policy_for(self, request: str) -> CachePolicy:
+        """
+        Finds the policy that applies to a request path.
+
+        Args:
+          request: A string containing the URI of the requested API endpoint
+        Returns:
+          The matching CachePolicy, or the default policy.
+        """
+        path = request.lstrip("/")
+        for pattern, policy in self.policies.items():
+            if fnmatchcase(path, pattern):
+                return policy
+        return self.default_policy
+
+    def get(self, request: str, key: str) -> Tuple[bool, Any]:
+        """
+        Looks up a cached response.
+
+        Args:
+          request: A string containing the URI of the requested API endpoint
+          key: A string produced by cache_key()
+        Returns:
+          A tuple of (hit, value).
+        """
+        policy = self.policy_for(request)
+        if not policy.cacheable:
+            return False, None
+        now = time.time()
+        found, value, expires = self.memory.get(key)
+        if found and (expires is None or expires > now):
+            self._count(hit=True)
+            return True, value
+        if self.disk is not None:
+            found, value, expires = self.disk.get(key)
+            if found and (expires is None or expires > now):
+                self.memory.set(key, value, expires)
+                self._count(hit=True)
+                return True, value
+        self._count(hit=False)
+        return False, None
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def set(self, request: str, key: str, value: Any) -> None:
+        """
+        Stores a response if the endpoint's policy allows it.
+
+        Args:
+          request: A string containing the URI of the requested API endpoint
+          key: A string produced by cache_key()
+          value: The decoded response
+        """
+        now = time.time()
+        path = request.lstrip("/")
+        if path == SEASON_SOURCE and isinstance(value, dict):
+            season = value.get("season")
+            if isinstance(season, int):
+                self.current_season = max(self.current_season or 0, season)
+        policy = self.policy_for(request)
+        expires = policy.expiry(value, now, self.current_season)
+        if expires is not None and expires <= now:
+            return
+        self.memory.set(key, value, expires)
+        if self.disk is not None:
+            self.disk.set(key, value, expires)
+
+    def invalidate(self, key: str) -> None:
+        """Removes a single entry from every tier."""
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self) -> None:
+        """Empties every tier and resets the counters."""
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+        with self._lock:
+            self.hits = self.misses = self.memory.evictions = 0
+
+    @property
+    def stats(self) -> dict:
+        """A dict of the hit, miss and eviction counters and current size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.memory.evictions,
+            "size": len(self.memory),
+        }
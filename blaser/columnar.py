@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Columnar (NumPy) views of the row-oriented stat endpoints.
+
+Requires the optional ``numpy`` dependency (``pip install blaser[numpy]``).
+"""
+import math
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+ID_COLUMNS = ("player_id", "player_name", "team_id", "team")
+
+
+def _number(value) -> float:
+    """Converts a stat value, which may arrive as a string or null, to a float."""
+    if value is None:
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def to_columns(rows: Iterable[dict], stats: List[str]) -> Dict[str, np.ndarray]:
+    """
+    Converts a list of stat rows into one array per column.
+
+    Stat columns are float64 arrays with NaN for missing values; the ID and name
+        columns present in the rows are unicode arrays. Rows from seasonLeaders carry
+        their stat as "value", which is used when the stat's own key is missing.
+
+    Args:
+      rows: A list of dicts as returned by playerStats or seasonLeaders
+      stats: The names of the stat columns to build
+    Returns:
+      A dict mapping column names to NumPy arrays of equal length.
+    """
+    rows = list(rows)
+    present = set()
+    for row in rows:
+        present.update(row)
+    table = {}
+    for column in ID_COLUMNS:
+        if column in present:
+            table[column] = np.array(
+                ["" if row.get(column) is None else str(row[column]) for row in rows],
+                dtype=str,
+            )
+    for stat in stats:
+        values = np.empty(len(rows), dtype=np.float64)
+        for index, row in enumerate(rows):
+            values[index] = _number(row.get(stat, row.get("value")))
+        table[stat] = values
+    return table
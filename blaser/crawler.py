@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Bulk retrieval of whole seasons into a local, resumable store.
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import json
+import sqlite3
+from typing import (
+    Any,
+    Callable,
+    Container,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Union,
+)
+
+from blaser.blaseball_api import BlaseballAPI
+from blaser.ratelimit import TokenBucket
+
+DEFAULT_RATE = 10.0
+DEFAULT_STATSHEET_BATCH = 50
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS days (
+    season INTEGER NOT NULL,
+    day INTEGER NOT NULL,
+    games INTEGER NOT NULL,
+    PRIMARY KEY (season, day)
+);
+CREATE TABLE IF NOT EXISTS games (
+    id TEXT PRIMARY KEY,
+    season INTEGER NOT NULL,
+    day INTEGER NOT NULL,
+    statsheet_id TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS statsheets (
+    id TEXT PRIMARY KEY,
+    game_id TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_season ON games (season, day);
+"""
+
+
+class CrawlProgress(NamedTuple):
+    """
+    A progress report from a SeasonCrawler.
+
+    Attributes:
+      season: The season being crawled
+      phase: Either "days" or "statsheets"
+      done: The number of requests completed in this phase
+      total: The number of requests scheduled in this phase so far
+    """
+
+    season: int
+    phase: str
+    done: int
+    total: int
+
+
+def _game_complete(game: dict) -> bool:
+    return bool(game.get("gameComplete"))
+
+
+def _as_dict(value: Any) -> dict:
+    """Returns a response object as a dict, converting models back."""
+    return value if isinstance(value, dict) else value.to_dict()
+
+
+class SeasonStore:
+    """
+    An SQLite file holding crawled games and statsheets.
+
+    Every day and batch of statsheets is committed as soon as it is fetched, so an
+        interrupted crawl resumes where it stopped. A day only counts as crawled
+        once all of its games are complete; until then it is fetched again, and
+        its stored games are replaced by the newer copies.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+          path: A string specifying the database file to create or open
+        """
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(_SCHEMA)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.path!r})"
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def day_counts(self, season: int) -> dict:
+        """
+        Returns a dict mapping each completely crawled day of a season to its game
+            count.
+        """
+        rows = self.conn.execute(
+            "SELECT day, games FROM days WHERE season = ?", (season,)
+        )
+        return dict(rows.fetchall())
+
+    def save_day(
+        self, season: int, day: int, games: List[dict], skip: Container = ()
+    ) -> bool:
+        """
+        Stores the games of a day, replacing any stored copies.
+
+        Args:
+          season: The season the day belongs to
+          day: The day the games were fetched for
+          games: Every game the API returned for the day
+          skip: IDs of games already stored under another day; they still count
+              towards whether this day is done, but are not written again
+        Returns:
+          True if the day is done, i.e. it has games and all of them are complete.
+        """
+        done = bool(games) and all(_game_complete(g) for g in games)
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO games VALUES (?, ?, ?, ?, ?)",
+                [
+                    (g["id"], season, day, g.get("statsheet"), json.dumps(g))
+                    for g in games
+                    if g["id"] not in skip
+                ],
+            )
+            if done:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO days VALUES (?, ?, ?)",
+                    (season, day, len(games)),
+                )
+        return done
+
+    def missing_statsheets(self, season: int) -> List[tuple]:
+        """
+        Lists (game_id, statsheet_id) for complete games whose statsheet is not
+            stored; statsheets of unfinished games would still change.
+        """
+        rows = self.conn.execute(
+            "SELECT g.id, g.statsheet_id, g.data FROM games g "
+            "LEFT JOIN statsheets s ON s.id = g.statsheet_id "
+            "WHERE g.season = ? AND g.statsheet_id IS NOT NULL AND s.id IS NULL",
+            (season,),
+        )
+        return [
+            (game_id, sheet_id)
+            for game_id, sheet_id, data in rows
+            if _game_complete(json.loads(data))
+        ]
+
+    def save_statsheets(self, sheets: List[dict], game_ids: dict) -> None:
+        """
+        Stores game statsheets.
+
+        Args:
+          sheets: A list of statsheet dicts
+          game_ids: A dict mapping statsheet IDs to their game IDs
+        """
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO statsheets VALUES (?, ?, ?)",
+                [(s["id"], game_ids.get(s["id"], ""), json.dumps(s)) for s in sheets],
+            )
+
+    def games(self, season: int) -> Iterator[dict]:
+        """Yields the stored games of a season ordered by day."""
+        rows = self.conn.execute(
+            "SELECT data FROM games WHERE season = ? ORDER BY day", (season,)
+        )
+        for (data,) in rows:
+            yield json.loads(data)
+
+    def statsheet(self, game_id: str) -> Optional[dict]:
+        """Returns the stored statsheet for a game, or None."""
+        row = self.conn.execute(
+            "SELECT data FROM statsheets WHERE game_id = ?", (game_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+
+class SeasonCrawler:
+    """
+    Fetches every game and game statsheet of one or more seasons concurrently.
+
+    Days are requested in windows of max_workers at a time until a whole window
+        comes back empty, game IDs are deduplicated, and statsheets are requested in
+        batches. Everything is written to a SeasonStore as it arrives; completed
+        days and statsheets already in the store are not requested again.
+
+    Games are stored as dicts, so an api returning models has them converted back
+        with to_dict().
+    """
+
+    def __init__(
+        self,
+        store: Union[SeasonStore, str],
+        api: Optional[BlaseballAPI] = None,
+        max_workers: int = 8,
+        rate: float = DEFAULT_RATE,
+        statsheet_batch: int = DEFAULT_STATSHEET_BATCH,
+        progress: Optional[Callable[[CrawlProgress], None]] = None,
+    ) -> None:
+        """
+        Args:
+          store: A SeasonStore, or a string specifying its database file
+          api: The BlaseballAPI to crawl with (optional)
+          max_workers: The maximum number of requests in flight at once
+          rate: The maximum number of requests started per second; 0 disables it
+          statsheet_batch: The number of statsheets requested at a time
+          progress: A callable receiving a CrawlProgress after each request
+        """
+        self.store = SeasonStore(store) if isinstance(store, str) else store
+        self.api = api or BlaseballAPI()
+        self.max_workers = max_workers
+        self.statsheet_batch = statsheet_batch
+        self.progress = progress
+        self._bucket = TokenBucket(rate)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}"
+
+    def _call(self, fn: Callable, *args):
+        self._bucket.acquire()
+        return fn(*args)
+
+    def _report(self, season: int, phase: str, done: int, total: int) -> None:
+        if self.progress is not None:
+            self.progress(CrawlProgress(season, phase, done, total))
+
+    def crawl(self, seasons: Union[int, Iterable[int]]) -> None:
+        """
+        Crawls one or more seasons into the store.
+
+        Args:
+          seasons: An int or iterable of ints specifying the season numbers
+        """
+        if isinstance(seasons, int):
+            seasons = [seasons]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for season in seasons:
+                self._crawl_days(pool, season)
+                self._crawl_statsheets(pool, season)
+
+    def _crawl_days(self, pool: ThreadPoolExecutor, season: int) -> None:
+        known = self.store.day_counts(season)
+        seen = set()
+        done = total = 0
+        first = 1
+        while True:
+            window = range(first, first + self.max_workers)
+            futures = {}
+            for day in window:
+                if day not in known:
+                    future = pool.submit(
+                        self._call, self.api.get_game_by_date, season, day
+                    )
+                    futures[future] = day
+            total += len(futures)
+            found = sum(known.get(day, 0) for day in window)
+            for future in as_completed(futures):
+                games = [_as_dict(g) for g in future.result() or []]
+                self.store.save_day(season, futures[future], games, seen)
+                seen.update(g["id"] for g in games)
+                found += len(games)
+                done += 1
+                self._report(season, "days", done, total)
+            if not found:
+                return
+            first += self.max_workers
+
+    def _crawl_statsheets(self, pool: ThreadPoolExecutor, season: int) -> None:
+        missing = self.store.missing_statsheets(season)
+        game_ids = {sheet_id: game_id for game_id, sheet_id in missing}
+        sheet_ids = list(game_ids)
+        batches = [
+            sheet_ids[i : i + self.statsheet_batch]
+            for i in range(0, len(sheet_ids), self.statsheet_batch)
+        ]
+        futures = [
+            pool.submit(self._call, self.api.get_game_statsheets, ",".join(batch))
+            for batch in batches
+        ]
+        for done, future in enumerate(as_completed(futures), 1):
+            sheets = future.result() or []
+            if not isinstance(sheets, list):
+                sheets = [sheets]
+            self.store.save_statsheets([_as_dict(s) for s in sheets], game_ids)
+            self._report(season, "statsheets", done, len(futures))
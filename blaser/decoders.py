@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Pluggable JSON decoding for API responses.
+
+Decoders take the raw response bytes, skipping the intermediate text that
+requests' Response.json() builds. orjson is used when installed
+(``pip install blaser[fast]``), otherwise the standard library json module.
+"""
+import json
+from typing import Any, Callable, Dict, Optional, Union
+
+Decoder = Callable[[bytes], Any]
+
+
+def _load_orjson() -> Optional[Decoder]:
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson.loads
+
+
+DECODERS: Dict[str, Callable[[], Optional[Decoder]]] = {
+    "json": lambda: json.loads,
+    "orjson": _load_orjson,
+}
+
+
+_fastest: Optional[Decoder] = None
+
+
+def _decode_fastest(data: bytes) -> Any:
+    """Decodes with the fastest decoder installed, looked up on the first call."""
+    global _fastest
+    if _fastest is None:
+        _fastest = _load_orjson() or json.loads
+    return _fastest(data)
+
+
+def available_decoders() -> Dict[str, Decoder]:
+    """Returns a dict of the decoders that can be used in this environment."""
+    found = {}
+    for name, load in DECODERS.items():
+        decoder = load()
+        if decoder is not None:
+            found[name] = decoder
+    return found
+
+
+def get_decoder(decoder: Union[str, Decoder, None] = None) -> Decoder:
+    """
+    Resolves a decoder.
+
+    Args:
+      decoder: A callable taking bytes, the name of a decoder in DECODERS, or None to
+          pick the fastest one installed (which is only imported on first use)
+    Returns:
+      A callable decoding JSON from bytes.
+    Raises:
+      ValueError: The named decoder is unknown or not installed.
+    """
+    if callable(decoder):
+        return decoder
+    if decoder is None:
+        return _decode_fastest
+    if decoder not in DECODERS:
+        raise ValueError(f"'decoder' must be one of {list(DECODERS)}.")
+    loaded = DECODERS[decoder]()
+    if loaded is None:
+        raise ValueError(f"The {decoder} decoder is not installed.")
+    return loaded
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Level-by-level loading of the league, playoff and election hierarchies.
+
+Each tree is resolved one level at a time. All the IDs a level needs are collected
+and deduplicated first, and the level is then fetched with as few requests as the
+API allows, all in flight at once. Divisions and teams come from the allDivisions
+and allTeams endpoints, and players, matchups, blessings and decrees from the
+multi-ID endpoints. The result is a tree of Nodes linking each object to its
+parent and children.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import inspect
+from typing import Any, Callable, Dict, Generator, Iterator, List, Optional, Tuple
+
+from blaser.blaseball_api import BlaseballAPI
+
+ROSTER_FIELDS = ("lineup", "rotation", "bullpen", "bench")
+
+# A level of the plan: a list of (function, args) calls to make concurrently.
+Calls = List[Tuple[Callable, tuple]]
+Plan = Generator[Calls, list, "Node"]
+
+
+def _camel(name: str) -> str:
+    first, *rest = name.split("_")
+    return first + "".join(word.capitalize() for word in rest)
+
+
+def _field(obj: Any, name: str) -> Any:
+    """Reads a snake_case field from a decoded dict or a model."""
+    if isinstance(obj, dict):
+        return obj.get(_camel(name), obj.get(name))
+    return getattr(obj, name, None)
+
+
+def _ids(objects: List[Any], *fields: str) -> List[str]:
+    """Collects the IDs listed in fields of objects, without duplicates."""
+    found = {}
+    for obj in objects:
+        for name in fields:
+            for item in _field(obj, name) or ():
+                found[item] = None
+    return list(found)
+
+
+def _as_list(response: Any) -> list:
+    if response is None:
+        return []
+    return response if isinstance(response, list) else [response]
+
+
+def _by_id(objects: List[Any]) -> Dict[str, Any]:
+    return {_field(obj, "id"): obj for obj in objects if obj is not None}
+
+
+class Node:
+    """
+    An object in a loaded hierarchy.
+
+    Attributes fall through to the underlying dict (snake_case names are looked up
+        in camelCase too) or model, except for the names of linked children, e.g.
+        league.subleagues is a list of Nodes where the raw data only has IDs.
+    """
+
+    __slots__ = ("kind", "data", "parent", "links")
+
+    def __init__(self, kind: str, data: Any, parent: Optional["Node"] = None) -> None:
+        """
+        Args:
+          kind: What the object is, e.g. "league" or "player"
+          data: The decoded dict or model
+          parent: The Node this one was linked from, if any
+        """
+        self.kind = kind
+        self.data = data
+        self.parent = parent
+        self.links: Dict[str, List["Node"]] = {}
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.kind!r}, id={self.id!r})"
+
+    def __getattr__(self, name: str) -> Any:
+        links = object.__getattribute__(self, "links")
+        if name in links:
+            return links[name]
+        return _field(object.__getattribute__(self, "data"), name)
+
+    @property
+    def id(self) -> Optional[str]:
+        return _field(self.data, "id")
+
+    def link(self, name: str, kind: str, children: List[Any]) -> List["Node"]:
+        """Links child objects under name, returning their new Nodes."""
+        nodes = [Node(kind, child, self) for child in children if child is not None]
+        self.links[name] = nodes
+        return nodes
+
+    def walk(self, kind: Optional[str] = None) -> Iterator["Node"]:
+        """Yields this node and every node below it, optionally of one kind only."""
+        if kind is None or self.kind == kind:
+            yield self
+        for children in self.links.values():
+            for child in children:
+                yield from child.walk(kind)
+
+
+class HierarchyLoader:
+    """
+    Loads whole hierarchies from a BlaseballAPI or AsyncBlaseballAPI.
+
+    With a blocking client each level's requests run on a thread pool and the
+        load methods return a Node; with an asynchronous client they are gathered
+        and the load methods return a coroutine.
+    """
+
+    def __init__(self, api: Optional[BlaseballAPI] = None) -> None:
+        """
+        Args:
+          api: The client to load with (defaults to a new BlaseballAPI)
+        """
+        self.api = api or BlaseballAPI()
+        self.is_async = inspect.iscoroutinefunction(self.api._get)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}"
+
+    def _run(self, plan: Plan):
+        if self.is_async:
+            return self._run_async(plan)
+        workers = getattr(self.api, "max_workers", 8)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = None
+            try:
+                while True:
+                    calls = plan.send(results)
+                    futures = [pool.submit(fn, *args) for fn, args in calls]
+                    results = [future.result() for future in futures]
+            except StopIteration as stop:
+                return stop.value
+
+    async def _run_async(self, plan: Plan):
+        results = None
+        try:
+            while True:
+                calls = plan.send(results)
+                results = await asyncio.gather(*(fn(*args) for fn, args in calls))
+        except StopIteration as stop:
+            return stop.value
+
+    def _fetch_all(
+        self, ids: List[str], fetch_all: Callable, fetch_one: Callable
+    ) -> Generator[Calls, list, Dict[str, Any]]:
+        """
+        Fetches a level of objects, in one listing request if there are several.
+
+        Returns:
+          A dict mapping the IDs found to their objects.
+        """
+        if not ids:
+            return {}
+        if len(ids) == 1:
+            (found,) = yield [(fetch_one, (ids[0],))]
+            return _by_id(_as_list(found))
+        (listing,) = yield [(fetch_all, ())]
+        found = _by_id(_as_list(listing))
+        missing = [i for i in ids if i not in found]
+        if missing:
+            extra = yield [(fetch_one, (i,)) for i in missing]
+            found.update(_by_id(extra))
+        return found
+
+    def load_league(
+        self,
+        league_id: str,
+        players: bool = True,
+        roster_fields: Tuple[str, ...] = ROSTER_FIELDS,
+    ):
+        """
+        Loads a league with its subleagues, divisions, teams and players.
+
+        Args:
+          league_id: A string specifying the league ID
+          players: If False, stop at the teams
+          roster_fields: The team fields whose players are loaded and linked
+        Returns:
+          The league Node (or a coroutine returning it, for an async client).
+              Subleagues are linked as .subleagues, their divisions as .divisions,
+              division teams as .teams, and players under each roster field.
+        """
+        return self._run(self._league_plan(league_id, players, roster_fields))
+
+    def _league_plan(
+        self, league_id: str, players: bool, roster_fields: Tuple[str, ...]
+    ) -> Plan:
+        api = self.api
+        (league,) = yield [(api.get_league_info, (league_id,))]
+        root = Node("league", league)
+
+        subleague_ids = _ids([league], "subleagues")
+        subleagues = yield [(api.get_subleague_info, (i,)) for i in subleague_ids]
+        subleagues = _by_id(subleagues)
+        subleague_nodes = root.link(
+            "subleagues", "subleague", [subleagues.get(i) for i in subleague_ids]
+        )
+
+        division_ids = _ids(subleagues.values(), "divisions")
+        divisions = yield from self._fetch_all(
+            division_ids, api.list_all_divisions, api.get_division_info
+        )
+        division_nodes = []
+        for node in subleague_nodes:
+            ids = _field(node.data, "divisions") or ()
+            division_nodes += node.link(
+                "divisions", "division", [divisions.get(i) for i in ids]
+            )
+
+        team_ids = _ids(divisions.values(), "teams")
+        teams = yield from self._fetch_all(
+            team_ids, api.list_all_teams, api.get_team_info
+        )
+        team_nodes = []
+        for node in division_nodes:
+            ids = _field(node.data, "teams") or ()
+            team_nodes += node.link("teams", "team", [teams.get(i) for i in ids])
+
+        if players and team_nodes:
+            player_ids = _ids([node.data for node in team_nodes], *roster_fields)
+            (found,) = yield [(api.get_player_info, (player_ids,))]
+            found = _by_id(_as_list(found))
+            for node in team_nodes:
+                for name in roster_fields:
+                    ids = _field(node.data, name) or ()
+                    node.link(name, "player", [found.get(i) for i in ids])
+        return root
+
+    def load_playoffs(self, season: int):
+        """
+        Loads a season's playoffs with their rounds and matchups.
+
+        Args:
+          season: An int specifying the season number
+        Returns:
+          The playoffs Node (or a coroutine returning it), with rounds linked as
+              .rounds and each round's matchups as .matchups.
+        """
+        return self._run(self._playoffs_plan(season))
+
+    def _playoffs_plan(self, season: int) -> Plan:
+        api = self.api
+        (playoffs,) = yield [(api.get_playoff_details, (season,))]
+        root = Node("playoffs", playoffs)
+        round_ids = _ids([playoffs], "rounds")
+        rounds = yield [(api.get_playoff_round_details, (i,)) for i in round_ids]
+        rounds = _by_id(rounds)
+        round_nodes = root.link("rounds", "round", [rounds.get(i) for i in round_ids])
+        matchup_ids = _ids(rounds.values(), "matchups")
+        matchups = {}
+        if matchup_ids:
+            (found,) = yield [(api.get_playoff_matchups, (matchup_ids,))]
+            matchups = _by_id(_as_list(found))
+        for node in round_nodes:
+            ids = _field(node.data, "matchups") or ()
+            node.link("matchups", "matchup", [matchups.get(i) for i in ids])
+        return root
+
+    def load_election(self, season: int):
+        """
+        Loads a season's election recap with its blessing and decree results.
+
+        Args:
+          season: An int specifying the season number
+        Returns:
+          The recap Node (or a coroutine returning it), with blessing results
+              linked as .bonus_results and decree results as .decree_results.
+        """
+        return self._run(self._election_plan(season))
+
+    def _election_plan(self, season: int) -> Plan:
+        api = self.api
+        (recap,) = yield [(api.get_election_recap, (season,))]
+        root = Node("election", recap)
+        levels = (
+            ("bonus_results", "blessing", api.get_blessing_results),
+            ("decree_results", "decree", api.get_decree_results),
+        )
+        wanted = [(name, kind, fn, _ids([recap], name)) for name, kind, fn in levels]
+        wanted = [level for level in wanted if level[3]]
+        results = yield [(fn, (ids,)) for _, _, fn, ids in wanted]
+        for (name, kind, _, ids), found in zip(wanted, results):
+            found = _by_id(_as_list(found))
+            root.link(name, kind, [found.get(i) for i in ids])
+        return root
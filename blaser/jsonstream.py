@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Incremental parsing of large JSON arrays from file-like objects.
+"""
+import codecs
+import json
+import re
+from typing import Any, Generator, IO, Optional
+
+DEFAULT_READ_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+
+# Characters that may still continue a number, e.g. the "." of "1." or "e" of "2e".
+_NUMBER_TAIL = re.compile(r"[0-9+\-.eE]*\Z")
+
+
+class _Reader:
+    """Buffers decoded text from a file-like object, reading on demand."""
+
+    def __init__(self, fp: IO, read_size: int) -> None:
+        self.fp = fp
+        self.read_size = read_size
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Reads another chunk into the buffer; returns False at end of input."""
+        if self.eof:
+            return False
+        chunk = self.fp.read(self.read_size)
+        if isinstance(chunk, bytes):
+            text = self.decoder.decode(chunk, final=not chunk)
+        else:
+            text = chunk or ""
+        if not chunk:
+            self.eof = True
+        if self.pos:
+            self.buf = self.buf[self.pos :]
+            self.pos = 0
+        self.buf += text
+        return bool(chunk)
+
+    def peek(self) -> str:
+        """Returns the next non-whitespace character without consuming it."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise json.JSONDecodeError(
+                f"Expecting one of {chars!r}", self.buf, self.pos
+            )
+        self.pos += 1
+        return char
+
+    def value(self, decoder: json.JSONDecoder) -> Any:
+        """Decodes the next complete JSON value, reading more input as needed."""
+        self.peek()
+        while True:
+            try:
+                obj, end = decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # A number is only complete once something other than a number
+            # character follows it; until then, it may continue in the next chunk.
+            if (
+                isinstance(obj, (int, float))
+                and not isinstance(obj, bool)
+                and not self.eof
+                and _NUMBER_TAIL.match(self.buf, end)
+                and self.fill()
+            ):
+                continue
+            self.pos = end
+            return obj
+
+
+def iter_json_items(
+    fp: IO, key: Optional[str] = None, read_size: int = DEFAULT_READ_SIZE
+) -> Generator[Any, None, None]:
+    """
+    Yields the items of a JSON array one at a time as the input is read.
+
+    The array may be the whole document, or a member of a top-level object. Only one
+        item (plus one read buffer) is held in memory at a time.
+
+    Args:
+      fp: A file-like object opened in binary or text mode, e.g. a raw HTTP response
+      key: The name of the top-level member holding the array; if None the first
+          array-valued member is used
+      read_size: The number of bytes to read at a time
+    Yields:
+      Each decoded item of the array.
+    Raises:
+      json.JSONDecodeError: The input is not valid JSON or holds no array.
+    """
+    decoder = json.JSONDecoder()
+    reader = _Reader(fp, read_size)
+    if reader.expect("[{") == "{":
+        while True:
+            if reader.peek() == "}":
+                raise json.JSONDecodeError("No array found", reader.buf, reader.pos)
+            name = reader.value(decoder)
+            reader.expect(":")
+            if reader.peek() == "[" and (key is None or name == key):
+                reader.expect("[")
+                break
+            reader.value(decoder)
+            if reader.expect(",}") == "}":
+                raise json.JSONDecodeError("No array found", reader.buf, reader.pos)
+    if reader.peek() == "]":
+        return
+    while True:
+        yield reader.value(decoder)
+        if reader.expect(",]") == "]":
+            return
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Season leaderboards computed locally from Blaseball Reference game events.
+
+Requires the optional ``numpy`` dependency (``pip install blaser[numpy]``).
+"""
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from blaser.blaseball_api import BlaseballReferenceAPI
+
+# Per-player counters accumulated from events; every stat is derived from these.
+COUNTERS = (
+    "plate_appearances",
+    "at_bats",
+    "hits",
+    "walks",
+    "singles",
+    "doubles",
+    "triples",
+    "home_runs",
+    "runs_batted_in",
+    "strikeouts",
+    "sacrifices",
+    "sacrifice_flies",
+    "at_bats_risp",
+    "hits_risp",
+    "hbps",
+    "ground_outs",
+    "flyouts",
+    "gidps",
+    "pitcher_games",
+    "pitch_count",
+    "outs_recorded",
+    "runs_allowed",
+    "pitcher_strikeouts",
+    "pitcher_walks",
+    "hrs_allowed",
+    "hits_allowed",
+    "plays",
+    "stolen_bases",
+    "caught_stealing",
+    "runs",
+)
+_COLUMN = {name: index for index, name in enumerate(COUNTERS)}
+
+HIT_BASES = {"SINGLE": 1, "DOUBLE": 2, "TRIPLE": 3, "HOME_RUN": 4}
+WALK_TYPES = {"WALK", "CHARM_WALK", "MIND_TRICK_WALK"}
+STRIKEOUT_TYPES = {"STRIKEOUT", "CHARM_STRIKEOUT", "MIND_TRICK_STRIKEOUT"}
+PLATE_APPEARANCE_TYPES = (
+    set(HIT_BASES)
+    | WALK_TYPES
+    | STRIKEOUT_TYPES
+    | {"OUT", "FIELDERS_CHOICE", "SACRIFICE", "HIT_BY_PITCH", "HBP"}
+)
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Divides element-wise, giving 0 where the denominator is 0."""
+    out = np.zeros_like(numerator, dtype=np.float64)
+    np.divide(numerator, denominator, out=out, where=denominator != 0)
+    return out
+
+
+def _batting_average(c):
+    return _ratio(c["hits"], c["at_bats"])
+
+
+def _on_base_percentage(c):
+    on_base = c["hits"] + c["walks"] + c["hbps"]
+    chances = c["at_bats"] + c["walks"] + c["hbps"] + c["sacrifice_flies"]
+    return _ratio(on_base, chances)
+
+
+def _total_bases(c):
+    return c["singles"] + 2 * c["doubles"] + 3 * c["triples"] + 4 * c["home_runs"]
+
+
+def _slugging(c):
+    return _ratio(_total_bases(c), c["at_bats"])
+
+
+def _innings(c):
+    return c["outs_recorded"] / 3
+
+
+# How each stat in BlaseballReferenceAPI.VALID_STATS is derived from the counters.
+DERIVED = {
+    "batting": {
+        "batting_average": _batting_average,
+        "on_base_percentage": _on_base_percentage,
+        "slugging": _slugging,
+        "on_base_slugging": lambda c: _on_base_percentage(c) + _slugging(c),
+        "total_bases": _total_bases,
+        "hits_risps": lambda c: c["hits_risp"],
+        "batting_average_risp": lambda c: _ratio(c["hits_risp"], c["at_bats_risp"]),
+    },
+    "pitching": {
+        "games": lambda c: c["pitcher_games"],
+        "innings": _innings,
+        "era": lambda c: _ratio(9 * c["runs_allowed"], _innings(c)),
+        "strikeouts": lambda c: c["pitcher_strikeouts"],
+        "k_per_9": lambda c: _ratio(9 * c["pitcher_strikeouts"], _innings(c)),
+        "walks": lambda c: c["pitcher_walks"],
+    },
+    "fielding": {},
+    "running": {},
+}
+
+
+class _SeasonTable:
+    """Counters for every player seen in one season, one row per player."""
+
+    def __init__(self) -> None:
+        self.index = {}
+        self.ids = []
+        self.counts = np.zeros((64, len(COUNTERS)), dtype=np.float64)
+        self.pitcher_games = set()
+
+    def row(self, player_id: str) -> int:
+        try:
+            return self.index[player_id]
+        except KeyError:
+            pass
+        row = self.index[player_id] = len(self.ids)
+        self.ids.append(player_id)
+        if row >= len(self.counts):
+            grown = np.zeros((len(self.counts) * 2, len(COUNTERS)), dtype=np.float64)
+            grown[: len(self.counts)] = self.counts
+            self.counts = grown
+        return row
+
+    def add(self, player_id: Optional[str], counter: str, amount: float = 1) -> None:
+        if player_id and amount:
+            self.counts[self.row(player_id), _COLUMN[counter]] += amount
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        used = self.counts[: len(self.ids)]
+        return {name: used[:, column] for name, column in _COLUMN.items()}
+
+
+class LeaderboardEngine:
+    """
+    Answers season leader queries from game events held in memory.
+
+    Events (as returned by get_raw_data, iter_raw_data or get_game_events) are folded
+        into per-player counters once; each query then derives the requested stat
+        for every player with vectorized arithmetic and picks the top rows with a
+        partial sort. Events can be added at any time and are deduplicated by ID,
+        so the engine can be kept current as new events arrive.
+    """
+
+    def __init__(
+        self,
+        events: Optional[Iterable[dict]] = None,
+        names: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """
+        Args:
+          events: An iterable of event dicts to load (optional)
+          names: A dict mapping player IDs to names, used to fill player_name
+        """
+        self.names = dict(names or {})
+        self._seasons = {}
+        self._seen = set()
+        if events is not None:
+            self.add_events(events)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}"
+
+    def __len__(self) -> int:
+        """The number of distinct events loaded."""
+        return len(self._seen)
+
+    def add_events(self, events: Iterable[dict]) -> int:
+        """
+        Folds events into the counters.
+
+        Args:
+          events: An iterable of event dicts
+        Returns:
+          The number of events that had not been seen before.
+        """
+        added = 0
+        for event in events:
+            event_id = event.get("id")
+            if event_id is not None:
+                if event_id in self._seen:
+                    continue
+                self._seen.add(event_id)
+            table = self._seasons.get(event.get("season"))
+            if table is None:
+                table = self._seasons[event.get("season")] = _SeasonTable()
+            self._add_event(table, event)
+            added += 1
+        return added
+
+    def _add_event(self, table: _SeasonTable, event: dict) -> None:
+        event_type = event.get("event_type")
+        batter = event.get("batter_id")
+        pitcher = event.get("pitcher_id")
+        runners = event.get("base_runners") or []
+
+        runs_scored = sum(1 for r in runners if (r.get("base_after_play") or 0) >= 4)
+        for runner in runners:
+            runner_id = runner.get("runner_id")
+            table.add(runner_id, "stolen_bases", bool(runner.get("was_base_stolen")))
+            table.add(
+                runner_id, "caught_stealing", bool(runner.get("was_caught_stealing"))
+            )
+            table.add(runner_id, "runs", (runner.get("base_after_play") or 0) >= 4)
+        table.add(event.get("fielder_id"), "plays")
+
+        if pitcher:
+            game = (pitcher, event.get("game_id"))
+            if game not in table.pitcher_games:
+                table.pitcher_games.add(game)
+                table.add(pitcher, "pitcher_games")
+            pitches = event.get("pitches")
+            table.add(pitcher, "pitch_count", len(pitches) if pitches else 0)
+            table.add(pitcher, "outs_recorded", event.get("outs_on_play") or 0)
+
+        if event_type not in PLATE_APPEARANCE_TYPES:
+            table.add(pitcher, "runs_allowed", runs_scored)
+            return
+
+        bases = HIT_BASES.get(event_type, 0)
+        walk = event_type in WALK_TYPES
+        hbp = event_type in ("HIT_BY_PITCH", "HBP")
+        sacrifice = event_type == "SACRIFICE" or bool(event.get("is_sacrifice_hit"))
+        sacrifice_fly = bool(event.get("is_sacrifice_fly"))
+        at_bat = not (walk or hbp or sacrifice or sacrifice_fly)
+        risp = any((r.get("base_before_play") or 0) >= 2 for r in runners)
+        batted_ball = (event.get("batted_ball_type") or "").upper()
+        grounder = batted_ball == "GROUNDER"
+        out = event_type == "OUT"
+        if event_type == "HOME_RUN":
+            runs_scored += 1
+
+        table.add(batter, "plate_appearances")
+        table.add(batter, "at_bats", at_bat)
+        table.add(batter, "hits", bool(bases))
+        table.add(batter, "walks", walk)
+        table.add(batter, "hbps", hbp)
+        table.add(batter, "singles", bases == 1)
+        table.add(batter, "doubles", bases == 2)
+        table.add(batter, "triples", bases == 3)
+        table.add(batter, "home_runs", bases == 4)
+        table.add(batter, "runs_batted_in", event.get("runs_batted_in") or 0)
+        table.add(batter, "strikeouts", event_type in STRIKEOUT_TYPES)
+        table.add(batter, "sacrifices", sacrifice or sacrifice_fly)
+        table.add(batter, "sacrifice_flies", sacrifice_fly)
+        table.add(batter, "at_bats_risp", at_bat and risp)
+        table.add(batter, "hits_risp", bool(bases) and risp)
+        table.add(batter, "ground_outs", out and grounder)
+        table.add(batter, "flyouts", out and batted_ball == "FLY")
+        table.add(batter, "gidps", bool(event.get("is_double_play")) and grounder)
+        table.add(batter, "runs", event_type == "HOME_RUN")
+
+        table.add(pitcher, "runs_allowed", runs_scored)
+        table.add(pitcher, "pitcher_strikeouts", event_type in STRIKEOUT_TYPES)
+        table.add(pitcher, "pitcher_walks", walk)
+        table.add(pitcher, "hrs_allowed", bases == 4)
+        table.add(pitcher, "hits_allowed", bool(bases))
+
+    def stat(self, season: int, category: str, stat: str) -> Dict[str, np.ndarray]:
+        """
+        Computes a stat for every player with events in a season.
+
+        Args:
+          season: An int specifying the season number
+          category: One of BlaseballReferenceAPI.VALID_CATEGORIES
+          stat: One of BlaseballReferenceAPI.VALID_STATS[category]
+        Returns:
+          A dict with a "player_id" array and a "value" array.
+        """
+        category = category.lower()
+        table = self._seasons.get(season - 1)
+        if table is None or not table.ids:
+            return {"player_id": np.array([], dtype=str), "value": np.array([])}
+        columns = table.columns()
+        derive = DERIVED[category].get(stat)
+        values = derive(columns) if derive else columns[stat]
+        relevant = self._relevant(category, columns)
+        return {
+            "player_id": np.array(table.ids, dtype=str)[relevant],
+            "value": np.asarray(values, dtype=np.float64)[relevant],
+        }
+
+    @staticmethod
+    def _relevant(category: str, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """Selects the players who took part in a category at all."""
+        if category == "batting":
+            return columns["plate_appearances"] > 0
+        if category == "pitching":
+            return columns["pitcher_games"] > 0
+        if category == "fielding":
+            return columns["plays"] > 0
+        attempts = columns["stolen_bases"] + columns["caught_stealing"]
+        return (attempts + columns["runs"]) > 0
+
+    def get_season_leaders(
+        self,
+        season: int,
+        category: str,
+        stat: str,
+        order: str = "DESC",
+        limit: int = 10,
+    ) -> List[dict]:
+        """
+        Gets the season leaders for a given category and stat without any network
+            access.
+
+        Takes the same arguments, and raises the same errors, as
+            BlaseballReferenceAPI.get_season_leaders.
+
+        Args:
+          season: An int specifying the season number
+          category: One of BlaseballReferenceAPI.VALID_CATEGORIES
+          stat: One of BlaseballReferenceAPI.VALID_STATS[category]
+          order: "ASC" or "DESC"
+          limit: The maximum number of leaders to return
+        Returns:
+          A list of dicts with player_id, player_name and value keys, best first.
+        """
+        valid_orders = ["ASC", "DESC"]
+        categories = BlaseballReferenceAPI.VALID_CATEGORIES
+        stats = BlaseballReferenceAPI.VALID_STATS
+        if category.lower() not in categories:
+            raise ValueError(f"'category' must be one of {categories}.")
+        if stat.lower() not in stats[category.lower()]:
+            raise ValueError(f"'stat' must be one of {stats[category.lower()]}.")
+        if order.upper() not in valid_orders:
+            raise ValueError(f"'order' must be one of {valid_orders}.")
+        result = self.stat(season, category, stat.lower())
+        values = result["value"] if order.upper() == "ASC" else -result["value"]
+        count = min(limit, len(values))
+        if count <= 0:
+            return []
+        top = np.argpartition(values, count - 1)[:count]
+        top = top[np.argsort(values[top], kind="stable")]
+        return [
+            {
+                "player_id": str(result["player_id"][i]),
+                "player_name": self.names.get(str(result["player_id"][i])),
+                "value": float(result["value"][i]),
+            }
+            for i in top
+        ]
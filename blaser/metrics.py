@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Per-request instrumentation for the API clients.
+
+Every request made through a client's _get is described by a RequestRecord and
+passed to each of the client's hooks. MetricsRegistry is a ready-made hook that
+aggregates the records into histograms per endpoint template and exports them in
+the Prometheus text format.
+"""
+from bisect import bisect_left
+from functools import lru_cache
+import re
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+# Cache outcomes of a request.
+HIT = "hit"
+MISS = "miss"
+COALESCED = "coalesced"
+NOT_MODIFIED = "not_modified"
+ERROR = "error"
+
+DEFAULT_TIME_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+DEFAULT_SIZE_BUCKETS = tuple(2 ** n for n in range(8, 27, 2))
+
+_ID_SEGMENT = re.compile(
+    r"^(\d+|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})$", re.I
+)
+
+
+class RequestRecord(NamedTuple):
+    """
+    The measurements of a single request.
+
+    Attributes:
+      endpoint: The endpoint template, e.g. "database/gameById/{id}"
+      cache: One of HIT, MISS, COALESCED, NOT_MODIFIED or ERROR
+      wall: Seconds from the call to its result, including any cache lookup, rate
+          limiting and retries
+      ttfb: Seconds until the response headers arrived, or None if no request was
+          sent
+      decode: Seconds spent decoding the body, or None if nothing was decoded
+      size: The length of the response body in bytes, or None
+      status: The HTTP status of the response, or None if no response was received
+    """
+
+    endpoint: str
+    cache: str
+    wall: float
+    ttfb: Optional[float] = None
+    decode: Optional[float] = None
+    size: Optional[int] = None
+    status: Optional[int] = None
+
+
+Hook = Callable[[RequestRecord], None]
+
+
+@lru_cache(maxsize=1024)
+def endpoint_template(request: str) -> str:
+    """
+    Replaces the IDs embedded in a request path with "{id}".
+
+    Args:
+      request: A string containing the URI of the requested API endpoint
+    Returns:
+      The path with numeric and UUID segments replaced, e.g.
+          "database/gameById/{id}".
+    """
+    segments = request.strip("/").split("/")
+    return "/".join("{id}" if _ID_SEGMENT.match(s) else s for s in segments)
+
+
+class Histogram:
+    """A cumulative histogram over fixed bucket upper bounds, as Prometheus uses."""
+
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        """
+        Args:
+          bounds: The upper bounds of the buckets in ascending order; a final +Inf
+              bucket is implied
+        """
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(count={self.count}, sum={self.sum})"
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def merge(self, other: "Histogram") -> None:
+        """Adds the observations of another histogram with the same bounds."""
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.sum += other.sum
+
+    def buckets(self) -> List[Tuple[float, int]]:
+        """Returns (upper bound, cumulative count) pairs, ending with +Inf."""
+        total = 0
+        cumulative = []
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            total += count
+            cumulative.append((bound, total))
+        return cumulative
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimates a quantile by interpolating within its bucket.
+
+        Args:
+          q: The quantile, between 0 and 1
+        Returns:
+          The estimate, or None if nothing was observed. Values in the +Inf bucket
+              are reported as the largest finite bound.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        lower = previous = 0
+        for bound, total in self.buckets():
+            if total >= rank:
+                if bound == float("inf"):
+                    return self.bounds[-1] if self.bounds else None
+                in_bucket = total - previous
+                fraction = (rank - previous) / in_bucket if in_bucket else 0.0
+                return lower + (bound - lower) * fraction
+            lower, previous = bound, total
+        return None
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": self.buckets(),
+        }
+
+
+# name: (help, field of RequestRecord, labels beyond endpoint, bucket kind)
+_HISTOGRAMS = {
+    "blaser_request_duration_seconds": (
+        "Wall time of API calls, including cache hits.",
+        "wall",
+        ("cache",),
+        "time",
+    ),
+    "blaser_time_to_first_byte_seconds": (
+        "Time until the response headers arrived.",
+        "ttfb",
+        (),
+        "time",
+    ),
+    "blaser_decode_duration_seconds": (
+        "Time spent decoding response bodies.",
+        "decode",
+        (),
+        "time",
+    ),
+    "blaser_response_size_bytes": (
+        "Length of response bodies.",
+        "size",
+        (),
+        "size",
+    ),
+}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs: Sequence[Tuple[str, str]]) -> str:
+    return ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs)
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """
+    Aggregates RequestRecords into per-endpoint histograms and counters.
+
+    A registry is a hook: pass it in a client's hooks, or share one between
+        several clients. It is safe to use from several threads.
+    """
+
+    def __init__(
+        self,
+        time_buckets: Sequence[float] = DEFAULT_TIME_BUCKETS,
+        size_buckets: Sequence[float] = DEFAULT_SIZE_BUCKETS,
+    ) -> None:
+        """
+        Args:
+          time_buckets: The bucket upper bounds, in seconds, of the time histograms
+          size_buckets: The bucket upper bounds, in bytes, of the size histogram
+        """
+        self.bounds = {"time": tuple(time_buckets), "size": tuple(size_buckets)}
+        self._histograms: Dict[str, Dict[tuple, Histogram]] = {
+            name: {} for name in _HISTOGRAMS
+        }
+        self._requests: Dict[tuple, int] = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}"
+
+    def __call__(self, record: RequestRecord) -> None:
+        self.observe(record)
+
+    def observe(self, record: RequestRecord) -> None:
+        """Adds a RequestRecord to the histograms and counters."""
+        with self._lock:
+            for name, (_, field, extra, kind) in _HISTOGRAMS.items():
+                value = getattr(record, field)
+                if value is None:
+                    continue
+                labels = (record.endpoint,) + tuple(getattr(record, f) for f in extra)
+                series = self._histograms[name]
+                histogram = series.get(labels)
+                if histogram is None:
+                    histogram = series[labels] = Histogram(self.bounds[kind])
+                histogram.observe(value)
+            key = (record.endpoint, record.cache, record.status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+
+    def reset(self) -> None:
+        with self._lock:
+            for series in self._histograms.values():
+                series.clear()
+            self._requests.clear()
+
+    def snapshot(self) -> Dict[str, dict]:
+        """
+        Summarizes everything observed so far.
+
+        Returns:
+          A dict mapping each endpoint template to a dict with "requests" (the
+              total), "cache" and "status" (counts per outcome and per status) and
+              one histogram summary per measurement ("wall", "ttfb", "decode" and
+              "size"), each with count, sum, p50, p95, p99 and buckets.
+        """
+        summary: Dict[str, dict] = {}
+        with self._lock:
+            for (endpoint, cache, status), count in self._requests.items():
+                entry = summary.setdefault(
+                    endpoint, {"requests": 0, "cache": {}, "status": {}}
+                )
+                entry["requests"] += count
+                entry["cache"][cache] = entry["cache"].get(cache, 0) + count
+                entry["status"][status] = entry["status"].get(status, 0) + count
+            for name, (_, field, extra, kind) in _HISTOGRAMS.items():
+                merged: Dict[str, Histogram] = {}
+                for labels, histogram in self._histograms[name].items():
+                    total = merged.get(labels[0])
+                    if total is None:
+                        total = merged[labels[0]] = Histogram(self.bounds[kind])
+                    total.merge(histogram)
+                for endpoint, histogram in merged.items():
+                    summary[endpoint][field] = histogram.snapshot()
+        return summary
+
+    def to_prometheus(self) -> str:
+        """Renders every series in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, (help_text, _, extra, _) in _HISTOGRAMS.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                label_names = ("endpoint",) + extra
+                for labels, histogram in sorted(self._histograms[name].items()):
+                    pairs = list(zip(label_names, labels))
+                    for bound, total in histogram.buckets():
+                        bucket = _labels(pairs + [("le", _number(bound))])
+                        lines.append(f"{name}_bucket{{{bucket}}} {total}")
+                    series = _labels(pairs)
+                    lines.append(f"{name}_sum{{{series}}} {_number(histogram.sum)}")
+                    lines.append(f"{name}_count{{{series}}} {histogram.count}")
+            name = "blaser_requests_total"
+            help_text = "API calls by endpoint, cache outcome and status."
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for (endpoint, cache, status), count in sorted(
+                self._requests.items(), key=lambda item: str(item[0])
+            ):
+                series = _labels(
+                    [("endpoint", endpoint), ("cache", cache), ("status", status or "")]
+                )
+                lines.append(f"{name}{{{series}}} {count}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Compact, typed alternatives to the raw dicts returned by the API clients.
+"""
+from typing import Any, Iterable, List
+
+
+def _to_camel(name: str) -> str:
+    first, *rest = name.split("_")
+    return first + "".join(word.capitalize() for word in rest)
+
+
+def _freeze(value: Any) -> Any:
+    """Converts nested lists into tuples, which are smaller and immutable."""
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """Converts tuples made by _freeze back into lists, as decoded from JSON."""
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+class _Nested:
+    """Exposes a raw nested value, converting it on first access."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.slot = f"_{name}"
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        try:
+            value = getattr(obj, self.slot)
+        except AttributeError:
+            return None
+        frozen = _freeze(value)
+        if frozen is not value:
+            setattr(obj, self.slot, frozen)
+        return frozen
+
+
+class Model:
+    """
+    Base class for the API models.
+
+    Subclasses list their scalar fields in __slots__ and their nested (list or dict)
+        fields in NESTED; both use snake_case names and are filled from the matching
+        camelCase (www.blaseball.com) or snake_case (blaseball-reference) keys.
+        Nested fields are stored as received and converted on first access. Fields
+        missing from the data read as None, and any unrecognized keys are kept in
+        the extra dict.
+    """
+
+    __slots__ = ("extra",)
+    NESTED = ()
+    ALIASES = {}
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        keys = {}
+        names = [s for s in cls.__dict__.get("__slots__", ()) if s != "extra"]
+        for nested in cls.NESTED:
+            setattr(cls, nested, _Nested(nested))
+        for name in names:
+            attr = name.lstrip("_") if name.lstrip("_") in cls.NESTED else name
+            keys[_to_camel(attr)] = name
+            keys[attr] = name
+        for alias, attr in cls.ALIASES.items():
+            keys[alias] = f"_{attr}" if attr in cls.NESTED else attr
+        cls._keys = keys
+        scalars = [name for name in names if not name.startswith("_")]
+        cls._attrs = tuple(scalars) + tuple(cls.NESTED)
+
+    def __init__(self, data: dict) -> None:
+        """
+        Args:
+          data: A dict as decoded from an API response
+        """
+        extra = None
+        keys = self._keys
+        for key, value in data.items():
+            slot = keys.get(key)
+            if slot is None:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+            else:
+                setattr(self, slot, value)
+        self.extra = extra
+
+    def __getattr__(self, name: str) -> Any:
+        if name in self._attrs:
+            return None
+        raise AttributeError(
+            f"'{self.__class__.__name__}' object has no attribute '{name}'"
+        )
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(id={self.id!r})"
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    @classmethod
+    def from_list(cls, items: Iterable[dict]) -> List["Model"]:
+        """Builds a list of models from a list of dicts."""
+        return [cls(item) for item in items]
+
+    def to_dict(self) -> dict:
+        """Rebuilds a dict with camelCase keys from the model."""
+        data = {}
+        for name in self._attrs:
+            value = getattr(self, name)
+            if value is not None:
+                data[_to_camel(name)] = value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def to_row(self) -> dict:
+        """
+        Rebuilds a dict with the snake_case keys of blaseball-reference rows.
+
+        Fields with an alias (e.g. player_id for id) are written under it, so a
+            model built from a reference row turns back into that row.
+        """
+        names = {attr: alias for alias, attr in self.ALIASES.items()}
+        data = {}
+        for name in self._attrs:
+            value = getattr(self, name)
+            if value is not None:
+                data[names.get(name, name)] = _thaw(value)
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+
+class Player(Model):
+    """A player, from database/players or the reference allPlayers endpoints."""
+
+    __slots__ = (
+        "id",
+        "name",
+        "league_team_id",
+        "tournament_team_id",
+        "deceased",
+        "peanut_allergy",
+        "fate",
+        "soul",
+        "total_fingers",
+        "anticapitalism",
+        "base_thirst",
+        "buoyancy",
+        "chasiness",
+        "coldness",
+        "continuation",
+        "divinity",
+        "ground_friction",
+        "indulgence",
+        "laserlikeness",
+        "martyrdom",
+        "moxie",
+        "musclitude",
+        "omniscience",
+        "overpowerment",
+        "patheticism",
+        "ruthlessness",
+        "shakespearianism",
+        "suppression",
+        "tenaciousness",
+        "thwackability",
+        "tragicness",
+        "unthwackability",
+        "watchfulness",
+        "pressurization",
+        "cinnamon",
+        "bat",
+        "armor",
+        "ritual",
+        "coffee",
+        "blood",
+        "_perm_attr",
+        "_seas_attr",
+        "_week_attr",
+        "_game_attr",
+    )
+    NESTED = ("perm_attr", "seas_attr", "week_attr", "game_attr")
+    ALIASES = {"player_id": "id", "player_name": "name", "team_id": "league_team_id"}
+
+
+class Team(Model):
+    """A team, from database/team or database/allTeams."""
+
+    __slots__ = (
+        "id",
+        "full_name",
+        "location",
+        "nickname",
+        "shorthand",
+        "slogan",
+        "emoji",
+        "main_color",
+        "secondary_color",
+        "championships",
+        "total_shames",
+        "total_shamings",
+        "season_shames",
+        "season_shamings",
+        "rotation_slot",
+        "team_spirit",
+        "card",
+        "tournament_wins",
+        "stadium",
+        "im_position",
+        "e_density",
+        "evolution",
+        "win_streak",
+        "level",
+        "_lineup",
+        "_rotation",
+        "_bullpen",
+        "_bench",
+        "_shadows",
+        "_perm_attr",
+        "_seas_attr",
+        "_week_attr",
+        "_game_attr",
+        "_state",
+    )
+    NESTED = (
+        "lineup",
+        "rotation",
+        "bullpen",
+        "bench",
+        "shadows",
+        "perm_attr",
+        "seas_attr",
+        "week_attr",
+        "game_attr",
+        "state",
+    )
+    ALIASES = {"team_id": "id"}
+
+
+class Game(Model):
+    """A game update, from database/games or database/gameById."""
+
+    __slots__ = (
+        "id",
+        "season",
+        "day",
+        "phase",
+        "is_postseason",
+        "is_title_match",
+        "series_index",
+        "series_length",
+        "game_complete",
+        "finalized",
+        "game_start",
+        "shame",
+        "weather",
+        "rules",
+        "statsheet",
+        "stadium_id",
+        "inning",
+        "top_of_inning",
+        "half_inning_outs",
+        "half_inning_score",
+        "top_inning_score",
+        "bottom_inning_score",
+        "at_bat_balls",
+        "at_bat_strikes",
+        "baserunner_count",
+        "last_update",
+        "score_update",
+        "score_ledger",
+        "play_count",
+        "repeat_count",
+        "tournament",
+        "terminology",
+        "home_team",
+        "home_team_name",
+        "home_team_nickname",
+        "home_team_color",
+        "home_team_secondary_color",
+        "home_team_emoji",
+        "home_odds",
+        "home_score",
+        "home_strikes",
+        "home_balls",
+        "home_outs",
+        "home_bases",
+        "home_pitcher",
+        "home_pitcher_name",
+        "home_pitcher_mod",
+        "home_batter",
+        "home_batter_name",
+        "home_batter_mod",
+        "home_team_batter_count",
+        "away_team",
+        "away_team_name",
+        "away_team_nickname",
+        "away_team_color",
+        "away_team_secondary_color",
+        "away_team_emoji",
+        "away_odds",
+        "away_score",
+        "away_strikes",
+        "away_balls",
+        "away_outs",
+        "away_bases",
+        "away_pitcher",
+        "away_pitcher_name",
+        "away_pitcher_mod",
+        "away_batter",
+        "away_batter_name",
+        "away_batter_mod",
+        "away_team_batter_count",
+        "_bases_occupied",
+        "_base_runners",
+        "_base_runner_names",
+        "_base_runner_mods",
+        "_outcomes",
+        "_queued_events",
+        "_state",
+    )
+    NESTED = (
+        "bases_occupied",
+        "base_runners",
+        "base_runner_names",
+        "base_runner_mods",
+        "outcomes",
+        "queued_events",
+        "state",
+    )
+
+
+class Division(Model):
+    """A division, from database/division or database/allDivisions."""
+
+    __slots__ = ("id", "name", "_teams")
+    NESTED = ("teams",)
+
+
+class League(Model):
+    """A league, from database/league."""
+
+    __slots__ = ("id", "name", "tiebreakers", "_subleagues")
+    NESTED = ("subleagues",)
+
+
+def to_models(model: type, data: Any) -> Any:
+    """
+    Converts a decoded response into models.
+
+    Args:
+      model: The Model subclass to build
+      data: A dict, or a list of dicts, as decoded from an API response
+    Returns:
+      A model, a list of models, or data unchanged if it is neither.
+    """
+    if isinstance(data, list):
+        return [model(item) if isinstance(item, dict) else item for item in data]
+    if isinstance(data, dict):
+        return model(data)
+    return data
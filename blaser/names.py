@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+A local, incrementally refreshed index of player names for instant lookups.
+"""
+from bisect import bisect_left
+import heapq
+import math
+import re
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from blaser.blaseball_api import BlaseballReferenceAPI
+
+_SPACES = re.compile(r"\s+")
+
+# (player ID, name as given) identifies an entry; a player keeps an entry for each
+# name they have been seen with.
+Key = Tuple[str, str]
+
+
+def normalize(name: str) -> str:
+    """Folds case, strips accents and collapses whitespace."""
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _SPACES.sub(" ", stripped).strip().casefold()
+
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _row_field(row: Any, *names: str) -> Any:
+    """Reads the first present field from a reference API row or model."""
+    for name in names:
+        if isinstance(row, dict):
+            if name in row:
+                return row[name]
+        elif getattr(row, name, None) is not None:
+            return getattr(row, name)
+    return None
+
+
+class PlayerNameIndex:
+    """
+    Answers player-name queries locally instead of calling playerIdsByName.
+
+    Names are matched case- and accent-insensitively. A prefix query matches the
+        start of the full name or of any word in it, and fuzzy queries rank names
+        by shared trigrams. Every result is a dict with player_id, player_name and
+        current, where current is False for a name a player no longer has.
+    """
+
+    def __init__(self, players: Optional[Iterable[Any]] = None) -> None:
+        """
+        Args:
+          players: Player rows (dicts or models) to index, e.g. the result of
+              BlaseballReferenceAPI.list_all_players() (optional)
+        """
+        self._names: Dict[str, str] = {}
+        self._current: Dict[Key, bool] = {}
+        self._full: List[Tuple[str, Key]] = []
+        self._words: List[Tuple[str, Key]] = []
+        self._trigrams: Dict[str, Set[Key]] = {}
+        self._grams: Dict[Key, Set[str]] = {}
+        self._normalized: Dict[Key, str] = {}
+        self._sources: Dict[str, Any] = {}
+        self.api = None
+        self.include_shadows = False
+        self.include_deceased = False
+        if players is not None:
+            self.update(players)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}"
+
+    def __len__(self) -> int:
+        """The number of players indexed."""
+        return len(self._names)
+
+    @classmethod
+    def from_api(
+        cls,
+        api: Optional[BlaseballReferenceAPI] = None,
+        include_shadows: bool = False,
+        include_deceased: bool = False,
+    ) -> "PlayerNameIndex":
+        """
+        Builds an index from the reference API.
+
+        Args:
+          api: The BlaseballReferenceAPI to fetch with (optional)
+          include_shadows: If True, index shadowed players too
+          include_deceased: If True, index players from list_deceased_players too
+        Returns:
+          A PlayerNameIndex, which refresh() keeps up to date.
+        """
+        index = cls()
+        index.api = api or BlaseballReferenceAPI()
+        index.include_shadows = include_shadows
+        index.include_deceased = include_deceased
+        index.refresh()
+        return index
+
+    def refresh(self) -> int:
+        """
+        Re-fetches the player lists the index was built from and applies changes.
+
+        Responses that come back unchanged (the client returns the very same object
+            for a 304 Not Modified) are skipped without being compared.
+
+        Returns:
+          The number of players whose name was added, changed or removed.
+        Raises:
+          ValueError: The index was not built with from_api.
+        """
+        if self.api is None:
+            raise ValueError("Only an index built with from_api can be refreshed.")
+        sources = {"players": self.api.list_all_players(self.include_shadows)}
+        if self.include_deceased:
+            sources["deceased"] = self.api.list_deceased_players()
+        if all(sources[k] is self._sources.get(k) for k in sources):
+            return 0
+        self._sources = sources
+        rows = [row for rows in sources.values() for row in rows or ()]
+        return self.update(rows, complete=True)
+
+    def update(self, players: Iterable[Any], complete: bool = False) -> int:
+        """
+        Indexes new players and names, leaving unchanged ones untouched.
+
+        Args:
+          players: Player rows (dicts or models)
+          complete: If True, players is the full list, and any indexed player missing
+              from it has its name marked as no longer current
+        Returns:
+          The number of players whose name was added, changed or removed.
+        """
+        seen = {}
+        for row in players:
+            player_id = _row_field(row, "player_id", "id")
+            name = _row_field(row, "player_name", "name")
+            if player_id and name:
+                seen[player_id] = name
+        changed = 0
+        added = len(self._normalized)
+        for player_id, name in seen.items():
+            old = self._names.get(player_id)
+            if old == name:
+                continue
+            if old is not None:
+                self._current[(player_id, old)] = False
+            self._names[player_id] = name
+            self._add((player_id, name))
+            changed += 1
+        if len(self._normalized) != added:
+            self._full.sort()
+            self._words.sort()
+        if complete:
+            for player_id in [p for p in self._names if p not in seen]:
+                self._current[(player_id, self._names.pop(player_id))] = False
+                changed += 1
+        return changed
+
+    def _add(self, key: Key) -> None:
+        self._current[key] = True
+        if key in self._normalized:
+            return
+        text = normalize(key[1])
+        self._normalized[key] = text
+        # Both lists are re-sorted by update().
+        self._full.append((text, key))
+        words = text.split(" ")
+        for position in range(1, len(words)):
+            self._words.append((" ".join(words[position:]), key))
+        grams = self._grams[key] = _trigrams(text)
+        for trigram in grams:
+            self._trigrams.setdefault(trigram, set()).add(key)
+
+    def _result(self, key: Key) -> dict:
+        current = self._current[key]
+        return {"player_id": key[0], "player_name": key[1], "current": current}
+
+    def _wanted(self, key: Key, current: Optional[bool]) -> bool:
+        return not current or self._current[key]
+
+    @staticmethod
+    def _starting_with(entries: List[Tuple[str, Key]], text: str):
+        """Yields the (text, key) entries whose text starts with text, in order."""
+        for position in range(bisect_left(entries, (text,)), len(entries)):
+            entry = entries[position]
+            if not entry[0].startswith(text):
+                return
+            yield entry
+
+    def lookup(self, name: str, current: Optional[bool] = False) -> List[dict]:
+        """
+        Finds players with exactly this name, like list_player_ids_by_name.
+
+        Args:
+          name: The name to look up, in any case
+          current: If True, ignore names players no longer have
+        Returns:
+          A list of result dicts.
+        """
+        text = normalize(name)
+        return [
+            self._result(key)
+            for entry_text, key in self._starting_with(self._full, text)
+            if entry_text == text and self._wanted(key, current)
+        ]
+
+    def prefix(
+        self, text: str, current: Optional[bool] = False, limit: Optional[int] = 10
+    ) -> List[dict]:
+        """
+        Finds names that start with text, or have a word that does.
+
+        Args:
+          text: The beginning of a name or of any word in it
+          current: If True, ignore names players no longer have
+          limit: The maximum number of results, None for all
+        Returns:
+          A list of result dicts: names starting with text in alphabetical order,
+              then names with a later word starting with it, ordered by that word.
+        """
+        query = normalize(text)
+        if not query:
+            return []
+        found: Dict[Key, None] = {}
+        for entries in (self._full, self._words):
+            for _, key in self._starting_with(entries, query):
+                if limit is not None and len(found) >= limit:
+                    break
+                if key not in found and self._wanted(key, current):
+                    found[key] = None
+        return [self._result(key) for key in found]
+
+    def fuzzy(
+        self,
+        text: str,
+        current: Optional[bool] = False,
+        limit: Optional[int] = 10,
+        cutoff: float = 0.4,
+    ) -> List[dict]:
+        """
+        Finds names that resemble text, tolerating typos.
+
+        Args:
+          text: The approximate name
+          current: If True, ignore names players no longer have
+          limit: The maximum number of results, None for all
+          cutoff: The lowest similarity (the Dice coefficient of the trigrams of
+              the two names, between 0 and 1) to return
+        Returns:
+          A list of result dicts, most similar first, each with its score added.
+        """
+        grams = _trigrams(normalize(text))
+        # A name scoring at least cutoff shares at least `needed` trigrams with the
+        # query, so it must contain one of the len(grams) - needed + 1 rarest ones;
+        # the common trigrams need not be looked up at all.
+        needed = max(1, math.ceil(cutoff * (len(grams) + 1) / 2))
+        rarest = sorted(grams, key=lambda g: len(self._trigrams.get(g, ())))
+        candidates = set()
+        for trigram in rarest[: len(grams) - needed + 1]:
+            candidates.update(self._trigrams.get(trigram, ()))
+        scored = []
+        for key in candidates:
+            if not self._wanted(key, current):
+                continue
+            other = self._grams[key]
+            score = 2 * len(grams & other) / (len(grams) + len(other))
+            if score >= cutoff:
+                scored.append((-score, self._normalized[key], key))
+        if limit is not None and len(scored) > limit:
+            scored = heapq.nsmallest(limit, scored)
+        else:
+            scored.sort()
+        results = []
+        for negative, _, key in scored:
+            result = self._result(key)
+            result["score"] = -negative
+            results.append(result)
+        return results
+
+    def search(
+        self, text: str, current: Optional[bool] = False, limit: int = 10
+    ) -> List[dict]:
+        """
+        Autocompletes text: prefix matches first, topped up with fuzzy matches.
+
+        Args:
+          text: What has been typed so far
+          current: If True, ignore names players no longer have
+          limit: The maximum number of results
+        Returns:
+          A list of result dicts.
+        """
+        results = self.prefix(text, current, limit)
+        if len(results) < limit:
+            seen = {(r["player_id"], r["player_name"]) for r in results}
+            for result in self.fuzzy(text, current, limit + len(results)):
+                if (result["player_id"], result["player_name"]) not in seen:
+                    del result["score"]
+                    results.append(result)
+                    if len(results) == limit:
+                        break
+        return results
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Per-host throttling, retries and adaptive concurrency shared by the API clients.
+"""
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+RETRY_STATUSES = (429, 502, 503, 504)
+
+
+class TokenBucket:
+    """A thread-safe token bucket refilled at a fixed rate."""
+
+    def __init__(self, rate: Optional[float], burst: Optional[float] = None) -> None:
+        """
+        Args:
+          rate: The number of tokens added per second; None or 0 never throttles
+          burst: The maximum number of tokens held (defaults to rate)
+        """
+        self.rate = rate
+        self.burst = burst or rate or 1
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(rate={self.rate}, burst={self.burst})"
+
+    def acquire(self, tokens: float = 1) -> float:
+        """
+        Takes tokens from the bucket, sleeping until they are available.
+
+        Returns:
+          The number of seconds spent waiting.
+        """
+        if not self.rate:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class AdaptiveConcurrency:
+    """
+    A semaphore whose limit grows and shrinks AIMD-style.
+
+    Each success raises the limit by 1/limit (about one per round of requests);
+        each error or latency spike cuts it multiplicatively. A spike is when the
+        short-term average latency exceeds latency_factor times the long-term
+        average, so a mix of fast and slow endpoints does not count as one.
+    """
+
+    def __init__(
+        self,
+        initial: int = 8,
+        minimum: int = 1,
+        maximum: int = 64,
+        decrease: float = 0.5,
+        latency_factor: float = 3.0,
+    ) -> None:
+        """
+        Args:
+          initial: The starting limit
+          minimum: The lowest the limit may fall to
+          maximum: The highest the limit may rise to
+          decrease: The factor the limit is multiplied by on an error
+          latency_factor: How many times the long-term average latency counts as a
+              spike
+        """
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.in_flight = 0
+        self._short_latency = None
+        self._long_latency = None
+        self._cond = threading.Condition()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(limit={int(self.limit)})"
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self, latency: Optional[float] = None, error: bool = False) -> None:
+        """
+        Frees a slot and adjusts the limit.
+
+        Args:
+          latency: The seconds the request took, if it completed
+          error: Whether the request failed or was throttled by the server
+        """
+        with self._cond:
+            self.in_flight -= 1
+            if latency is not None and not error:
+                if self._long_latency is None:
+                    self._short_latency = self._long_latency = latency
+                self._short_latency += 0.3 * (latency - self._short_latency)
+                self._long_latency += 0.02 * (latency - self._long_latency)
+                if self._short_latency > self._long_latency * self.latency_factor:
+                    error = True
+            if error:
+                self.limit = max(self.minimum, self.limit * self.decrease)
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parses a Retry-After header.
+
+    Args:
+      value: The header value, either delay-seconds or an HTTP-date
+    Returns:
+      The number of seconds to wait, or None if the header is absent or invalid.
+    """
+    from email.utils import parsedate_to_datetime
+
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HostLimiter:
+    """
+    Throttles, retries and adapts the concurrency of requests to one host.
+
+    Requests first take a token from the bucket and a slot from the adaptive
+        semaphore. Responses with a status in RETRY_STATUSES and exceptions listed in
+        retry_exceptions are retried up to max_retries times, waiting for the
+        server's Retry-After if it gave one and otherwise for a jittered
+        exponential backoff. A response asking for a longer wait than max_backoff
+        is returned as is rather than retried early.
+
+    Clients only use a limiter when given one; see configure_host for tuning the
+        limiter that limiter=True shares between the clients of a host.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        concurrency: Optional[AdaptiveConcurrency] = None,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        retry_exceptions: Tuple[type, ...] = (OSError,),
+    ) -> None:
+        """
+        Args:
+          rate: The sustained requests per second allowed; None does not throttle
+          burst: The number of requests allowed in a burst (defaults to rate)
+          concurrency: An AdaptiveConcurrency to bound requests in flight (optional)
+          max_retries: The number of times a request is retried
+          backoff: The base delay in seconds of the exponential backoff
+          max_backoff: The longest delay in seconds between retries; a longer
+              Retry-After ends the retries instead
+          retry_exceptions: Exception types that are retried
+        """
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = concurrency or AdaptiveConcurrency()
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_exceptions = retry_exceptions
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}"
+
+    def _delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def call(self, send: Callable[[], Any]) -> Any:
+        """
+        Sends a request through the limiter.
+
+        Args:
+          send: A callable performing the request and returning a response with
+              status_code and headers attributes
+        Returns:
+          The first response that is not retried, the last one once the retries
+              are exhausted, or one whose Retry-After exceeds max_backoff.
+        Raises:
+          Any exception in retry_exceptions once the retries are exhausted.
+        """
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            self.concurrency.acquire()
+            self._count("requests")
+            start = time.monotonic()
+            try:
+                resp = send()
+            except self.retry_exceptions:
+                self.concurrency.release(error=True)
+                if attempt >= self.max_retries:
+                    raise
+                retry_after = None
+            except BaseException:
+                self.concurrency.release(error=True)
+                raise
+            else:
+                throttled = resp.status_code in RETRY_STATUSES
+                self.concurrency.release(time.monotonic() - start, error=throttled)
+                if not throttled or attempt >= self.max_retries:
+                    return resp
+                self._count("throttled")
+                retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                if retry_after is not None and retry_after > self.max_backoff:
+                    return resp
+                # Release the connection of a streamed response before retrying.
+                close = getattr(resp, "close", None)
+                if close is not None:
+                    close()
+            self._count("retries")
+            time.sleep(self._delay(attempt, retry_after))
+            attempt += 1
+
+    @property
+    def stats(self) -> dict:
+        """A dict of request, retry and throttle counters and the current limit."""
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "concurrency": int(self.concurrency.limit),
+        }
+
+
+_limiters: Dict[str, HostLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(host: str) -> HostLimiter:
+    """
+    Returns the limiter shared by every client talking to a host, creating it with
+        default settings on first use.
+
+    Args:
+      host: A string specifying the host name, e.g. "www.blaseball.com"
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = _limiters[host] = HostLimiter()
+        return limiter
+
+
+def configure_host(host: str, **kwargs) -> HostLimiter:
+    """
+    Replaces the shared limiter for a host.
+
+    Args:
+      host: A string specifying the host name, e.g. "api.blaseball-reference.com"
+      kwargs: Passed through to HostLimiter
+    Returns:
+      The new HostLimiter.
+    """
+    limiter = HostLimiter(**kwargs)
+    with _limiters_lock:
+        _limiters[host] = limiter
+    return limiter
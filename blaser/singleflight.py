@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Coalescing of identical concurrent calls across threads or coroutines.
+"""
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class _Call:
+    """A call in flight, which waiting threads block on."""
+
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Ensures only one call per key is in flight at a time.
+
+    The first thread to call do() for a key runs the function; any thread calling
+        do() with the same key before it finishes waits and receives the same result
+        (or the same exception). Once the call finishes the key is forgotten, so
+        later calls run the function again.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}"
+
+    def __len__(self) -> int:
+        """The number of keys currently in flight."""
+        return len(self._calls)
+
+    def do(
+        self, key: Hashable, fn: Callable[..., Any], *args, **kwargs
+    ) -> Tuple[Any, bool]:
+        """
+        Runs fn(*args, **kwargs) unless an identical call is already in flight.
+
+        Args:
+          key: A hashable identifying the call
+          fn: The function to call
+        Returns:
+          A tuple of (result, shared), where shared is True if the result came from
+              another thread's call.
+        Raises:
+          Any exception raised by fn, in the calling thread and every waiter.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+class AsyncSingleFlight:
+    """
+    The asyncio counterpart of SingleFlight, for coroutines on one event loop.
+
+    The first coroutine to call do() for a key awaits the function; any coroutine
+        calling do() with the same key before it finishes awaits the same future.
+        If the first caller is cancelled, the next waiter runs the function itself
+        instead of being cancelled too.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, Any] = {}
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}"
+
+    def __len__(self) -> int:
+        """The number of keys currently in flight."""
+        return len(self._calls)
+
+    async def do(
+        self, key: Hashable, fn: Callable[..., Awaitable], *args, **kwargs
+    ) -> Tuple[Any, bool]:
+        """
+        Awaits fn(*args, **kwargs) unless an identical call is already in flight.
+
+        Args:
+          key: A hashable identifying the call
+          fn: The coroutine function to call
+        Returns:
+          A tuple of (result, shared), where shared is True if the result came from
+              another coroutine's call.
+        Raises:
+          Any exception raised by fn, in the calling coroutine and every waiter.
+        """
+        import asyncio
+
+        while key in self._calls:
+            future = self._calls[key]
+            try:
+                # Shielded, so a cancelled waiter does not cancel everyone else.
+                return await asyncio.shield(future), True
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+        future = self._calls[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await fn(*args, **kwargs)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Marks the exception as retrieved, in case nobody was waiting.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            del self._calls[key]
+        return result, False
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+A local store of day-by-day player snapshots, kept as a base plus deltas.
+
+Player attributes barely change from one day to the next, so a season is stored
+as one full snapshot of every player on its first stored day, plus for each later
+day only the fields of the players that changed. Reading "as of" a day replays the
+deltas up to it onto the base, all from a local SQLite file.
+"""
+import json
+import sqlite3
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from blaser.blaseball_api import BlaseballReferenceAPI
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    id INTEGER PRIMARY KEY,
+    player_id TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS days (
+    season INTEGER NOT NULL,
+    day INTEGER NOT NULL,
+    players INTEGER NOT NULL,
+    PRIMARY KEY (season, day)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS bases (
+    season INTEGER NOT NULL,
+    player INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (season, player)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS deltas (
+    season INTEGER NOT NULL,
+    player INTEGER NOT NULL,
+    day INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (season, player, day)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS deltas_day ON deltas (season, day);
+"""
+
+# A player's state: their row as returned by allPlayersForGameday.
+Row = Dict[str, Any]
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), sort_keys=True)
+
+
+def _player_key(row: Row) -> Optional[str]:
+    return row.get("player_id", row.get("id"))
+
+
+def diff(old: Optional[Row], new: Optional[Row]) -> Optional[list]:
+    """
+    Computes the delta turning one row into another.
+
+    Returns:
+      None if nothing changed, otherwise a list of [changed fields, removed keys];
+          a removed player is [None, None].
+    """
+    if new is None:
+        return None if old is None else [None, None]
+    if old is None:
+        return [new, []]
+    changed = {k: v for k, v in new.items() if k not in old or old[k] != v}
+    removed = [k for k in old if k not in new]
+    if not changed and not removed:
+        return None
+    return [changed, removed]
+
+
+def apply(row: Optional[Row], delta: list) -> Optional[Row]:
+    """Applies a delta from diff to a row, returning the new row or None."""
+    changed, removed = delta
+    if changed is None:
+        return None
+    row = dict(row or {})
+    row.update(changed)
+    for key in removed:
+        row.pop(key, None)
+    return row
+
+
+class PlayerSnapshots:
+    """
+    An SQLite file holding the player list of every stored day.
+
+    Days of a season must be added in increasing order; the first one becomes the
+        season's base snapshot. Every read is answered locally.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+          path: A string specifying the database file to create or open
+        """
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(_SCHEMA)
+        self._ids: Dict[str, int] = dict(
+            self.conn.execute("SELECT player_id, id FROM players")
+        )
+        # The latest stored state of each season written to through this object.
+        self._latest: Dict[int, Tuple[int, Dict[str, Row]]] = {}
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.path!r})"
+
+    def __enter__(self) -> "PlayerSnapshots":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _player_ids(self, player_ids: Iterable[str]) -> Dict[str, int]:
+        """Maps player IDs to their compact integer keys, adding new ones."""
+        new = [(p,) for p in dict.fromkeys(player_ids) if p not in self._ids]
+        if new:
+            self.conn.executemany("INSERT INTO players (player_id) VALUES (?)", new)
+            self._ids.update(
+                self.conn.execute(
+                    "SELECT player_id, id FROM players WHERE id > ?",
+                    (max(self._ids.values(), default=0),),
+                )
+            )
+        return self._ids
+
+    def days(self, season: int) -> List[int]:
+        """Lists the stored days of a season in order."""
+        rows = self.conn.execute(
+            "SELECT day FROM days WHERE season = ? ORDER BY day", (season,)
+        )
+        return [day for (day,) in rows]
+
+    def seasons(self) -> List[int]:
+        """Lists the seasons with at least one stored day."""
+        rows = self.conn.execute("SELECT DISTINCT season FROM days ORDER BY season")
+        return [season for (season,) in rows]
+
+    def add_day(self, season: int, day: int, players: Iterable[Any]) -> int:
+        """
+        Stores the player list of a day.
+
+        Args:
+          season: The season number
+          day: The day number; it must come after every stored day of the season
+          players: The player rows of that day, as dicts or models; models are
+              stored as the reference rows they came from (see Model.to_row)
+        Returns:
+          The number of players whose row changed since the previous stored day.
+        Raises:
+          ValueError: A later day of the season is already stored.
+        """
+        rows = {}
+        for row in players:
+            if not isinstance(row, dict):
+                row = row.to_row()
+            rows[_player_key(row)] = row
+        rows.pop(None, None)
+        stored = self.days(season)
+        if stored and day <= stored[-1]:
+            raise ValueError(
+                f"Day {day} of season {season} is not after the last stored day."
+            )
+        with self.conn:
+            keys = self._player_ids(rows)
+            if not stored:
+                self.conn.executemany(
+                    "INSERT INTO bases VALUES (?, ?, ?)",
+                    [(season, keys[p], _dumps(row)) for p, row in rows.items()],
+                )
+                changed = len(rows)
+            else:
+                previous = self._state(season, stored[-1])
+                deltas = []
+                for player_id in set(previous) | set(rows):
+                    delta = diff(previous.get(player_id), rows.get(player_id))
+                    if delta is not None:
+                        deltas.append((season, keys[player_id], day, _dumps(delta)))
+                self.conn.executemany("INSERT INTO deltas VALUES (?, ?, ?, ?)", deltas)
+                changed = len(deltas)
+            self.conn.execute(
+                "INSERT INTO days VALUES (?, ?, ?)", (season, day, len(rows))
+            )
+        self._latest[season] = (day, rows)
+        return changed
+
+    def _state(self, season: int, day: int) -> Dict[str, Row]:
+        latest = self._latest.get(season)
+        if latest is not None and latest[0] == day:
+            return latest[1]
+        return self.as_of(season, day)
+
+    def _names(self) -> Dict[int, str]:
+        return {key: player_id for player_id, key in self._ids.items()}
+
+    def _first_day(self, season: int) -> Optional[int]:
+        return self.conn.execute(
+            "SELECT MIN(day) FROM days WHERE season = ?", (season,)
+        ).fetchone()[0]
+
+    def as_of(self, season: int, day: int) -> Dict[str, Row]:
+        """
+        Reads every player's row as of a day.
+
+        Args:
+          season: The season number
+          day: The day number; a day after the last stored day reads as that day
+        Returns:
+          A dict mapping player IDs to their rows, empty if day precedes the
+              season's first stored day.
+        """
+        first = self._first_day(season)
+        if first is None or day < first:
+            return {}
+        names = self._names()
+        bases = self.conn.execute(
+            "SELECT player, data FROM bases WHERE season = ?", (season,)
+        )
+        state = {names[player]: json.loads(data) for player, data in bases}
+        deltas = self.conn.execute(
+            "SELECT player, data FROM deltas WHERE season = ? AND day <= ? "
+            "ORDER BY day",
+            (season, day),
+        )
+        for player, data in deltas:
+            self._apply(state, names[player], json.loads(data))
+        return state
+
+    @staticmethod
+    def _apply(state: Dict[str, Row], player_id: str, delta: list) -> None:
+        row = apply(state.get(player_id), delta)
+        if row is None:
+            state.pop(player_id, None)
+        else:
+            state[player_id] = row
+
+    def roster(self, season: int, day: int, team_id: str) -> Dict[str, Row]:
+        """Reads the rows of the players on a team as of a day."""
+        state = self.as_of(season, day)
+        return {p: row for p, row in state.items() if row.get("team_id") == team_id}
+
+    def player(self, player_id: str, season: int, day: int) -> Optional[Row]:
+        """
+        Reads one player's row as of a day.
+
+        Returns:
+          The row, or None if the player was not in that day's player list.
+        """
+        for _, row in self.history(player_id, season, start=day, end=day):
+            return row
+        return None
+
+    def history(
+        self,
+        player_id: str,
+        season: int,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+    ) -> Iterator[Tuple[int, Optional[Row]]]:
+        """
+        Yields a player's row as of start, then on every later day it changed.
+
+        Args:
+          player_id: A string specifying the player ID
+          season: The season number
+          start: The first day (defaults to the season's first stored day)
+          end: The last day (defaults to the last stored day)
+        Returns:
+          An iterator of (day, row) tuples; row is None while the player is absent
+              from the player list.
+        """
+        key = self._ids.get(player_id)
+        first = self._first_day(season)
+        if key is None or first is None:
+            return
+        start = first if start is None else max(start, first)
+        if end is not None and end < start:
+            return
+        base = self.conn.execute(
+            "SELECT data FROM bases WHERE season = ? AND player = ?", (season, key)
+        ).fetchone()
+        row = json.loads(base[0]) if base else None
+        query = "SELECT day, data FROM deltas WHERE season = ? AND player = ?"
+        params: tuple = (season, key)
+        if end is not None:
+            query += " AND day <= ?"
+            params += (end,)
+        emitted = False
+        for day, data in self.conn.execute(query + " ORDER BY day", params):
+            if day > start and not emitted:
+                yield start, row
+                emitted = True
+            row = apply(row, json.loads(data))
+            if emitted:
+                yield day, row
+        if not emitted:
+            yield start, row
+
+    def scan(
+        self, season: int, start: Optional[int] = None, end: Optional[int] = None
+    ) -> Iterator[Tuple[int, Dict[str, Row]]]:
+        """
+        Yields the state of every player on each stored day of a range.
+
+        The state is rebuilt once for start and then moved forward a day at a time,
+            so scanning a range costs little more than one as_of read.
+
+        Args:
+          season: The season number
+          start: The first day (defaults to the season's first stored day)
+          end: The last day (defaults to the last stored day)
+        Returns:
+          An iterator of (day, state) tuples, where each state is a dict like the
+              one returned by as_of.
+        """
+        days = [
+            day
+            for day in self.days(season)
+            if (start is None or day >= start) and (end is None or day <= end)
+        ]
+        if not days:
+            return
+        names = self._names()
+        state = self.as_of(season, days[0])
+        yield days[0], dict(state)
+        deltas = self.conn.execute(
+            "SELECT day, player, data FROM deltas WHERE season = ? AND day > ? "
+            "AND day <= ? ORDER BY day",
+            (season, days[0], days[-1]),
+        )
+        by_day: Dict[int, list] = {}
+        for day, player, data in deltas:
+            by_day.setdefault(day, []).append((names[player], json.loads(data)))
+        for day in days[1:]:
+            for player_id, delta in by_day.get(day, ()):
+                self._apply(state, player_id, delta)
+            yield day, dict(state)
+
+    def fetch(
+        self,
+        season: int,
+        days: Optional[Iterable[int]] = None,
+        api: Optional[BlaseballReferenceAPI] = None,
+    ) -> int:
+        """
+        Downloads and stores days not yet in the store.
+
+        Args:
+          season: The season number
+          days: The day numbers to fetch; by default every day after the last stored
+              one is fetched until a day comes back empty
+          api: The BlaseballReferenceAPI to fetch with (optional)
+        Returns:
+          The number of days added.
+        """
+        api = api or BlaseballReferenceAPI()
+        stored = self.days(season)
+        added = 0
+        if days is None:
+            day = stored[-1] + 1 if stored else 1
+            while True:
+                players = api.list_all_players_for_gameday(season, day)
+                if not players:
+                    return added
+                self.add_day(season, day, players)
+                added += 1
+                day += 1
+        for day in sorted(set(days) - set(stored)):
+            self.add_day(season, day, api.list_all_players_for_gameday(season, day))
+            added += 1
+        return added
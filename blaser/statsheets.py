@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Bulk statsheet retrieval with decoding spread over several processes.
+
+Decoding and flattening a season of statsheets holds the GIL, so a single process
+tops out at one core however fast the downloads are. StatsheetLoader downloads
+chunks of statsheets on threads and hands each raw response body to a process
+pool as soon as it arrives. The pool decodes it, flattens each sheet into a tuple
+of the requested fields and sends back only those tuples.
+"""
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import as_completed
+from functools import lru_cache
+import inspect
+import os
+import re
+import sys
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from blaser.blaseball_api import BlaseballAPI, _chunks
+from blaser.decoders import get_decoder
+
+GAME_FIELDS = (
+    "id",
+    "home_team_stats",
+    "away_team_stats",
+    "home_team_runs_by_inning",
+    "away_team_runs_by_inning",
+    "home_team_total_batters",
+    "away_team_total_batters",
+)
+TEAM_FIELDS = (
+    "id",
+    "team_id",
+    "name",
+    "games_played",
+    "wins",
+    "losses",
+    "player_stats",
+)
+PLAYER_FIELDS = (
+    "id",
+    "player_id",
+    "team_id",
+    "team",
+    "name",
+    "at_bats",
+    "caught_stealing",
+    "doubles",
+    "earned_runs",
+    "ground_into_dp",
+    "hit_batters",
+    "hit_by_pitch",
+    "hits",
+    "hits_allowed",
+    "home_runs",
+    "losses",
+    "outs_recorded",
+    "pitches_thrown",
+    "quadruples",
+    "rbis",
+    "runs",
+    "stolen_bases",
+    "strikeouts",
+    "struckouts",
+    "triples",
+    "walks",
+    "walks_issued",
+    "wins",
+)
+
+# The endpoints BlaseballAPI.get_*_statsheets request.
+REQUESTS = {
+    "game": "database/gameStatSheet",
+    "team": "database/teamStatSheets",
+    "player": "database/playerSeasonStats",
+}
+
+FIELDS = {"game": GAME_FIELDS, "team": TEAM_FIELDS, "player": PLAYER_FIELDS}
+
+_CAPITALS = re.compile(r"(?<!^)(?=[A-Z])")
+
+
+@lru_cache(maxsize=1024)
+def _snake(name: str) -> str:
+    return _CAPITALS.sub("_", name).lower()
+
+
+def _compact(value: Any) -> Any:
+    """Interns strings and turns lists into tuples, recursively."""
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, list):
+        return tuple(_compact(item) for item in value)
+    return value
+
+
+def flatten(sheet: dict, prefix: str = "") -> Dict[str, Any]:
+    """
+    Flattens a statsheet into a single-level dict with snake_case keys.
+
+    Nested objects are joined with underscores, so {"a": {"bC": 1}} becomes
+        {"a_b_c": 1}. Lists become tuples and strings are interned, which lets the
+        many repeated team and player names share memory (and a single pickle
+        entry when a chunk is sent back from a worker process).
+
+    Args:
+      sheet: A decoded statsheet
+      prefix: A string to put before every key
+    Returns:
+      A dict mapping the flattened keys to their values.
+    """
+    flat = {}
+    for key, value in sheet.items():
+        name = prefix + _snake(key)
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}_"))
+        else:
+            flat[name] = _compact(value)
+    return flat
+
+
+def _decode_chunk(
+    body: bytes, ids: List[str], fields: Tuple[str, ...], decoder: Optional[str]
+) -> List[tuple]:
+    """
+    Decodes a response body into rows; runs in a worker process.
+
+    Returns:
+      A list with a tuple of the field values per statsheet, in the order of ids.
+    """
+    data = get_decoder(decoder)(body)
+    sheets = data if isinstance(data, list) else [data]
+    rows = []
+    for sheet in sheets:
+        if isinstance(sheet, dict):
+            flat = flatten(sheet)
+            rows.append(tuple(flat.get(field) for field in fields))
+    if "id" in fields:
+        column = fields.index("id")
+        position = {sheet_id: index for index, sheet_id in enumerate(ids)}
+        rows.sort(key=lambda row: position.get(row[column], len(ids)))
+    return rows
+
+
+class StatsheetTable(NamedTuple):
+    """
+    Flattened statsheets, one tuple per sheet.
+
+    Attributes:
+      fields: The names of the values in each row
+      rows: A list of tuples of values, in the order the statsheets were requested
+    """
+
+    fields: Tuple[str, ...]
+    rows: List[tuple]
+
+    def column(self, field: str) -> tuple:
+        """Returns the values of one field, one per row."""
+        index = self.fields.index(field)
+        return tuple(row[index] for row in self.rows)
+
+    def columns(self) -> Dict[str, tuple]:
+        """Returns a dict mapping each field to a tuple of its values."""
+        values = zip(*self.rows) if self.rows else [()] * len(self.fields)
+        return dict(zip(self.fields, values))
+
+
+class StatsheetLoader:
+    """
+    Fetches game, team and player statsheets in bulk.
+
+    IDs are requested in chunks of chunk_size, up to the client's max_workers at a
+        time. Each chunk is decoded and flattened in a pool of worker processes,
+        which is started on first use and shut down by close(). With processes=0,
+        chunks are decoded on the calling thread instead.
+    """
+
+    def __init__(
+        self,
+        api: Optional[BlaseballAPI] = None,
+        processes: Optional[int] = None,
+        decoder: Optional[str] = None,
+        chunk_size: Optional[int] = None,
+    ) -> None:
+        """
+        Args:
+          api: The blocking BlaseballAPI to download with (optional)
+          processes: The number of worker processes (defaults to one per CPU), or 0
+              to decode without a pool
+          decoder: The name of the decoder the workers use, e.g. "orjson" (defaults
+              to the fastest installed)
+          chunk_size: The number of statsheets per request (defaults to the
+              client's chunk_size)
+        Raises:
+          ValueError: processes is negative or api is an asynchronous client.
+        """
+        self.api = api or BlaseballAPI()
+        if inspect.iscoroutinefunction(self.api._get):
+            raise ValueError("StatsheetLoader needs a blocking BlaseballAPI.")
+        if processes is not None and processes < 0:
+            raise ValueError("'processes' must not be negative.")
+        self.processes = (os.cpu_count() or 1) if processes is None else processes
+        self.decoder = decoder
+        self.chunk_size = chunk_size or self.api.chunk_size
+        self._pool = None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}"
+
+    def __enter__(self) -> "StatsheetLoader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shuts down the worker processes, if any were started."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _decode(self, body: bytes, ids: List[str], fields: Tuple[str, ...]) -> Future:
+        args = (body, ids, fields, self.decoder)
+        if not self.processes:
+            future = Future()
+            future.set_result(_decode_chunk(*args))
+            return future
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.processes)
+        return self._pool.submit(_decode_chunk, *args)
+
+    def load(
+        self, kind: str, ids: Iterable[str], fields: Optional[Tuple[str, ...]] = None
+    ) -> StatsheetTable:
+        """
+        Fetches statsheets of one kind.
+
+        Args:
+          kind: One of "game", "team" or "player"
+          ids: The statsheet IDs; duplicates are fetched once
+          fields: The flattened fields to keep (defaults to GAME_FIELDS,
+              TEAM_FIELDS or PLAYER_FIELDS)
+        Returns:
+          A StatsheetTable.
+        Raises:
+          ValueError: kind is not a known statsheet kind.
+        """
+        if kind not in REQUESTS:
+            raise ValueError(f"'kind' must be one of {list(REQUESTS)}.")
+        fields = tuple(fields or FIELDS[kind])
+        ids = [i for i in dict.fromkeys(ids) if i]
+        if not ids:
+            return StatsheetTable(fields, [])
+        chunks = _chunks(ids, self.chunk_size)
+        decoded = [None] * len(chunks)
+        workers = min(self.api.max_workers, len(chunks))
+        with ThreadPoolExecutor(max_workers=workers) as downloads:
+            bodies = {
+                downloads.submit(
+                    self.api._get_bytes, REQUESTS[kind], {"ids": ",".join(chunk)}
+                ): index
+                for index, chunk in enumerate(chunks)
+            }
+            for future in as_completed(bodies):
+                index = bodies[future]
+                decoded[index] = self._decode(future.result(), chunks[index], fields)
+        rows = []
+        for future in decoded:
+            rows.extend(future.result())
+        return StatsheetTable(fields, rows)
+
+    def games(
+        self, ids: Iterable[str], fields: Optional[Tuple[str, ...]] = None
+    ) -> StatsheetTable:
+        """Fetches game statsheets; see load."""
+        return self.load("game", ids, fields)
+
+    def teams(
+        self, ids: Iterable[str], fields: Optional[Tuple[str, ...]] = None
+    ) -> StatsheetTable:
+        """Fetches team statsheets; see load."""
+        return self.load("team", ids, fields)
+
+    def players(
+        self, ids: Iterable[str], fields: Optional[Tuple[str, ...]] = None
+    ) -> StatsheetTable:
+        """Fetches player statsheets; see load."""
+        return self.load("player", ids, fields)
+
+    def load_all(
+        self, game_statsheet_ids: Iterable[str]
+    ) -> Dict[str, StatsheetTable]:
+        """
+        Fetches game statsheets with every team and player statsheet under them.
+
+        Args:
+          game_statsheet_ids: The statsheet IDs of the games, e.g. the "statsheet"
+              field of every game of a season
+        Returns:
+          A dict with a StatsheetTable under each of "game", "team" and "player".
+        """
+        games = self.games(game_statsheet_ids)
+        team_ids = games.column("home_team_stats") + games.column("away_team_stats")
+        teams = self.teams(team_ids)
+        player_ids = [i for ids in teams.column("player_stats") if ids for i in ids]
+        return {"game": games, "team": teams, "player": self.players(player_ids)}
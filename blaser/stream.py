@@ -0,0 +1,656 @@
+#!/usr/bin/env python3
+"""
+Helpers for consuming the streamData Server-sent Events feed.
+"""
+from collections import OrderedDict
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional, Tuple
+
+from blaser.decoders import Decoder, get_decoder
+
+# Friendly names for the id-keyed collections found in streamData.
+COLLECTION_KINDS = {
+    "schedule": "game",
+    "tomorrowSchedule": "game",
+    "leagues": "league",
+    "subleagues": "subleague",
+    "divisions": "division",
+    "teams": "team",
+    "tiebreakers": "tiebreaker",
+    "stadiums": "stadium",
+}
+
+# What a BufferedStream does with a new event when its buffer is full.
+BLOCK = "block"
+DROP_OLDEST = "drop_oldest"
+COALESCE = "coalesce"
+POLICIES = (BLOCK, DROP_OLDEST, COALESCE)
+
+DEFAULT_BUFFER_SIZE = 16
+
+
+class StreamChange(NamedTuple):
+    """
+    A single change between two streamData snapshots.
+
+    Attributes:
+      op: One of "add", "update", "remove" for objects in id-keyed collections, or
+          "set" for any other value
+      path: A tuple of keys locating the collection or value in the snapshot
+      id: The ID of the added, updated or removed object, or None for "set"
+      value: The new object for "add", a dict of the changed fields for "update"
+          (removed fields map to None), None for "remove", or the new value for
+          "set"
+    """
+
+    op: str
+    path: Tuple[str, ...]
+    id: Optional[str]
+    value: Any
+
+    @property
+    def kind(self) -> str:
+        """What changed, e.g. "game" or "team", or the name of the changed key."""
+        if not self.path:
+            return "snapshot"
+        return COLLECTION_KINDS.get(self.path[-1], self.path[-1])
+
+
+def _is_keyed(value: Any) -> bool:
+    """Returns True for a non-empty list of objects that all carry an ID."""
+    return (
+        isinstance(value, list)
+        and bool(value)
+        and all(isinstance(item, dict) and "id" in item for item in value)
+    )
+
+
+def _changed_fields(old: dict, new: dict) -> dict:
+    """Returns the top-level fields of new that differ from old."""
+    fields = {key: value for key, value in new.items() if old.get(key) != value}
+    for key in old.keys() - new.keys():
+        fields[key] = None
+    return fields
+
+
+def diff_snapshots(
+    old: Any, new: Any, path: Tuple[str, ...] = ()
+) -> List[StreamChange]:
+    """
+    Works out the structured changes between two streamData snapshots.
+
+    Dicts are compared key by key and lists of objects with an "id" are matched up by
+        ID, so an updated game or team is reported once with just its changed
+        fields. Anything else that differs is reported as a "set" of its new value.
+
+    Args:
+      old: The previous snapshot, or None if there was none
+      new: The current snapshot
+      path: The keys leading to old and new, used when recursing
+    Returns:
+      A list of StreamChange, empty if nothing changed.
+    """
+    if old == new:
+        return []
+    if isinstance(old, dict) and isinstance(new, dict):
+        changes = []
+        for key in new:
+            if key not in old:
+                changes.append(StreamChange("set", path + (key,), None, new[key]))
+            elif old[key] != new[key]:
+                changes.extend(diff_snapshots(old[key], new[key], path + (key,)))
+        for key in old.keys() - new.keys():
+            changes.append(StreamChange("set", path + (key,), None, None))
+        return changes
+    if _is_keyed(old) and _is_keyed(new):
+        before = {item["id"]: item for item in old}
+        changes = []
+        for item in new:
+            previous = before.pop(item["id"], None)
+            if previous is None:
+                changes.append(StreamChange("add", path, item["id"], item))
+            elif previous != item:
+                fields = _changed_fields(previous, item)
+                changes.append(StreamChange("update", path, item["id"], fields))
+        for object_id in before:
+            changes.append(StreamChange("remove", path, object_id, None))
+        return changes
+    return [StreamChange("set", path, None, new)]
+
+
+class DeltaStream:
+    """
+    Wraps a stream of full snapshots so that iterating yields only what changed.
+
+    Each item yielded is the list of StreamChange between one event and the next;
+        events that change nothing are skipped. The first event is yielded as a
+        single "set" of the whole snapshot. The latest full snapshot is always
+        available as the snapshot attribute.
+    """
+
+    def __init__(self, messages: Iterable[dict]) -> None:
+        """
+        Args:
+          messages: An iterable (or async iterable) of decoded streamData events
+        """
+        self.messages = messages
+        self.snapshot = None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}"
+
+    def _advance(self, message: dict) -> List[StreamChange]:
+        if self.snapshot is None:
+            changes = [StreamChange("set", (), None, message)]
+        else:
+            changes = diff_snapshots(self.snapshot, message)
+        self.snapshot = message
+        return changes
+
+    def __iter__(self):
+        for message in self.messages:
+            changes = self._advance(message)
+            if changes:
+                yield changes
+
+    async def __aiter__(self):
+        async for message in self.messages:
+            changes = self._advance(message)
+            if changes:
+                yield changes
+
+
+# Put on a subscriber's queue when the hub closes.
+CLOSED = object()
+
+
+class Subscription:
+    """
+    A blocking iterator over the events a StreamHub receives.
+
+    Iteration ends once the subscription or its hub is closed.
+    """
+
+    def __init__(self, hub: "StreamHub", events: Optional[queue.Queue] = None) -> None:
+        """
+        Args:
+          hub: The StreamHub delivering the events
+          events: The queue to deliver events to (defaults to a new, unbounded one)
+        """
+        self.hub = hub
+        self.queue = queue.Queue() if events is None else events
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}"
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _deliver(self, event: Any) -> None:
+        self.queue.put(event)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> dict:
+        event = self.queue.get()
+        if event is CLOSED:
+            raise StopIteration
+        return event
+
+    def get(self, timeout: Optional[float] = None) -> dict:
+        """
+        Waits for the next event.
+
+        Raises:
+          queue.Empty: No event arrived within timeout seconds.
+          StopIteration: The subscription is closed.
+        """
+        event = self.queue.get(timeout=timeout)
+        if event is CLOSED:
+            raise StopIteration
+        return event
+
+    def close(self) -> None:
+        """Stops receiving events and ends iteration."""
+        if self.hub._unsubscribe(self):
+            self._deliver(CLOSED)
+
+
+class AsyncSubscription(Subscription):
+    """
+    A Subscription iterated with async for, on the loop it was created in.
+
+    Events wait in a bounded queue; when a slow subscriber lets it fill up, the
+        oldest unread event is dropped to make room, so the hub never blocks on
+        one subscriber and memory stays bounded.
+    """
+
+    def __init__(self, hub: "StreamHub", maxsize: int = DEFAULT_BUFFER_SIZE) -> None:
+        """
+        Args:
+          hub: The StreamHub delivering the events
+          maxsize: The most unread events to hold
+
+        Attributes:
+          dropped: The number of events discarded unread because the queue was full
+        Raises:
+          RuntimeError: No event loop is running in this thread.
+          ValueError: maxsize is less than 1.
+        """
+        import asyncio
+
+        if maxsize < 1:
+            raise ValueError("'maxsize' must be at least 1.")
+        try:
+            self.loop = asyncio.get_running_loop()
+        except RuntimeError:
+            raise RuntimeError(
+                "An AsyncSubscription must be created from a running event loop."
+            ) from None
+        super().__init__(hub, asyncio.Queue(maxsize))
+        self.dropped = 0
+
+    def _put(self, event: Any) -> None:
+        # Runs on the loop, so nothing else touches the queue in between.
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    def _deliver(self, event: Any) -> None:
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The loop has been closed; nobody is left to read the event.
+            pass
+
+    def __iter__(self):
+        raise TypeError("Use 'async for' with an AsyncSubscription.")
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> dict:
+        event = await self.queue.get()
+        if event is CLOSED:
+            raise StopAsyncIteration
+        return event
+
+
+class StreamHub:
+    """
+    Shares one upstream Server-sent Events connection between many subscribers.
+
+    A background thread reads the stream, decodes each event once, and hands the
+        same object to every subscription, so subscribers must not modify it. If
+        the connection drops or fails, the thread reconnects with exponential
+        backoff, sending the ID of the last event seen as Last-Event-ID.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[Optional[str]], Iterable],
+        decoder: Optional[Decoder] = None,
+        retry: float = 3.0,
+        max_retry: float = 60.0,
+    ) -> None:
+        """
+        Args:
+          connect: A callable taking the last event ID (or None) and returning an
+              iterable of messages with id and data attributes, such as an SSEClient
+          decoder: A callable decoding each message's data; by default the fastest
+              one installed
+          retry: The seconds to wait before the first reconnection attempt
+          max_retry: The most seconds to wait between reconnection attempts
+
+        Attributes:
+          latest: The most recent event, or None
+          last_event_id: The ID of the most recent message that carried one
+          events: The number of events received
+          reconnects: The number of times the connection was re-established
+          errors: The number of connection or decoding errors
+        """
+        self.connect = connect
+        self.decode = get_decoder(decoder)
+        self.retry = retry
+        self.max_retry = max_retry
+        self.latest = None
+        self.last_event_id = None
+        self.events = 0
+        self.reconnects = 0
+        self.errors = 0
+        self._subscribers: List[Subscription] = []
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._thread = None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}"
+
+    def __enter__(self) -> "StreamHub":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed.is_set()
+
+    def subscribe(
+        self, events: Optional[queue.Queue] = None, latest: bool = True
+    ) -> Subscription:
+        """
+        Starts receiving events, connecting upstream if this is the first subscriber.
+
+        Args:
+          events: A queue to put events on (defaults to a new, unbounded one);
+              CLOSED is put on it when the subscription or hub closes
+          latest: If True, the most recent event is delivered first, so a late
+              subscriber starts from a full snapshot
+        Returns:
+          A Subscription, which can be iterated.
+        """
+        return self._add(Subscription(self, events), latest)
+
+    def subscribe_async(
+        self, latest: bool = True, maxsize: int = DEFAULT_BUFFER_SIZE
+    ) -> AsyncSubscription:
+        """
+        Like subscribe, but returns a subscription iterated with async for.
+
+        Must be called from the event loop the subscription will be read on.
+
+        Args:
+          latest: If True, the most recent event is delivered first
+          maxsize: The most unread events to hold before the oldest is dropped
+        Returns:
+          An AsyncSubscription, which can be iterated with async for.
+        Raises:
+          RuntimeError: No event loop is running in this thread.
+        """
+        return self._add(AsyncSubscription(self, maxsize), latest)
+
+    def _add(self, subscription: Subscription, latest: bool) -> Subscription:
+        if self.closed:
+            raise ValueError("The hub is closed.")
+        with self._lock:
+            self._subscribers.append(subscription)
+            if latest and self.latest is not None:
+                subscription._deliver(self.latest)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription) -> bool:
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+                return True
+        return False
+
+    def _publish(self, event: Any) -> None:
+        with self._lock:
+            self.latest = event
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription._deliver(event)
+
+    def _run(self) -> None:
+        delay = self.retry
+        while not self.closed:
+            try:
+                for message in self.connect(self.last_event_id):
+                    if self.closed:
+                        return
+                    if getattr(message, "id", None):
+                        self.last_event_id = message.id
+                    if not message.data:
+                        continue
+                    try:
+                        event = self.decode(message.data)
+                    except ValueError:
+                        self.errors += 1
+                        continue
+                    self.events += 1
+                    delay = self.retry
+                    self._publish(event)
+            except Exception:
+                self.errors += 1
+            if self._closed.wait(delay):
+                return
+            delay = min(delay * 2, self.max_retry)
+            self.reconnects += 1
+
+    def close(self) -> None:
+        """Disconnects and ends every subscription."""
+        if self.closed:
+            return
+        self._closed.set()
+        with self._lock:
+            subscribers, self._subscribers = self._subscribers, []
+        for subscription in subscribers:
+            subscription._deliver(CLOSED)
+
+
+class BufferedStream:
+    """
+    Reads a stream into a bounded buffer on a background thread (or task).
+
+    The reader keeps draining the connection while the consumer is busy, so a slow
+        consumer no longer stalls the socket until the server drops it. When the
+        buffer is full, the policy decides what happens to a new event:
+
+    - BLOCK: the reader waits for room; nothing is lost, but the connection stalls
+    - DROP_OLDEST: the oldest unread event is discarded to make room
+    - COALESCE: a new event replaces the unread event with the same key, keeping
+      its place in the buffer. By default every event shares one key, so a stream
+      of full snapshots only ever holds the latest one, which carries the latest
+      state of every game; wrapped in a DeltaStream, each game's changes since the
+      consumer last read are then reported once.
+
+    Iterating with for reads on a daemon thread and with async for on a task of the
+        running loop. Errors raised by the underlying stream are raised to the
+        consumer once the buffer has been drained.
+    """
+
+    def __init__(
+        self,
+        messages: Iterable,
+        maxsize: int = DEFAULT_BUFFER_SIZE,
+        policy: str = BLOCK,
+        key: Optional[Callable[[Any], Any]] = None,
+    ) -> None:
+        """
+        Args:
+          messages: An iterable (or async iterable) of events, e.g. decoded
+              streamData snapshots or a Subscription
+          maxsize: The most unread events to hold
+          policy: One of BLOCK, DROP_OLDEST or COALESCE
+          key: For COALESCE, a callable returning the key of an event; events with
+              equal keys replace each other (defaults to one key for all events)
+
+        Attributes:
+          received: The number of events read from the stream
+          delivered: The number of events handed to the consumer
+          dropped: The number of events discarded unread, whether evicted or
+              replaced by a newer one
+          lag: Seconds the most recently delivered event waited in the buffer
+          max_lag: The longest any delivered event waited in the buffer
+        Raises:
+          ValueError: maxsize is less than 1 or policy is unknown.
+        """
+        if maxsize < 1:
+            raise ValueError("'maxsize' must be at least 1.")
+        if policy not in POLICIES:
+            raise ValueError(f"'policy' must be one of {list(POLICIES)}.")
+        self.messages = messages
+        self.maxsize = maxsize
+        self.policy = policy
+        self.key = key
+        self.received = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self._buffer: OrderedDict = OrderedDict()
+        self._closed = False
+        self._done = False
+        self._error: Optional[BaseException] = None
+        self._condition = None
+        self._reader = None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}"
+
+    def __enter__(self) -> "BufferedStream":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def backlog(self) -> int:
+        """The number of events waiting to be read."""
+        return len(self._buffer)
+
+    def _key(self, event: Any) -> Any:
+        if self.policy != COALESCE:
+            return self.received
+        return None if self.key is None else self.key(event)
+
+    def _offer(self, key: Any, event: Any) -> bool:
+        """
+        Buffers an event as the policy allows; the caller holds the condition.
+
+        Returns:
+          False if the event must wait for room, True once it has been buffered.
+        """
+        if key in self._buffer:
+            # Only COALESCE reuses keys; the old event is superseded in place and
+            # the lag is still measured from when its key first started waiting.
+            arrived, _ = self._buffer[key]
+            self._buffer[key] = (arrived, event)
+            self.dropped += 1
+            return True
+        if len(self._buffer) >= self.maxsize:
+            if self.policy == BLOCK:
+                return False
+            self._buffer.popitem(last=False)
+            self.dropped += 1
+        self._buffer[key] = (time.monotonic(), event)
+        return True
+
+    def _take(self) -> Any:
+        _, (arrived, event) = self._buffer.popitem(last=False)
+        self.delivered += 1
+        self.lag = time.monotonic() - arrived
+        self.max_lag = max(self.max_lag, self.lag)
+        return event
+
+    def _read(self) -> None:
+        iterator = iter(self.messages)
+        try:
+            for event in iterator:
+                with self._condition:
+                    self.received += 1
+                    key = self._key(event)
+                    while not self._closed and not self._offer(key, event):
+                        self._condition.wait()
+                    if self._closed:
+                        return
+                    self._condition.notify_all()
+        except Exception as error:
+            self._error = error
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+            with self._condition:
+                self._done = True
+                self._condition.notify_all()
+
+    def __iter__(self):
+        if self._reader is not None:
+            raise ValueError("A BufferedStream can only be iterated once.")
+        self._condition = threading.Condition()
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+        try:
+            while True:
+                with self._condition:
+                    while not (self._buffer or self._done or self._closed):
+                        self._condition.wait()
+                    if self._closed or not self._buffer:
+                        break
+                    event = self._take()
+                    self._condition.notify_all()
+                yield event
+            if self._error is not None and not self._closed:
+                raise self._error
+        finally:
+            self.close()
+
+    async def _aread(self) -> None:
+        try:
+            async for event in self.messages:
+                async with self._condition:
+                    self.received += 1
+                    key = self._key(event)
+                    while not self._closed and not self._offer(key, event):
+                        await self._condition.wait()
+                    if self._closed:
+                        return
+                    self._condition.notify_all()
+        except Exception as error:
+            self._error = error
+        finally:
+            if isinstance(self.messages, Subscription):
+                self.messages.close()
+            async with self._condition:
+                self._done = True
+                self._condition.notify_all()
+
+    async def __aiter__(self):
+        import asyncio
+
+        if self._reader is not None:
+            raise ValueError("A BufferedStream can only be iterated once.")
+        self._condition = asyncio.Condition()
+        self._reader = asyncio.ensure_future(self._aread())
+        try:
+            while True:
+                async with self._condition:
+                    while not (self._buffer or self._done or self._closed):
+                        await self._condition.wait()
+                    if self._closed or not self._buffer:
+                        break
+                    event = self._take()
+                    self._condition.notify_all()
+                yield event
+            if self._error is not None and not self._closed:
+                raise self._error
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """
+        Stops reading and ends iteration, discarding any unread events.
+
+        A reader waiting on the network notices once the next event arrives.
+        """
+        self._closed = True
+        if isinstance(self.messages, Subscription):
+            self.messages.close()
+        if isinstance(self._reader, threading.Thread):
+            with self._condition:
+                self._condition.notify_all()
+        elif self._reader is not None:
+            self._reader.cancel()
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+An append-only, memory-mapped log of streamData events for recording and replay.
+
+A log is three files written side by side, each starting with an 8-byte magic:
+
+  <path>        the events, each as a little-endian uint32 length and float64
+                timestamp followed by the event's JSON
+  <path>.idx    one (float64 timestamp, uint64 offset) pair per event, so any
+                timestamp is found by binary search
+  <path>.games  one (uint32 event number, 36-byte game ID) pair for each game that
+                changed in an event
+
+All three are only ever appended to, so a log can be read while it is recorded,
+and a recording cut short by a crash loses at most its last event.
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+import json
+import mmap
+import os
+import struct
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from blaser.decoders import Decoder, get_decoder
+
+LOG_MAGIC = b"BLSRLOG1"
+INDEX_MAGIC = b"BLSRIDX1"
+GAMES_MAGIC = b"BLSRGAM1"
+
+_RECORD = struct.Struct("<Id")
+_INDEX = struct.Struct("<dQ")
+_GAME = struct.Struct("<I36s")
+
+
+def _schedule(event: Any) -> List[dict]:
+    """Returns the games of a streamData event, or an empty list."""
+    try:
+        games = event["value"]["games"]["schedule"]
+    except (KeyError, TypeError):
+        return []
+    return games if isinstance(games, list) else []
+
+
+def _open_append(path: str, magic: bytes):
+    """Opens a file for appending, writing its magic if it is new."""
+    f = open(path, "ab")
+    if f.tell() == 0:
+        f.write(magic)
+    return f
+
+
+class StreamRecorder:
+    """
+    Appends streamData events to a log.
+
+    Events may be given as decoded dicts or as the raw JSON received. Each is
+        written as-is (dicts are encoded once), and the games that changed since
+        the previous event are noted in the game index.
+    """
+
+    def __init__(self, path: str, decoder: Union[str, Decoder, None] = None) -> None:
+        """
+        Args:
+          path: A string specifying the log file to create or append to
+          decoder: The decoder used to find the games in raw events; by default the
+              fastest one installed
+        """
+        self.path = path
+        self.decode = get_decoder(decoder)
+        self._log = _open_append(path, LOG_MAGIC)
+        self._index = _open_append(f"{path}.idx", INDEX_MAGIC)
+        self._games = _open_append(f"{path}.games", GAMES_MAGIC)
+        self.count = (self._index.tell() - len(INDEX_MAGIC)) // _INDEX.size
+        self._previous: Dict[str, dict] = {}
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.path!r})"
+
+    def __enter__(self) -> "StreamRecorder":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def append(
+        self, event: Union[dict, bytes, str], timestamp: Optional[float] = None
+    ) -> int:
+        """
+        Writes one event to the log.
+
+        Args:
+          event: A decoded streamData event, or its raw JSON
+          timestamp: The time the event was received, in seconds since the epoch
+              (defaults to now)
+        Returns:
+          The number of the event in the log.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        if isinstance(event, dict):
+            payload = json.dumps(event, separators=(",", ":")).encode("utf-8")
+        else:
+            payload = event.encode("utf-8") if isinstance(event, str) else event
+            event = self.decode(payload)
+        number = self.count
+        offset = self._log.tell()
+        self._log.write(_RECORD.pack(len(payload), timestamp))
+        self._log.write(payload)
+        self._index.write(_INDEX.pack(timestamp, offset))
+        for game in _schedule(event):
+            game_id = game.get("id")
+            if game_id and self._previous.get(game_id) != game:
+                self._previous[game_id] = game
+                self._games.write(_GAME.pack(number, game_id.encode("ascii")))
+        self.count += 1
+        return number
+
+    def record(
+        self, events: Iterable[Union[dict, bytes, str]], limit: Optional[int] = None
+    ) -> int:
+        """
+        Appends events from a stream until it ends or limit events are written.
+
+        Args:
+          events: An iterable of events, such as BlaseballAPI().stream_data()
+          limit: The maximum number of events to record (optional)
+        Returns:
+          The number of events recorded.
+        """
+        recorded = 0
+        for event in events:
+            self.append(event)
+            recorded += 1
+            if limit is not None and recorded >= limit:
+                break
+        self.flush()
+        return recorded
+
+    def flush(self) -> None:
+        """Makes everything appended so far visible to readers."""
+        # The log is flushed first so the index never points past its end.
+        for f in (self._log, self._index, self._games):
+            f.flush()
+
+    def close(self) -> None:
+        self.flush()
+        for f in (self._log, self._index, self._games):
+            f.close()
+
+
+def _map(path: str, magic: bytes) -> Optional[mmap.mmap]:
+    """Maps a file read-only, or returns None if it holds nothing but its magic."""
+    with open(path, "rb") as f:
+        if f.read(len(magic)) != magic:
+            raise ValueError(f"{path} is not a stream log file.")
+        if os.fstat(f.fileno()).st_size == len(magic):
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class StreamLog:
+    """
+    Reads a log written by StreamRecorder through memory maps.
+
+    Raw events are returned as memoryviews into the map, so nothing is copied until
+        an event is decoded, and only one decoded event is held at a time while
+        replaying.
+    """
+
+    def __init__(self, path: str, decoder: Union[str, Decoder, None] = None) -> None:
+        """
+        Args:
+          path: A string specifying the log file
+          decoder: The decoder used for events; by default the fastest one installed
+        Raises:
+          ValueError: The files are not a stream log.
+        """
+        self.path = path
+        self.decode = get_decoder(decoder)
+        self._log = _map(path, LOG_MAGIC)
+        self._view = memoryview(self._log) if self._log is not None else None
+        self.timestamps = array("d")
+        self.offsets = array("Q")
+        index = _map(f"{path}.idx", INDEX_MAGIC)
+        if index is not None:
+            size = len(self._log) if self._log is not None else 0
+            with index:
+                end = len(INDEX_MAGIC) + (
+                    (len(index) - len(INDEX_MAGIC)) // _INDEX.size * _INDEX.size
+                )
+                for timestamp, offset in _INDEX.iter_unpack(
+                    index[len(INDEX_MAGIC) : end]
+                ):
+                    if offset + _RECORD.size > size:
+                        break
+                    length, _ = _RECORD.unpack_from(self._log, offset)
+                    if offset + _RECORD.size + length > size:
+                        break
+                    self.timestamps.append(timestamp)
+                    self.offsets.append(offset)
+        self._game_events: Dict[str, array] = {}
+        games = _map(f"{path}.games", GAMES_MAGIC)
+        if games is not None:
+            with games:
+                end = len(GAMES_MAGIC) + (
+                    (len(games) - len(GAMES_MAGIC)) // _GAME.size * _GAME.size
+                )
+                entries = _GAME.iter_unpack(games[len(GAMES_MAGIC) : end])
+                for number, game_id in entries:
+                    if number < len(self.offsets):
+                        key = game_id.rstrip(b"\0").decode("ascii")
+                        self._game_events.setdefault(key, array("I")).append(number)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.path!r})"
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __enter__(self) -> "StreamLog":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._log is not None:
+            self._view.release()
+            try:
+                self._log.close()
+            except BufferError:
+                # Views from raw() are still alive; the map closes once they go.
+                pass
+            self._log = None
+
+    def raw(self, number: int) -> memoryview:
+        """Returns the JSON of an event as a memoryview into the log."""
+        offset = self.offsets[number]
+        length, _ = _RECORD.unpack_from(self._log, offset)
+        start = offset + _RECORD.size
+        return self._view[start : start + length]
+
+    def event(self, number: int) -> dict:
+        """Decodes an event."""
+        view = self.raw(number)
+        try:
+            return self.decode(view)
+        except TypeError:
+            # json.loads does not accept memoryviews
+            return self.decode(bytes(view))
+
+    @property
+    def games(self) -> List[str]:
+        """The IDs of every game seen in the log."""
+        return list(self._game_events)
+
+    def seek(self, timestamp: float) -> int:
+        """Returns the number of the first event received at or after timestamp."""
+        return bisect_left(self.timestamps, timestamp)
+
+    def _span(self, start: Optional[float], end: Optional[float]) -> Tuple[int, int]:
+        first = 0 if start is None else self.seek(start)
+        last = len(self) if end is None else bisect_right(self.timestamps, end)
+        return first, last
+
+    def iter_raw(
+        self, start: Optional[float] = None, end: Optional[float] = None
+    ) -> Iterator[Tuple[float, memoryview]]:
+        """
+        Yields (timestamp, raw JSON) for each event between two times.
+
+        Args:
+          start: The earliest timestamp to yield (optional)
+          end: The latest timestamp to yield (optional)
+        """
+        first, last = self._span(start, end)
+        for number in range(first, last):
+            yield self.timestamps[number], self.raw(number)
+
+    def replay(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        game: Optional[str] = None,
+    ) -> Iterator[Tuple[float, dict]]:
+        """
+        Yields (timestamp, event) for each event between two times.
+
+        Args:
+          start: The earliest timestamp to yield (optional)
+          end: The latest timestamp to yield (optional)
+          game: A game ID; if given, only the events in which that game changed are
+              read, and the game's own dict is yielded instead of the whole event
+        """
+        first, last = self._span(start, end)
+        if game is None:
+            for number in range(first, last):
+                yield self.timestamps[number], self.event(number)
+            return
+        numbers = self._game_events.get(game, array("I"))
+        for position in range(bisect_left(numbers, first), len(numbers)):
+            number = numbers[position]
+            if number >= last:
+                break
+            for item in _schedule(self.event(number)):
+                if item.get("id") == game:
+                    yield self.timestamps[number], item
+                    break
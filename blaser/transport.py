@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+Pluggable HTTP transports for the blocking API clients.
+
+A transport is any object with a get(url, params=None, headers=None, stream=False)
+method returning a requests.Response-like object (status_code, ok, headers,
+content, elapsed, raw and raise_for_status). The clients send every request
+through their transport, so one can be tuned, shared between clients or replaced:
+
+- RequestsTransport: a requests session with a sized connection pool
+- HTTPXTransport: an httpx client speaking HTTP/2 (``pip install blaser[http2]``)
+- ReplayTransport: serves responses recorded to a directory, without any network
+
+requests itself is only imported once a RequestsTransport is created or an error
+response is raised, keeping it out of the import of the clients.
+"""
+from datetime import timedelta
+import hashlib
+import io
+import json
+import os
+import tempfile
+import time
+from typing import TYPE_CHECKING, Any, Iterator, Optional, Union
+
+from blaser.cache import cache_key
+
+if TYPE_CHECKING:
+    import requests
+
+DEFAULT_POOL_SIZE = 10
+
+# Response headers that describe the transfer rather than the recorded body.
+_TRANSFER_HEADERS = {
+    "connection",
+    "content-encoding",
+    "content-length",
+    "keep-alive",
+    "transfer-encoding",
+}
+_CONDITIONAL_HEADERS = {"if-none-match", "if-modified-since"}
+
+
+def accept_encoding(compression: Union[bool, str] = True) -> str:
+    """
+    Builds an Accept-Encoding header value.
+
+    Args:
+      compression: True for every encoding that can be decoded here (gzip and
+          deflate, plus br when brotli is installed), False for none, or a
+          comma-separated string of encodings such as "br, gzip"
+    Returns:
+      A string for the Accept-Encoding header.
+    Raises:
+      ValueError: An encoding was asked for that cannot be decoded here.
+    """
+    from urllib3.util import make_headers
+
+    supported = make_headers(accept_encoding=True)["accept-encoding"].split(",")
+    if compression is True:
+        return ", ".join(supported)
+    if not compression:
+        return "identity"
+    encodings = [e.strip() for e in compression.split(",") if e.strip()]
+    unsupported = [e for e in encodings if e not in supported and e != "identity"]
+    if unsupported:
+        raise ValueError(
+            f"Cannot decode {', '.join(unsupported)}; "
+            "br needs the brotli package (pip install blaser[brotli])."
+        )
+    return ", ".join(encodings)
+
+
+def _http_error(response: Any) -> Exception:
+    """Builds the requests.HTTPError a requests.Response would raise."""
+    import requests
+
+    message = f"{response.status_code} Error for url: {response.url}"
+    return requests.HTTPError(message, response=response)
+
+
+class Transport:
+    """Base class for transports; see the module docstring for the interface."""
+
+    # A requests.Session for the Server Sent Event streams, or None to let
+    # sseclient open its own connections.
+    session = None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}"
+
+    def __enter__(self) -> "Transport":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def get(
+        self,
+        url: str,
+        params: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        stream: bool = False,
+    ):
+        """
+        Performs an HTTP GET request.
+
+        Args:
+          url: A string containing the full URL of the request
+          params: A dict containing the params to URL-encode into the URI (optional)
+          headers: A dict of request headers (optional)
+          stream: If True, leave the body unread so it can be consumed from raw
+        Returns:
+          A requests.Response-like object.
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Releases the transport's connections."""
+
+
+class RequestsTransport(Transport):
+    """
+    Sends requests through a requests session with a tunable connection pool.
+
+    Pass the same instance to several clients to have them share one pool, and
+        with it their open (and already TLS-negotiated) connections.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        compression: Union[bool, str] = True,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """
+        Args:
+          pool_size: The maximum number of connections kept open per host; size it
+              to the number of threads making requests to avoid pool exhaustion
+          pool_block: If True, wait for a free connection when the pool is
+              exhausted instead of opening and discarding an extra one
+          keep_alive: If False, close each connection after its response
+          compression: The encodings to negotiate; see accept_encoding
+          timeout: The number of seconds to wait for the server (optional)
+        Raises:
+          ValueError: pool_size is less than 1 or compression cannot be decoded.
+        """
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        if pool_size < 1:
+            raise ValueError("'pool_size' must be at least 1.")
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, pool_block=pool_block
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["Accept-Encoding"] = accept_encoding(compression)
+        if not keep_alive:
+            self.session.headers["Connection"] = "close"
+
+    def get(
+        self,
+        url: str,
+        params: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        stream: bool = False,
+    ) -> "requests.Response":
+        return self.session.get(
+            url, params=params, headers=headers, stream=stream, timeout=self.timeout
+        )
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class _IteratorReader(io.RawIOBase):
+    """A read-only file object over an iterator of byte strings."""
+
+    def __init__(self, chunks: Iterator[bytes]) -> None:
+        self._chunks = chunks
+        self._buffer = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._buffer:
+            self._buffer = next(self._chunks, None)
+            if self._buffer is None:
+                self._buffer = b""
+                return 0
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+class _HTTPXResponse:
+    """Presents an httpx response with the requests.Response attributes used."""
+
+    def __init__(self, response, elapsed: timedelta) -> None:
+        self._response = response
+        self.elapsed = elapsed
+        self.status_code = response.status_code
+        self.ok = response.status_code < 400
+        self.headers = response.headers
+        self.url = str(response.url)
+        self._raw = None
+
+    def __enter__(self) -> "_HTTPXResponse":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def content(self) -> bytes:
+        return self._response.read()
+
+    @property
+    def raw(self) -> io.RawIOBase:
+        if self._raw is None:
+            self._raw = _IteratorReader(self._response.iter_bytes())
+        return self._raw
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        if not self.ok:
+            raise _http_error(self)
+
+    def close(self) -> None:
+        self._response.close()
+
+
+class HTTPXTransport(Transport):
+    """
+    Sends requests through an httpx client, over HTTP/2 where the server offers it.
+
+    HTTP/2 multiplexes concurrent requests over a single connection per host.
+        Requires the optional ``httpx`` dependency with its ``h2`` extra
+        (``pip install blaser[http2]``).
+    """
+
+    def __init__(
+        self,
+        http2: bool = True,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        keep_alive: bool = True,
+        compression: Union[bool, str] = True,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """
+        Args:
+          http2: If False, only speak HTTP/1.1
+          pool_size: The maximum number of connections open at once
+          keep_alive: If False, close each connection after its response
+          compression: The encodings to negotiate; see accept_encoding
+          timeout: The number of seconds to wait for the server (optional)
+        Raises:
+          ImportError: httpx (or h2, for HTTP/2) is not installed.
+          ValueError: pool_size is less than 1 or compression cannot be decoded.
+        """
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError(
+                "HTTPXTransport requires httpx (pip install blaser[http2])."
+            ) from None
+        if pool_size < 1:
+            raise ValueError("'pool_size' must be at least 1.")
+        limits = httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size if keep_alive else 0,
+        )
+        self.client = httpx.Client(
+            http2=http2,
+            limits=limits,
+            headers={"Accept-Encoding": accept_encoding(compression)},
+            timeout=timeout,
+        )
+
+    def get(
+        self,
+        url: str,
+        params: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        stream: bool = False,
+    ) -> _HTTPXResponse:
+        request = self.client.build_request("GET", url, params=params, headers=headers)
+        # Like requests, report the time until the headers arrived as elapsed.
+        start = time.perf_counter()
+        response = self.client.send(request, stream=True)
+        elapsed = timedelta(seconds=time.perf_counter() - start)
+        if not stream:
+            response.read()
+        return _HTTPXResponse(response, elapsed)
+
+    def close(self) -> None:
+        self.client.close()
+
+
+class ReplayMissError(LookupError):
+    """A ReplayTransport was asked for a request that was never recorded."""
+
+
+class _ReplayResponse:
+    """A recorded response, served with the requests.Response attributes used."""
+
+    elapsed = timedelta(0)
+
+    def __init__(
+        self, url: str, status_code: int, headers: dict, content: bytes
+    ) -> None:
+        from requests.structures import CaseInsensitiveDict
+
+        self.url = url
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self.raw = io.BytesIO(content)
+
+    def __enter__(self) -> "_ReplayResponse":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        if not self.ok:
+            raise _http_error(self)
+
+    def close(self) -> None:
+        self.raw.close()
+
+
+class ReplayTransport(Transport):
+    """
+    Serves responses recorded to a directory, with no network access at all.
+
+    Each request (URL plus params) is stored in its own file, named after a hash of
+        the request, holding a line of JSON metadata followed by the body. In record
+        mode, requests that have no recording yet are sent through an upstream
+        transport and saved; otherwise they raise ReplayMissError.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        record: bool = False,
+        upstream: Optional[Transport] = None,
+    ) -> None:
+        """
+        Args:
+          directory: A string specifying the directory of recordings
+          record: If True, record requests that are missing
+          upstream: The transport to record through (defaults to a new
+              RequestsTransport)
+        """
+        self.directory = directory
+        self.record = record
+        self.upstream = upstream
+        if record:
+            os.makedirs(directory, exist_ok=True)
+            if upstream is None:
+                self.upstream = RequestsTransport()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.directory!r})"
+
+    def path(self, url: str, params: Optional[dict] = None) -> str:
+        """Returns the path of the recording for a request."""
+        digest = hashlib.sha1(cache_key(url, params).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.response")
+
+    def get(
+        self,
+        url: str,
+        params: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        stream: bool = False,
+    ) -> _ReplayResponse:
+        """
+        Serves a request from its recording.
+
+        Raises:
+          ReplayMissError: The request was not recorded and record mode is off.
+        """
+        path = self.path(url, params)
+        try:
+            with open(path, "rb") as f:
+                meta = json.loads(f.readline())
+                return _ReplayResponse(url, meta["status"], meta["headers"], f.read())
+        except FileNotFoundError:
+            if not self.record:
+                raise ReplayMissError(f"No recording for {url} {params}") from None
+        # Recordings must hold complete bodies, never a 304 for validators that
+        # only this process has seen.
+        headers = {
+            k: v
+            for k, v in (headers or {}).items()
+            if k.lower() not in _CONDITIONAL_HEADERS
+        }
+        resp = self.upstream.get(url, params=params, headers=headers)
+        status, content = resp.status_code, resp.content
+        kept = {
+            k: v for k, v in resp.headers.items() if k.lower() not in _TRANSFER_HEADERS
+        }
+        meta = {"url": url, "params": params, "status": status, "headers": kept}
+        fd, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(json.dumps(meta, default=str).encode("utf-8") + b"\n")
+            f.write(content)
+        os.replace(temporary, path)
+        return _ReplayResponse(url, status, kept, content)
+
+    def close(self) -> None:
+        if self.record:
+            self.upstream.close()
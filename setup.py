@@ -59,7 +59,7 @@ about = {}
 with open(os.path.join(HERE, "blaser", "__version__.py"), "r", encoding="utf-8") as f:
     exec(f.read(), about)
 
-packages = find_packages(exclude=["tests"])
+packages = find_packages(exclude=["tests", "benchmarks"])
 
 setup(
     author=about["__author__"],
@@ -68,7 +68,14 @@ setup(
     cmdclass={"test": PyTest},
     description=about["__description__"],
     download_url="{about['__github_url__']}/archive/{about['__version__']}.zip",
-    extras_require={"docs": ["Sphinx", "SimpleHTTPServer", "sphinx_rtd_theme"]},
+    extras_require={
+        "async": ["aiohttp"],
+        "brotli": ["brotli"],
+        "docs": ["Sphinx", "SimpleHTTPServer", "sphinx_rtd_theme"],
+        "fast": ["orjson"],
+        "http2": ["httpx[http2]"],
+        "numpy": ["numpy"],
+    },
     entry_points={},
     include_package_data=True,
     install_requires=requirements,
@@ -79,7 +86,7 @@ setup(
     package_dir={"blaser": "blaser"},
     packages=packages,
     project_urls=about["__urls__"],
-    python_requires=">=3.6",
+    python_requires=">=3.7",
     tests_require=test_requires,
     url=about["__url__"],
     version=about["__version__"],
@@ -1,5 +1,10 @@
 #!/usr/bin/env python3
 
+from datetime import timedelta
+import json
+
+import requests
+
 from blaser.blaseball_api import BlaseballAPI, BlaseballReferenceAPI
 
 
@@ -34,3 +39,33 @@ STANDINGS_ID = "48789741-69b1-4aa9-a46c-eda3351a3f5e"
 SUBLEAGUE_ID = "7d3a3dd6-9ea1-4535-9d91-bde875c85e80"
 TEAM_ID = "23e4cbc1-e9cd-47fa-a35b-bfa06f726cb7"
 TIEBREAKER_ID = "72a618ed-c61c-4162-a455-3959a2d0e738"
+
+
+class FakeResponse:
+    def __init__(self, data, status_code=200, headers=None):
+        self.data = data
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.headers = headers or {}
+        self.elapsed = timedelta(milliseconds=5)
+
+    @property
+    def content(self):
+        return json.dumps(self.data).encode("utf-8")
+
+    def json(self):
+        return self.data
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.HTTPError(f"{self.status_code} Error")
+
+
+class FakeSession:
+    def __init__(self, data):
+        self.data = data
+        self.calls = 0
+
+    def get(self, url, params=None, headers=None):
+        self.calls += 1
+        return FakeResponse(self.data)
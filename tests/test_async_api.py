@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+
+import asyncio
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web  # noqa: E402
+
+from blaser.async_api import (  # noqa: E402
+    AsyncBlaseballAPI,
+    AsyncBlaseballReferenceAPI,
+    _encode_params,
+)
+
+from . import PLAYER_IDS, TEAM_ID  # noqa: E402
+
+
+async def _serve(handler):
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def test_repr():
+    assert repr(AsyncBlaseballAPI()) == "AsyncBlaseballAPI"
+    assert repr(AsyncBlaseballReferenceAPI()) == "AsyncBlaseballReferenceAPI"
+
+
+def test_invalid_concurrency():
+    with pytest.raises(ValueError):
+        AsyncBlaseballAPI(concurrency=0)
+
+
+def test_blocking_options_rejected():
+    with pytest.raises(TypeError):
+        AsyncBlaseballAPI(transport=object())
+    with pytest.raises(TypeError):
+        AsyncBlaseballReferenceAPI(transport=object())
+    with pytest.raises(TypeError):
+        AsyncBlaseballAPI(limiter=True)
+    assert AsyncBlaseballAPI(limiter=False).limiter is None
+    assert AsyncBlaseballAPI().limiter is None
+
+
+def test_iter_raw_data_unsupported():
+    with pytest.raises(TypeError):
+        AsyncBlaseballReferenceAPI().iter_raw_data(8)
+
+
+def test__encode_params():
+    params = _encode_params({"ids": ["a", "b"], "current": False, "season": None})
+    assert params == [("ids", "a"), ("ids", "b"), ("current", "False")]
+
+
+def test_get_team_info_awaitable():
+    async def handler(request):
+        return web.json_response({"path": request.path, **request.query})
+
+    async def run():
+        runner, url = await _serve(handler)
+        try:
+            async with AsyncBlaseballAPI(concurrency=2) as api:
+                api.base_url = url
+                results = await asyncio.gather(
+                    api.get_team_info(TEAM_ID), api.get_player_info(PLAYER_IDS)
+                )
+        finally:
+            await runner.cleanup()
+        return results
+
+    team, players = asyncio.run(run())
+    assert team == {"path": "/database/team", "id": TEAM_ID}
+    assert players[0]["ids"] == ",".join(PLAYER_IDS)
+
+
+def test_get_raises_for_status():
+    async def handler(request):
+        return web.Response(status=404)
+
+    async def run():
+        runner, url = await _serve(handler)
+        try:
+            async with AsyncBlaseballReferenceAPI() as api:
+                api.base_url = url
+                await api.get_game_events()
+        finally:
+            await runner.cleanup()
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        asyncio.run(run())
+
+
+def test_get_player_info_gathers_chunks():
+    async def handler(request):
+        ids = request.query["ids"].split(",")
+        return web.json_response([{"id": i} for i in reversed(ids)])
+
+    async def run():
+        runner, url = await _serve(handler)
+        try:
+            async with AsyncBlaseballAPI(chunk_size=3) as api:
+                api.base_url = url
+                return await api.get_player_info(ids)
+        finally:
+            await runner.cleanup()
+
+    ids = [f"player-{i}" for i in range(10)]
+    assert [p["id"] for p in asyncio.run(run())] == ids
+
+
+def test_conditional_get():
+    async def handler(request):
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.json_response({"idols": []}, headers={"ETag": '"v1"'})
+
+    async def run():
+        runner, url = await _serve(handler)
+        try:
+            async with AsyncBlaseballAPI() as api:
+                api.base_url = url
+                first = await api.list_idol_leaderboard()
+                second = await api.list_idol_leaderboard()
+        finally:
+            await runner.cleanup()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert second is first
+
+
+def test_models():
+    async def handler(request):
+        return web.json_response({"id": request.query["id"], "fullName": "Tacos"})
+
+    async def run():
+        runner, url = await _serve(handler)
+        try:
+            async with AsyncBlaseballAPI(models=True) as api:
+                api.base_url = url
+                return await api.get_team_info(TEAM_ID)
+        finally:
+            await runner.cleanup()
+
+    team = asyncio.run(run())
+    assert (team.id, team.full_name) == (TEAM_ID, "Tacos")
+
+
+def test_hooks_receive_records():
+    async def handler(request):
+        if request.path.endswith("missing"):
+            return web.Response(status=404)
+        return web.json_response({"id": TEAM_ID})
+
+    records = []
+
+    async def run():
+        runner, url = await _serve(handler)
+        try:
+            async with AsyncBlaseballAPI(hooks=[records.append]) as api:
+                api.base_url = url
+                await api.get_game_by_id(TEAM_ID)
+                with pytest.raises(aiohttp.ClientResponseError):
+                    await api.get_game_by_id("missing")
+        finally:
+            await runner.cleanup()
+
+    asyncio.run(run())
+    ok, failed = records
+    assert (ok.endpoint, ok.cache, ok.status) == ("database/gameById/{id}", "miss", 200)
+    assert ok.ttfb is not None and ok.decode is not None and ok.size > 0
+    assert (failed.endpoint, failed.cache, failed.status) == (
+        "database/gameById/missing",
+        "error",
+        404,
+    )
+
+
+def test_identical_requests_share_one_call():
+    calls = []
+
+    async def handler(request):
+        calls.append(request.path)
+        await asyncio.sleep(0.1)
+        return web.json_response({"day": 1})
+
+    records = []
+
+    async def run():
+        runner, url = await _serve(handler)
+        try:
+            async with AsyncBlaseballAPI(hooks=[records.append]) as api:
+                api.base_url = url
+                return await asyncio.gather(
+                    *(api.get_simulation_data() for _ in range(5))
+                )
+        finally:
+            await runner.cleanup()
+
+    results = asyncio.run(run())
+    assert calls == ["/database/simulationData"]
+    assert all(result is results[0] for result in results)
+    assert sorted(r.cache for r in records) == ["coalesced"] * 4 + ["miss"]
+
+
+def test_iter_game_events_pages():
+    offsets = []
+
+    async def handler(request):
+        offset, limit = int(request.query["offset"]), int(request.query["limit"])
+        offsets.append(offset)
+        assert request.query["eventType"] == "OUT"
+        events = [{"id": n} for n in range(7)][offset : offset + limit]
+        return web.json_response({"count": len(events), "results": events})
+
+    async def run():
+        runner, url = await _serve(handler)
+        try:
+            async with AsyncBlaseballReferenceAPI() as api:
+                api.base_url = url
+                events = api.iter_game_events(event_type="OUT", page_size=3)
+                return [event["id"] async for event in events]
+        finally:
+            await runner.cleanup()
+
+    assert asyncio.run(run()) == list(range(7))
+    assert offsets == [0, 3, 6]
+
+
+def test_unexpected_not_modified_is_refetched():
+    async def handler(request):
+        if request.headers.get("Cache-Control") == "no-cache":
+            return web.json_response({"id": TEAM_ID})
+        return web.Response(status=304)
+
+    async def run():
+        runner, url = await _serve(handler)
+        try:
+            async with AsyncBlaseballAPI() as api:
+                api.base_url = url
+                return await api.get_team_info(TEAM_ID)
+        finally:
+            await runner.cleanup()
+
+    assert asyncio.run(run()) == {"id": TEAM_ID}
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+import os
+import threading
+
+import pytest
+
+from blaser.blaseball_api import BlaseballAPI
+from blaser.cache import (
+    CachePolicy,
+    DiskCache,
+    LRUCache,
+    NO_CACHE,
+    ResponseCache,
+    cache_key,
+)
+
+from . import GAME_ID, TEAM_ID, FakeSession
+
+
+def test_cache_key_sorts_params():
+    assert cache_key("u", {"b": 1, "a": 2}) == cache_key("u", {"a": 2, "b": 1})
+    assert cache_key("u") == "u"
+
+
+def test_lru_evicts_oldest():
+    lru = LRUCache(maxsize=2)
+    lru.set("a", 1, None)
+    lru.set("b", 2, None)
+    lru.get("a")
+    lru.set("c", 3, None)
+    assert lru.get("b")[0] is False
+    assert lru.get("a")[1] == 1
+    assert lru.evictions == 1
+
+
+def test_lru_invalid_size():
+    with pytest.raises(ValueError):
+        LRUCache(maxsize=0)
+
+
+def test_policy_for():
+    cache = ResponseCache()
+    assert cache.policy_for(f"database/gameById/{GAME_ID}").is_final is not None
+    assert cache.policy_for("database/simulationData").ttl == 5
+    assert cache.policy_for("/data/events").ttl == 3600
+    assert cache.policy_for("pleebis") is NO_CACHE
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("blaser.cache.time.time", lambda: now[0])
+    cache = ResponseCache(policies={"thing": CachePolicy(ttl=10)})
+    cache.set("thing", "k", {"a": 1})
+    assert cache.get("thing", "k") == (True, {"a": 1})
+    now[0] += 11
+    assert cache.get("thing", "k") == (False, None)
+    assert cache.stats["hits"] == 1
+    assert cache.stats["misses"] == 1
+
+
+def test_finished_games_never_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("blaser.cache.time.time", lambda: now[0])
+    cache = ResponseCache()
+    request = f"database/gameById/{GAME_ID}"
+    cache.set(request, "done", {"gameComplete": True})
+    cache.set(request, "live", {"gameComplete": False})
+    now[0] += 10 ** 6
+    assert cache.get(request, "done")[0] is True
+    assert cache.get(request, "live")[0] is False
+
+
+def test_past_seasons_never_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("blaser.cache.time.time", lambda: now[0])
+    cache = ResponseCache()
+    cache.set("database/season", "unknown", {"seasonNumber": 3})
+    cache.set("database/simulationData", "sim", {"season": 11, "day": 40})
+    assert cache.current_season == 11
+    cache.set("database/season", "past", {"seasonNumber": 3})
+    cache.set("database/season", "current", {"seasonNumber": 11})
+    cache.set("database/offseasonRecap", "recap", {"season": 10})
+    now[0] += 10 ** 6
+    assert cache.get("database/season", "past")[0] is True
+    assert cache.get("database/offseasonRecap", "recap")[0] is True
+    assert cache.get("database/season", "current")[0] is False
+    assert cache.get("database/season", "unknown")[0] is False
+
+
+def test_disk_tier(tmp_path):
+    cache = ResponseCache(disk_path=str(tmp_path))
+    cache.set("database/team", "k", {"id": TEAM_ID})
+    fresh = ResponseCache(disk_path=str(tmp_path))
+    assert fresh.get("database/team", "k") == (True, {"id": TEAM_ID})
+    assert len(fresh.memory) == 1
+
+
+def test_disk_tier_is_pruned(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("blaser.cache.time.time", lambda: now[0])
+    disk = DiskCache(str(tmp_path), max_entries=10)
+    disk.set("expired", 0, 1001.0)
+    for n in range(9):
+        disk.set(f"key-{n}", n, None)
+        os.utime(disk._file(f"key-{n}"), (n, n))
+    assert len(disk) == 10
+    now[0] += 1000
+    disk.set("key-9", 9, None)
+    # The expired entry goes first, then the oldest until 9 of 10 slots are used.
+    assert len(disk) == 9
+    assert disk.evictions == 1
+    assert disk.get("expired")[0] is False
+    assert disk.get("key-0")[0] is False
+    assert disk.get("key-1") == (True, 1, None)
+    assert disk.get("key-9") == (True, 9, None)
+    with pytest.raises(ValueError):
+        DiskCache(str(tmp_path), max_entries=0)
+
+
+def test_counters_are_thread_safe():
+    cache = ResponseCache()
+    cache.set("database/team", "k", {"id": TEAM_ID})
+
+    def lookup():
+        for _ in range(1000):
+            cache.get("database/team", "k")
+            cache.get("database/team", "missing")
+
+    threads = [threading.Thread(target=lookup) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert (cache.hits, cache.misses) == (8000, 8000)
+
+
+def test_client_serves_from_cache():
+    api = BlaseballAPI(cache=ResponseCache())
+    api.sess = FakeSession({"id": TEAM_ID})
+    assert api.get_team_info(TEAM_ID) == {"id": TEAM_ID}
+    assert api.get_team_info(TEAM_ID) == {"id": TEAM_ID}
+    assert api.sess.calls == 1
+    api.list_idol_leaderboard()
+    api.list_idol_leaderboard()
+    assert api.sess.calls == 3
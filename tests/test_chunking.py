@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+from blaser.blaseball_api import (
+    BlaseballAPI,
+    BlaseballReferenceAPI,
+    _chunks,
+    _merge_chunks,
+)
+
+from . import FakeResponse, PLAYER_IDS
+
+
+class EchoSession:
+    """Returns one object per requested ID, in reverse order."""
+
+    def __init__(self, id_param, id_field):
+        self.id_param = id_param
+        self.id_field = id_field
+        self.params = []
+
+    def get(self, url, params=None, headers=None):
+        self.params.append(params)
+        ids = params[self.id_param].split(",")
+        return FakeResponse([{self.id_field: i} for i in reversed(ids)])
+
+
+def test__chunks():
+    assert _chunks(["a", "b", "c"], 2) == [["a", "b"], ["c"]]
+    assert _chunks([], 2) == [[]]
+
+
+def test__merge_chunks_keeps_request_order():
+    results = [[{"id": "b"}, {"id": "a"}], [{"id": "c"}]]
+    assert _merge_chunks(results, ["a", "b", "c"], "id") == [
+        {"id": "a"},
+        {"id": "b"},
+        {"id": "c"},
+    ]
+
+
+def test_get_player_info_chunks():
+    ids = [f"player-{i}" for i in range(25)]
+    api = BlaseballAPI(chunk_size=10, max_workers=3)
+    api.sess = EchoSession("ids", "id")
+    r = api.get_player_info(ids)
+    assert [p["id"] for p in r] == ids
+    assert len(api.sess.params) == 3
+
+
+def test_get_player_info_single_string():
+    api = BlaseballAPI()
+    api.sess = EchoSession("ids", "id")
+    r = api.get_player_info(PLAYER_IDS[0])
+    assert r == [{"id": PLAYER_IDS[0]}]
+
+
+def test_get_player_stats_chunks():
+    ids = [f"player-{i}" for i in range(5)]
+    api = BlaseballReferenceAPI(chunk_size=2)
+    api.sess = EchoSession("playerIds", "player_id")
+    r = api.get_player_stats("batting", ids, season=3)
+    assert [p["player_id"] for p in r] == ids
+    assert all(p["season"] == 2 for p in api.sess.params)
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from blaser.blaseball_api import BlaseballReferenceAPI  # noqa: E402
+from blaser.columnar import to_columns  # noqa: E402
+
+from . import FakeSession, PLAYER_IDS, SEASON  # noqa: E402
+
+ROWS = [
+    {"player_id": PLAYER_IDS[0], "player_name": "A", "hits": "12", "walks": 3},
+    {"player_id": PLAYER_IDS[1], "player_name": "B", "hits": 40, "walks": None},
+]
+
+
+def test_to_columns():
+    table = to_columns(ROWS, ["hits", "walks"])
+    assert list(table["player_id"]) == PLAYER_IDS
+    assert table["hits"].dtype == np.float64
+    assert list(table["hits"]) == [12.0, 40.0]
+    assert math.isnan(table["walks"][1])
+    assert "team_id" not in table
+
+
+def test_to_columns_value_column():
+    table = to_columns([{"player_id": "x", "value": "0.350"}], ["batting_average"])
+    assert table["batting_average"][0] == pytest.approx(0.35)
+
+
+def test_get_player_stats_columnar():
+    api = BlaseballReferenceAPI()
+    api.sess = FakeSession(ROWS)
+    table = api.get_player_stats("batting", PLAYER_IDS, season=SEASON, columnar=True)
+    assert set(api.VALID_STATS["batting"]) <= set(table)
+    assert table["player_name"][np.argmax(table["hits"])] == "B"
+
+
+def test_get_season_leaders_columnar():
+    api = BlaseballReferenceAPI()
+    api.sess = FakeSession([{"player_id": "x", "player_name": "X", "value": 9}])
+    table = api.get_season_leaders(SEASON, "batting", "hits", columnar=True)
+    assert list(table) == ["player_id", "player_name", "hits"]
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+from blaser.blaseball_api import BlaseballAPI, BlaseballReferenceAPI
+
+from . import FakeResponse
+
+
+class ValidatingSession:
+    """Answers 304 whenever the client presents the current ETag."""
+
+    def __init__(self, data, etag='"v1"'):
+        self.data = data
+        self.etag = etag
+        self.sent_headers = []
+
+    def get(self, url, params=None, headers=None):
+        self.sent_headers.append(dict(headers or {}))
+        if headers and headers.get("If-None-Match") == self.etag:
+            return FakeResponse(None, status_code=304)
+        return FakeResponse(self.data, headers={"ETag": self.etag})
+
+
+def test_not_modified_returns_previous_object():
+    api = BlaseballAPI()
+    api.sess = ValidatingSession([{"id": "team"}])
+    first = api.list_all_teams()
+    second = api.list_all_teams()
+    assert second is first
+    assert "If-None-Match" not in api.sess.sent_headers[0]
+    assert api.sess.sent_headers[1]["If-None-Match"] == '"v1"'
+    assert api.sess.sent_headers[1]["User-Agent"] == api.user_agent
+
+
+def test_changed_resource_is_refetched():
+    api = BlaseballReferenceAPI()
+    api.sess = ValidatingSession({"players": 1})
+    api.list_all_teams()
+    api.sess.etag = '"v2"'
+    api.sess.data = {"players": 2}
+    assert api.list_all_teams() == {"players": 2}
+
+
+def test_last_modified_validator():
+    api = BlaseballAPI()
+    api.sess = ValidatingSession([])
+    api._remember_validators("k", {"Last-Modified": "Tue, 01 Sep 2020"}, [])
+    headers, previous = api._conditional_headers("k")
+    assert headers["If-Modified-Since"] == "Tue, 01 Sep 2020"
+    assert previous == []
+
+
+def test_validators_can_be_disabled():
+    api = BlaseballAPI(validators=0)
+    api.sess = ValidatingSession([{"id": "team"}])
+    api.list_all_teams()
+    api.list_all_teams()
+    assert all("If-None-Match" not in h for h in api.sess.sent_headers)
+    api = BlaseballAPI(validators=1)
+    api.sess = ValidatingSession([])
+    api._remember_validators("a", {"ETag": '"a"'}, [])
+    api._remember_validators("b", {"ETag": '"b"'}, [])
+    assert api._conditional_headers("a")[1] is None
+
+
+class ProxySession(ValidatingSession):
+    """Answers 304 to validators the client never sent, unless told no-cache."""
+
+    def get(self, url, params=None, headers=None):
+        self.sent_headers.append(dict(headers or {}))
+        if (headers or {}).get("Cache-Control") == "no-cache":
+            return FakeResponse(self.data)
+        return FakeResponse(None, status_code=304)
+
+
+def test_unexpected_not_modified_is_refetched():
+    api = BlaseballAPI()
+    api.sess = ProxySession({"id": "team"})
+    assert api.get_game_by_id("game") == {"id": "team"}
+    assert len(api.sess.sent_headers) == 2
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+from blaser.crawler import SeasonCrawler, SeasonStore
+
+from . import SEASON
+
+
+class FakeAPI:
+    """Serves three days of two games each for any season."""
+
+    def __init__(self, complete_days=3):
+        self.complete_days = complete_days
+        self.calls = []
+
+    def get_game_by_date(self, season, day):
+        self.calls.append(("day", day))
+        if day > 3:
+            return []
+        return [
+            {
+                "id": f"game-{day}-{n}",
+                "statsheet": f"sheet-{day}-{n}",
+                "day": day,
+                "gameComplete": day <= self.complete_days,
+            }
+            for n in range(2)
+        ]
+
+    def get_game_statsheets(self, ids):
+        self.calls.append(("statsheets", ids))
+        return [{"id": sheet_id} for sheet_id in ids.split(",")]
+
+
+def test_crawl_season(tmp_path):
+    api = FakeAPI()
+    reports = []
+    crawler = SeasonCrawler(
+        str(tmp_path / "season.db"),
+        api=api,
+        max_workers=2,
+        rate=0,
+        statsheet_batch=4,
+        progress=reports.append,
+    )
+    crawler.crawl(SEASON)
+    games = list(crawler.store.games(SEASON))
+    assert len(games) == 6
+    assert [g["day"] for g in games] == sorted(g["day"] for g in games)
+    assert crawler.store.statsheet("game-2-1") == {"id": "sheet-2-1"}
+    assert len([c for c in api.calls if c[0] == "statsheets"]) == 2
+    assert reports[-1].phase == "statsheets"
+    assert reports[-1].done == reports[-1].total
+
+
+def test_crawl_resumes(tmp_path):
+    path = str(tmp_path / "season.db")
+    SeasonCrawler(path, api=FakeAPI(), max_workers=2, rate=0).crawl(SEASON)
+    api = FakeAPI()
+    SeasonCrawler(SeasonStore(path), api=api, max_workers=2, rate=0).crawl(SEASON)
+    # Only the empty days past the end of the season are asked for again.
+    assert sorted(api.calls) == [("day", 4), ("day", 5), ("day", 6)]
+
+
+def test_days_of_already_seen_games_are_done(tmp_path):
+    class RepeatingAPI(FakeAPI):
+        """Serves day 1's games again for day 2."""
+
+        def get_game_by_date(self, season, day):
+            return super().get_game_by_date(season, 1 if day == 2 else day)
+
+    path = str(tmp_path / "season.db")
+    crawler = SeasonCrawler(path, api=RepeatingAPI(), max_workers=1, rate=0)
+    crawler.crawl(SEASON)
+    assert crawler.store.day_counts(SEASON) == {1: 2, 2: 2, 3: 2}
+    assert len(list(crawler.store.games(SEASON))) == 4
+    api = RepeatingAPI()
+    SeasonCrawler(SeasonStore(path), api=api, max_workers=1, rate=0).crawl(SEASON)
+    assert ("day", 2) not in api.calls
+
+
+def test_unfinished_days_are_refetched(tmp_path):
+    path = str(tmp_path / "season.db")
+    crawler = SeasonCrawler(path, api=FakeAPI(complete_days=2), max_workers=2, rate=0)
+    crawler.crawl(SEASON)
+    assert sorted(crawler.store.day_counts(SEASON)) == [1, 2]
+    assert crawler.store.statsheet("game-3-0") is None
+    api = FakeAPI()
+    crawler = SeasonCrawler(SeasonStore(path), api=api, max_workers=2, rate=0)
+    crawler.crawl(SEASON)
+    assert ("day", 3) in api.calls
+    games = {g["id"]: g for g in crawler.store.games(SEASON)}
+    assert len(games) == 6
+    assert games["game-3-0"]["gameComplete"] is True
+    assert crawler.store.statsheet("game-3-0") == {"id": "sheet-3-0"}
+
+
+def test_crawl_with_models(tmp_path):
+    from blaser.models import Game
+
+    class ModelAPI(FakeAPI):
+        def get_game_by_date(self, season, day):
+            return Game.from_list(super().get_game_by_date(season, day))
+
+    crawler = SeasonCrawler(str(tmp_path / "s.db"), api=ModelAPI(), rate=0)
+    crawler.crawl(SEASON)
+    assert len(list(crawler.store.games(SEASON))) == 6
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+import json
+
+import pytest
+
+from blaser.blaseball_api import BlaseballAPI
+from blaser.decoders import available_decoders, get_decoder
+
+from . import FakeSession, TEAM_ID
+
+
+def test_get_decoder_default():
+    assert get_decoder()(b'{"a": [1]}') == {"a": [1]}
+
+
+def test_get_decoder_by_name():
+    assert get_decoder("json") is json.loads
+
+
+def test_get_decoder_unknown():
+    with pytest.raises(ValueError):
+        get_decoder("pleebis")
+
+
+@pytest.mark.parametrize("name", list(available_decoders()))
+def test_decoders_raise_json_errors(name):
+    with pytest.raises(json.JSONDecodeError):
+        get_decoder(name)(b"<html>")
+
+
+def test_client_uses_decoder():
+    seen = []
+
+    def decoder(body):
+        seen.append(body)
+        return json.loads(body)
+
+    api = BlaseballAPI(decoder=decoder)
+    api.sess = FakeSession({"id": TEAM_ID})
+    assert api.get_team_info(TEAM_ID) == {"id": TEAM_ID}
+    assert isinstance(seen[0], bytes)
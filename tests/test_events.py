@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+import threading
+import time
+
+import pytest
+
+from blaser.blaseball_api import BlaseballReferenceAPI
+
+from . import FakeResponse, GAME_ID, PLAYER_IDS
+
+EVENTS = [{"id": n, "event_type": "OUT"} for n in range(7)]
+
+
+class PagingSession:
+    """Serves EVENTS in pages, wrapped like the events endpoint does."""
+
+    def __init__(self):
+        self.params = []
+        self.requested = threading.Condition()
+
+    def get(self, url, params=None, headers=None):
+        with self.requested:
+            self.params.append(params)
+            self.requested.notify_all()
+        params = params or {}
+        start, limit = params.get("offset", 0), params.get("limit", len(EVENTS))
+        results = EVENTS[start : start + limit]
+        return FakeResponse({"count": len(results), "results": results})
+
+    def wait_for(self, count):
+        with self.requested:
+            return self.requested.wait_for(lambda: len(self.params) >= count, 5)
+
+
+def _api():
+    api = BlaseballReferenceAPI(limiter=False)
+    api.sess = PagingSession()
+    return api
+
+
+def test_get_game_events_filters():
+    api = _api()
+    api.get_game_events(game_id=GAME_ID, season=8, pitcher_id=PLAYER_IDS[0])
+    assert api.sess.params == [
+        {"gameId": GAME_ID, "season": 7, "pitcherId": PLAYER_IDS[0]}
+    ]
+    api.get_game_events()
+    assert api.sess.params[-1] is None
+
+
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_iter_game_events_pages(prefetch):
+    api = _api()
+    events = api.iter_game_events(
+        batter_id=PLAYER_IDS[1], event_type="OUT", page_size=3, prefetch=prefetch
+    )
+    assert list(events) == EVENTS
+    assert [(p["offset"], p["limit"]) for p in api.sess.params] == [
+        (0, 3),
+        (3, 3),
+        (6, 3),
+    ]
+    assert api.sess.params[0]["batterId"] == PLAYER_IDS[1]
+    assert api.sess.params[0]["eventType"] == "OUT"
+
+
+def test_iter_game_events_prefetches_one_page():
+    api = _api()
+    events = api.iter_game_events(page_size=2)
+    assert next(events) == EVENTS[0]
+    # The second page is requested while the first is still being consumed...
+    assert api.sess.wait_for(2)
+    time.sleep(0.05)
+    # ...but nothing beyond it until the caller moves on.
+    assert [p["offset"] for p in api.sess.params] == [0, 2]
+    assert [e["id"] for e in events] == list(range(1, 7))
+    events.close()
+
+
+def test_iter_game_events_stops_on_short_page():
+    api = _api()
+    assert list(api.iter_game_events(page_size=7)) == EVENTS
+    assert [p["offset"] for p in api.sess.params] == [0, 7]
+    with pytest.raises(ValueError):
+        api.iter_game_events(page_size=0)
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+
+import asyncio
+from collections import Counter
+
+from blaser.blaseball_api import BlaseballAPI
+from blaser.graph import HierarchyLoader
+
+from . import FakeResponse
+
+LEAGUE = {"id": "L", "name": "ILB", "subleagues": ["S1", "S2"]}
+SUBLEAGUES = {
+    "S1": {"id": "S1", "name": "Good", "divisions": ["D1", "D2"]},
+    "S2": {"id": "S2", "name": "Evil", "divisions": ["D3", "D2"]},
+}
+DIVISIONS = [
+    {"id": "D1", "name": "Wild High", "teams": ["T1", "T2"]},
+    {"id": "D2", "name": "Wild Low", "teams": ["T3"]},
+    {"id": "D3", "name": "Mild High", "teams": ["T4"]},
+    {"id": "D9", "name": "Unused", "teams": []},
+]
+TEAMS = [
+    {"id": f"T{n}", "fullName": f"Team {n}", "lineup": [f"P{n}", "P0"], "rotation": []}
+    for n in range(1, 5)
+]
+
+
+class RoutingSession:
+    """Answers every endpoint the loader uses and counts the requests."""
+
+    def __init__(self):
+        self.calls = Counter()
+
+    def get(self, url, params=None, headers=None):
+        path = url.split("/database/", 1)[1]
+        self.calls[path.split("/")[0]] += 1
+        params = params or {}
+        if path == "league":
+            data = LEAGUE
+        elif path == "subleague":
+            data = SUBLEAGUES[params["id"]]
+        elif path == "allDivisions":
+            data = DIVISIONS
+        elif path == "allTeams":
+            data = TEAMS
+        elif path == "players":
+            data = [{"id": i, "name": f"Player {i}"} for i in params["ids"].split(",")]
+        elif path == "playoffs":
+            data = {"id": "PO", "rounds": ["R1", "R2"]}
+        elif path == "playoffRound":
+            matchups = {"R1": ["M1", "M2"], "R2": ["M2"]}[params["id"]]
+            data = {"id": params["id"], "matchups": matchups}
+        elif path == "playoffMatchups":
+            data = [{"id": i, "homeTeam": "T1"} for i in params["ids"].split(",")]
+        elif path == "offseasonRecap":
+            data = {"id": "E", "bonusResults": ["B1", "B2"], "decreeResults": ["X1"]}
+        elif path in ("bonusResults", "decreeResults"):
+            data = [{"id": i} for i in params["ids"].split(",")]
+        else:
+            raise AssertionError(path)
+        return FakeResponse(data)
+
+
+def _api(**kwargs):
+    api = BlaseballAPI(limiter=False, **kwargs)
+    api.sess = RoutingSession()
+    return api
+
+
+def test_load_league_batches_each_level():
+    api = _api()
+    league = HierarchyLoader(api).load_league("L")
+    assert api.sess.calls == {
+        "league": 1,
+        "subleague": 2,
+        "allDivisions": 1,
+        "allTeams": 1,
+        "players": 1,
+    }
+    evil = league.subleagues[1]
+    assert [d.name for d in evil.divisions] == ["Mild High", "Wild Low"]
+    team = evil.divisions[0].teams[0]
+    assert team.full_name == "Team 4"
+    assert [p.name for p in team.lineup] == ["Player P4", "Player P0"]
+    assert team.lineup[0].parent is team and team.parent.parent is evil
+    assert len(list(league.walk("player"))) == 10
+    assert repr(team) == "Node('team', id='T4')"
+
+
+def test_load_league_with_models_and_without_players():
+    api = _api(models=True)
+    league = HierarchyLoader(api).load_league("L", players=False)
+    assert "players" not in api.sess.calls
+    team = league.subleagues[0].divisions[0].teams[1]
+    assert team.full_name == "Team 2"
+    assert "lineup" not in team.links
+
+
+def test_load_playoffs_and_election():
+    api = _api()
+    loader = HierarchyLoader(api)
+    playoffs = loader.load_playoffs(7)
+    assert [len(r.matchups) for r in playoffs.rounds] == [2, 1]
+    assert playoffs.rounds[1].matchups[0].home_team == "T1"
+    assert api.sess.calls["playoffMatchups"] == 1
+
+    election = loader.load_election(7)
+    assert [b.id for b in election.bonus_results] == ["B1", "B2"]
+    assert [d.id for d in election.decree_results] == ["X1"]
+
+
+class AsyncWrapper:
+    """Exposes a blocking client's methods as coroutines."""
+
+    def __init__(self, api):
+        self.api = api
+
+    async def _get(self, request, payload=None):
+        return self.api._get(request, payload)
+
+    def __getattr__(self, name):
+        method = getattr(self.api, name)
+
+        async def call(*args):
+            return method(*args)
+
+        return call
+
+
+def test_load_league_async():
+    api = _api()
+    loader = HierarchyLoader(AsyncWrapper(api))
+    assert loader.is_async
+    league = asyncio.run(loader.load_league("L"))
+    assert len(list(league.walk("team"))) == 5
+    assert api.sess.calls["allTeams"] == 1
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+import json
+import subprocess
+import sys
+
+# Dependencies that must not be imported until they are first needed.
+DEFERRED = (
+    "aiohttp",
+    "asyncio",
+    "concurrent.futures",
+    "httpx",
+    "numpy",
+    "orjson",
+    "requests",
+    "sseclient",
+    "urllib3",
+)
+
+
+def _run(code):
+    """Runs code in a fresh interpreter, returning what it printed as JSON."""
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    ).stdout
+    return json.loads(output)
+
+
+def _loaded_by(statements):
+    """Lists the deferred modules loaded by statements, beyond interpreter startup."""
+    return _run(
+        "import json, sys\n"
+        "before = set(sys.modules)\n"
+        f"{statements}\n"
+        f"print(json.dumps(sorted(m for m in {DEFERRED!r} "
+        "if m in sys.modules and m not in before)))"
+    )
+
+
+def test_clients_import_no_deferred_dependencies():
+    for module in ("blaser.blaseball_api", "blaser.names", "blaser.snapshots"):
+        assert _loaded_by(f"import {module}") == [], module
+
+
+def test_cached_reads_stay_light():
+    statements = (
+        "from blaser.blaseball_api import BlaseballReferenceAPI\n"
+        "from blaser.cache import ResponseCache, cache_key\n"
+        "api = BlaseballReferenceAPI(cache=ResponseCache())\n"
+        "url = api.base_url + '/deceased'\n"
+        "api.cache.set('deceased', cache_key(url), [{'player_id': 'x'}])\n"
+        "assert api.list_deceased_players() == [{'player_id': 'x'}]"
+    )
+    assert _loaded_by(statements) == []
+
+
+def test_package_import_is_light():
+    # Checks which modules are loaded rather than timing the import, which would
+    # flake on a loaded machine.
+    assert _loaded_by("import blaser") == []
+    assert _loaded_by("import blaser.transport, blaser.cache, blaser.stream") == []
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+from datetime import timedelta
+import io
+import json
+
+import pytest
+
+from blaser.blaseball_api import BlaseballReferenceAPI
+from blaser.jsonstream import iter_json_items
+
+from . import FakeResponse
+
+EVENTS = [{"id": i, "event_type": "OUT", "pitches": [1.5, i]} for i in range(500)]
+
+
+def test_top_level_array():
+    body = json.dumps(EVENTS).encode("utf-8")
+    assert list(iter_json_items(io.BytesIO(body), read_size=7)) == EVENTS
+
+
+def test_array_member_of_object():
+    body = json.dumps({"count": 500, "meta": {"a": [1]}, "results": EVENTS})
+    assert list(iter_json_items(io.StringIO(body), read_size=11)) == EVENTS
+
+
+def test_array_member_by_key():
+    body = json.dumps({"skip": [1, 2], "results": EVENTS}).encode("utf-8")
+    items = list(iter_json_items(io.BytesIO(body), key="results", read_size=13))
+    assert items == EVENTS
+
+
+def test_numbers_split_across_reads():
+    body = b"[12345, 678, 9]"
+    assert list(iter_json_items(io.BytesIO(body), read_size=3)) == [12345, 678, 9]
+
+
+@pytest.mark.parametrize("read_size", range(1, 9))
+def test_decimals_and_exponents_split_across_reads(read_size):
+    numbers = [1.5, 2e10, -3.25e-2, 10, 0.125e3, 7]
+    body = b'{"n": 1.25, "x": [1.5, 2e10, -3.25E-2, 10, 0.125e+3, 7]}'
+    items = iter_json_items(io.BytesIO(body), key="x", read_size=read_size)
+    assert list(items) == numbers
+
+
+def test_multibyte_characters_split_across_reads():
+    body = json.dumps(["Jaylen Hotdogfingers ☃"], ensure_ascii=False).encode()
+    assert list(iter_json_items(io.BytesIO(body), read_size=1)) == [
+        "Jaylen Hotdogfingers ☃"
+    ]
+
+
+def test_empty_array():
+    assert list(iter_json_items(io.BytesIO(b" [ ] "))) == []
+
+
+def test_no_array():
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_items(io.BytesIO(b'{"count": 1}')))
+
+
+class StreamingResponse:
+    elapsed = timedelta(milliseconds=5)
+    ok = True
+    status_code = 200
+
+    def __init__(self, body):
+        self.raw = io.BytesIO(body)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.raw.close()
+
+    def raise_for_status(self):
+        pass
+
+
+class StreamingSession:
+    def get(self, url, params=None, headers=None, stream=False):
+        assert stream
+        return StreamingResponse(json.dumps(EVENTS).encode("utf-8"))
+
+
+def test_iter_raw_data():
+    records = []
+    api = BlaseballReferenceAPI(hooks=[records.append])
+    api.sess = StreamingSession()
+    assert list(api.iter_raw_data(8)) == EVENTS
+    (record,) = records
+    assert (record.endpoint, record.cache) == ("data/events", "miss")
+    assert record.status == 200
+
+
+def test_iter_raw_data_goes_through_limiter():
+    class Limiter:
+        calls = 0
+
+        def call(self, send):
+            self.calls += 1
+            return send()
+
+    api = BlaseballReferenceAPI(limiter=Limiter())
+    api.sess = StreamingSession()
+    assert next(api.iter_raw_data(8)) == EVENTS[0]
+    assert api.limiter.calls == 1
+
+
+def test_get_raw_data_url():
+    urls = []
+
+    class Session:
+        def get(self, url, params=None, headers=None):
+            urls.append(url)
+            return FakeResponse(EVENTS)
+
+    api = BlaseballReferenceAPI()
+    api.sess = Session()
+    assert api.get_raw_data(8) == EVENTS
+    assert urls == [f"{api.base_url}/data/events"]
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from blaser.leaderboard import LeaderboardEngine  # noqa: E402
+
+from . import GAME_ID, PLAYER_IDS, SEASON  # noqa: E402
+
+BATTER, OTHER = PLAYER_IDS
+PITCHER = "pitcher-1"
+
+
+def _event(n, batter, event_type, **fields):
+    event = {
+        "id": n,
+        "season": SEASON - 1,
+        "game_id": GAME_ID,
+        "batter_id": batter,
+        "pitcher_id": PITCHER,
+        "event_type": event_type,
+        "pitches": ["S", "B", "X"],
+        "outs_on_play": 1 if event_type in ("OUT", "STRIKEOUT") else 0,
+    }
+    event.update(fields)
+    return event
+
+
+EVENTS = [
+    _event(1, BATTER, "SINGLE"),
+    _event(2, BATTER, "HOME_RUN", runs_batted_in=1),
+    _event(3, BATTER, "OUT", batted_ball_type="FLY"),
+    _event(4, BATTER, "WALK"),
+    _event(5, OTHER, "STRIKEOUT"),
+    _event(
+        6,
+        OTHER,
+        "DOUBLE",
+        base_runners=[
+            {"runner_id": BATTER, "base_before_play": 2, "base_after_play": 4}
+        ],
+    ),
+    _event(7, OTHER, "OUT"),
+]
+
+
+def test_batting_leaders():
+    engine = LeaderboardEngine(EVENTS, names={BATTER: "Batter"})
+    leaders = engine.get_season_leaders(SEASON, "batting", "batting_average")
+    assert [row["player_id"] for row in leaders] == [BATTER, OTHER]
+    assert leaders[0]["value"] == pytest.approx(2 / 3)
+    assert leaders[0]["player_name"] == "Batter"
+    assert leaders[1]["value"] == pytest.approx(1 / 3)
+
+
+def test_order_and_limit():
+    engine = LeaderboardEngine(EVENTS)
+    leaders = engine.get_season_leaders(SEASON, "batting", "hits", "ASC", limit=1)
+    assert [row["player_id"] for row in leaders] == [OTHER]
+
+
+def test_pitching_and_running():
+    engine = LeaderboardEngine(EVENTS)
+    pitching = engine.get_season_leaders(SEASON, "pitching", "strikeouts")
+    assert pitching == [{"player_id": PITCHER, "player_name": None, "value": 1.0}]
+    innings = engine.get_season_leaders(SEASON, "pitching", "innings")
+    assert innings[0]["value"] == pytest.approx(1.0)
+    runs = engine.get_season_leaders(SEASON, "running", "runs")
+    assert runs[0] == {"player_id": BATTER, "player_name": None, "value": 2.0}
+
+
+def test_incremental_updates_dedupe():
+    engine = LeaderboardEngine(EVENTS[:3])
+    assert engine.add_events(EVENTS) == 4
+    assert len(engine) == len(EVENTS)
+    hits = engine.get_season_leaders(SEASON, "batting", "hits")
+    assert hits[0]["value"] == 2.0
+
+
+def test_invalid_stat():
+    with pytest.raises(ValueError):
+        LeaderboardEngine().get_season_leaders(SEASON, "batting", "era")
+
+
+def test_empty_season():
+    assert LeaderboardEngine(EVENTS).get_season_leaders(1, "batting", "hits") == []
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+import logging
+
+import pytest
+import requests
+
+from blaser.blaseball_api import BlaseballAPI
+from blaser.cache import ResponseCache
+from blaser.metrics import (
+    Histogram,
+    MetricsRegistry,
+    RequestRecord,
+    endpoint_template,
+)
+
+from . import GAME_ID, FakeResponse, FakeSession
+
+
+def test_endpoint_template():
+    assert endpoint_template(f"database/gameById/{GAME_ID}") == "database/gameById/{id}"
+    assert endpoint_template("/data/events") == "data/events"
+    assert endpoint_template("database/allTeams") == "database/allTeams"
+
+
+def test_histogram_buckets_and_quantile():
+    histogram = Histogram([1, 2, 4])
+    for value in (0.5, 1, 1.5, 3, 10):
+        histogram.observe(value)
+    assert histogram.buckets() == [(1, 2), (2, 3), (4, 4), (float("inf"), 5)]
+    assert histogram.quantile(0.5) == pytest.approx(1.5)
+    assert histogram.quantile(1.0) == 4
+    assert Histogram([1]).quantile(0.5) is None
+
+
+def test_hooks_receive_records():
+    records = []
+    api = BlaseballAPI(cache=ResponseCache(), hooks=[records.append])
+    api.sess = FakeSession({"id": GAME_ID})
+    api.get_game_by_id(GAME_ID)
+    api.get_game_by_id(GAME_ID)
+    miss, hit = records
+    assert miss.endpoint == "database/gameById/{id}"
+    assert (miss.cache, miss.status, miss.ttfb) == ("miss", 200, 0.005)
+    assert miss.size == len(FakeResponse({"id": GAME_ID}).content)
+    assert miss.decode is not None and miss.wall >= miss.decode
+    assert (hit.cache, hit.status, hit.ttfb, hit.size) == ("hit", None, None, None)
+
+
+def test_failing_hook_is_logged(caplog):
+    def broken(record):
+        raise RuntimeError("exporter down")
+
+    records = []
+    api = BlaseballAPI(hooks=[broken, records.append])
+    api.sess = FakeSession({"id": GAME_ID})
+    with caplog.at_level(logging.ERROR, logger="blaser.blaseball_api"):
+        assert api.get_game_by_id(GAME_ID) == {"id": GAME_ID}
+    assert len(records) == 1
+    assert "exporter down" in caplog.text
+
+
+def test_error_status_is_recorded():
+    class FailingSession:
+        def get(self, url, params=None, headers=None):
+            return FakeResponse({"error": "nope"}, status_code=404)
+
+    records = []
+    api = BlaseballAPI(limiter=False)
+    api.add_hook(records.append)
+    api.sess = FailingSession()
+    with pytest.raises(requests.HTTPError):
+        api.get_simulation_data()
+    assert [(r.cache, r.status) for r in records] == [("error", 404)]
+
+
+def test_registry_snapshot_and_prometheus():
+    registry = MetricsRegistry()
+    api = BlaseballAPI(cache=ResponseCache(), hooks=[registry])
+    api.sess = FakeSession([{"id": "team"}])
+    for _ in range(3):
+        api.list_all_teams()
+    entry = registry.snapshot()["database/allTeams"]
+    assert entry["requests"] == 3
+    assert entry["cache"] == {"miss": 1, "hit": 2}
+    assert entry["wall"]["count"] == 3
+    assert entry["ttfb"]["count"] == entry["size"]["count"] == 1
+
+    text = registry.to_prometheus()
+    assert "# TYPE blaser_request_duration_seconds histogram" in text
+    assert (
+        'blaser_requests_total{endpoint="database/allTeams",cache="hit",status=""} 2'
+        in text
+    )
+    assert (
+        'blaser_response_size_bytes_bucket{endpoint="database/allTeams",le="+Inf"} 1'
+        in text
+    )
+    registry.reset()
+    assert registry.snapshot() == {}
+
+
+def test_registry_observe_directly():
+    registry = MetricsRegistry(time_buckets=[0.1])
+    registry(RequestRecord('a"b', "miss", 0.05, status=200))
+    assert 'endpoint="a\\"b",cache="miss",le="0.1"} 1' in registry.to_prometheus()
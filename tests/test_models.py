@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+import sys
+
+import pytest
+
+from blaser.blaseball_api import BlaseballAPI, BlaseballReferenceAPI
+from blaser.models import Division, Game, Player, Team, to_models
+
+from . import DIVISION_ID, FakeSession, GAME_ID, PLAYER_IDS, TEAM_ID
+
+PLAYER = {
+    "id": PLAYER_IDS[0],
+    "name": "Jessica Telephone",
+    "leagueTeamId": TEAM_ID,
+    "buoyancy": 0.51,
+    "moxie": 0.92,
+    "baseThirst": 0.33,
+    "permAttr": ["SIPHON"],
+    "hat": "NONE",
+}
+
+
+def test_player_fields():
+    player = Player(PLAYER)
+    assert player.id == PLAYER_IDS[0]
+    assert player.league_team_id == TEAM_ID
+    assert player.base_thirst == 0.33
+    assert player.perm_attr == ("SIPHON",)
+    assert player.armor is None
+    assert player.extra == {"hat": "NONE"}
+    assert not hasattr(player, "__dict__")
+
+
+def test_unknown_attribute():
+    with pytest.raises(AttributeError):
+        Player(PLAYER).pleebis
+
+
+def test_reference_player_fields():
+    player = Player({"player_id": PLAYER_IDS[1], "player_name": "Nagomi", "moxie": 1})
+    assert (player.id, player.name, player.moxie) == (PLAYER_IDS[1], "Nagomi", 1)
+
+
+def test_to_dict_round_trip():
+    assert Player(Player(PLAYER).to_dict()) == Player(PLAYER)
+
+
+def test_smaller_than_dict():
+    full = {key: 0.5 for key in Player._keys if "_" not in key}
+    assert sys.getsizeof(Player(full)) < sys.getsizeof(full) / 2
+
+
+def test_to_models():
+    teams = to_models(Team, [{"id": TEAM_ID, "lineup": PLAYER_IDS}])
+    assert teams[0].lineup == tuple(PLAYER_IDS)
+    assert to_models(Game, None) is None
+
+
+def test_client_returns_models():
+    api = BlaseballAPI(models=True)
+    api.sess = FakeSession({"id": DIVISION_ID, "name": "Wild High", "teams": []})
+    assert isinstance(api.get_division_info(DIVISION_ID), Division)
+    api.sess = FakeSession({"id": GAME_ID, "homeScore": 3, "gameComplete": True})
+    game = api.get_game_by_id(GAME_ID)
+    assert (game.home_score, game.game_complete) == (3, True)
+
+
+def test_client_returns_dicts_by_default():
+    api = BlaseballReferenceAPI()
+    api.sess = FakeSession([{"player_id": PLAYER_IDS[0]}])
+    assert api.list_all_players() == [{"player_id": PLAYER_IDS[0]}]
+
+
+def test_to_row_restores_reference_keys():
+    row = {"player_id": "p", "player_name": "Nagomi", "team_id": "t", "bat": "b"}
+    row["perm_attr"] = ["SHELLED"]
+    assert Player(row).to_row() == row
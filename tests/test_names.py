@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+import timeit
+
+import pytest
+
+from blaser.blaseball_api import BlaseballReferenceAPI
+from blaser.names import PlayerNameIndex, normalize
+
+from . import FakeSession
+
+PLAYERS = [
+    {"player_id": "jt", "player_name": "Jessica Telephone"},
+    {"player_id": "jt2", "player_name": "Jessi Tellenson"},
+    {"player_id": "nc", "player_name": "Nagomi Mcdaniel"},
+    {"player_id": "ye", "player_name": "York Silk"},
+    {"player_id": "bj", "player_name": "Björn Lüdwig"},
+]
+
+
+def _ids(results):
+    return [r["player_id"] for r in results]
+
+
+def test_normalize():
+    assert normalize("  Björn   LÜDWIG ") == "bjorn ludwig"
+
+
+def test_lookup_is_case_insensitive():
+    index = PlayerNameIndex(PLAYERS)
+    assert len(index) == 5
+    assert index.lookup("jessica telephone") == [
+        {"player_id": "jt", "player_name": "Jessica Telephone", "current": True}
+    ]
+    assert index.lookup("telephone") == []
+
+
+def test_prefix_matches_names_and_words():
+    index = PlayerNameIndex(PLAYERS)
+    assert _ids(index.prefix("jess")) == ["jt2", "jt"]
+    assert _ids(index.prefix("TEL")) == ["jt", "jt2"]
+    assert _ids(index.prefix("bjorn l")) == ["bj"]
+    assert _ids(index.prefix("jess", limit=1)) == ["jt2"]
+    assert index.prefix("") == []
+
+
+def test_fuzzy_tolerates_typos():
+    index = PlayerNameIndex(PLAYERS)
+    results = index.fuzzy("Jesica Telefone")
+    assert results[0]["player_id"] == "jt"
+    assert 0 < results[0]["score"] < 1
+    assert _ids(index.search("nagomi mcdanial")) == ["nc"]
+
+
+def test_renames_keep_former_names_out_of_current():
+    index = PlayerNameIndex(PLAYERS)
+    renamed = PLAYERS[1:] + [{"player_id": "jt", "player_name": "Jessica Telefone"}]
+    assert index.update(renamed) == 1
+    assert index.lookup("Jessica Telephone")[0]["current"] is False
+    assert index.lookup("Jessica Telephone", current=True) == []
+    assert _ids(index.prefix("jessica t", current=True)) == ["jt"]
+    assert index.update(PLAYERS[:4], complete=True) == 2
+    assert index.lookup("Jessica Telephone", current=True)[0]["player_id"] == "jt"
+    assert index.prefix("bjorn", current=True) == []
+    assert index.prefix("bjorn")[0]["current"] is False
+
+
+class RosterSession(FakeSession):
+    def get(self, url, params=None, headers=None):
+        self.data = {"allPlayers": PLAYERS, "deceased": [PLAYERS[-1]]}
+        response = super().get(url, params, headers)
+        response.data = response.data[url.rsplit("/", 1)[1]]
+        return response
+
+
+def test_from_api_and_refresh():
+    api = BlaseballReferenceAPI(limiter=False)
+    api.sess = RosterSession(None)
+    index = PlayerNameIndex.from_api(api, include_deceased=True)
+    assert len(index) == 5 and api.sess.calls == 2
+    assert index.refresh() == 0
+    with pytest.raises(ValueError):
+        PlayerNameIndex(PLAYERS).refresh()
+
+
+def test_queries_are_fast():
+    players = [
+        {"player_id": str(n), "player_name": f"Player{n} Surname{n % 97}"}
+        for n in range(5000)
+    ]
+    index = PlayerNameIndex(players)
+    seconds = min(timeit.repeat(lambda: index.prefix("player12"), number=100, repeat=3))
+    assert seconds / 100 < 0.001
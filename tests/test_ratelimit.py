@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+import time
+
+from blaser.blaseball_api import BlaseballAPI, BlaseballReferenceAPI
+from blaser.ratelimit import (
+    AdaptiveConcurrency,
+    HostLimiter,
+    TokenBucket,
+    get_limiter,
+    parse_retry_after,
+)
+
+from . import FakeResponse
+
+
+class FlakySession:
+    """Fails with the given statuses before succeeding."""
+
+    def __init__(self, statuses, headers=None):
+        self.statuses = list(statuses)
+        self.headers = headers or {}
+        self.calls = 0
+
+    def get(self, url, params=None, headers=None):
+        self.calls += 1
+        if self.statuses:
+            return FakeResponse(None, self.statuses.pop(0), dict(self.headers))
+        return FakeResponse({"ok": True})
+
+
+def test_token_bucket_throttles():
+    bucket = TokenBucket(rate=100, burst=1)
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.04
+
+
+def test_token_bucket_unlimited():
+    assert TokenBucket(None).acquire() == 0.0
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+
+
+def test_adaptive_concurrency_aimd():
+    limit = AdaptiveConcurrency(initial=8, maximum=9)
+    limit.acquire()
+    limit.release(error=True)
+    assert limit.limit == 4
+    for _ in range(100):
+        limit.acquire()
+        limit.release(0.01)
+    assert limit.limit == 9
+
+
+def test_retries_honor_retry_after():
+    limiter = HostLimiter(max_retries=2, backoff=0)
+    api = BlaseballAPI(limiter=limiter)
+    api.sess = FlakySession([429, 503], headers={"Retry-After": "0"})
+    assert api.get_simulation_data() == {"ok": True}
+    assert api.sess.calls == 3
+    assert limiter.stats["retries"] == 2
+    assert limiter.stats["throttled"] == 2
+
+
+def test_retries_exhausted():
+    api = BlaseballAPI(limiter=HostLimiter(max_retries=1, backoff=0))
+    api.sess = FlakySession([503, 503, 503])
+    resp = api._send("u", None, None)
+    assert resp.status_code == 503
+    assert api.sess.calls == 2
+
+
+def test_retries_exceptions():
+    calls = []
+
+    def send():
+        calls.append(1)
+        if len(calls) < 2:
+            raise ConnectionError()
+        return FakeResponse({})
+
+    assert HostLimiter(backoff=0).call(send).status_code == 200
+
+
+def test_long_retry_after_is_not_cut_short():
+    limiter = HostLimiter(max_retries=2, max_backoff=5)
+    api = BlaseballAPI(limiter=limiter)
+    api.sess = FlakySession([429], headers={"Retry-After": "60"})
+    start = time.monotonic()
+    assert api._send("u", None, None).status_code == 429
+    assert time.monotonic() - start < 1
+    assert api.sess.calls == 1
+    assert limiter.stats["retries"] == 0
+
+
+def test_shared_per_host():
+    assert BlaseballAPI(limiter=True).limiter is BlaseballAPI(limiter=True).limiter
+    assert BlaseballAPI(limiter=True).limiter is get_limiter("www.blaseball.com")
+    assert (
+        BlaseballReferenceAPI(limiter=True).limiter
+        is not BlaseballAPI(limiter=True).limiter
+    )
+    assert BlaseballAPI().limiter is None
+    assert BlaseballAPI(limiter=False).limiter is None
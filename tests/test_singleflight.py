@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+import pytest
+
+from blaser.blaseball_api import BlaseballAPI
+from blaser.singleflight import AsyncSingleFlight, SingleFlight
+
+from . import FakeSession
+
+
+class SlowSession(FakeSession):
+    def get(self, url, params=None, headers=None):
+        time.sleep(0.2)
+        return super().get(url, params=params, headers=headers)
+
+
+def test_do_coalesces_concurrent_calls():
+    group = SingleFlight()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"a": 1}
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: group.do("k", fn), range(8)))
+    assert len(calls) == 1
+    assert all(r[0] is results[0][0] for r in results)
+    assert sum(1 for _, shared in results if not shared) == 1
+    assert len(group) == 0
+
+
+def test_do_shares_errors():
+    group = SingleFlight()
+    started = threading.Event()
+
+    def fn():
+        started.set()
+        time.sleep(0.2)
+        raise RuntimeError("boom")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        first = pool.submit(group.do, "k", fn)
+        started.wait()
+        second = pool.submit(group.do, "k", fn)
+        for future in (first, second):
+            with pytest.raises(RuntimeError):
+                future.result()
+
+
+def test_async_do_coalesces_and_shares_errors():
+    calls = []
+
+    async def fetch(value):
+        calls.append(value)
+        await asyncio.sleep(0.05)
+        if value == "bad":
+            raise ValueError(value)
+        return [value]
+
+    async def run():
+        group = AsyncSingleFlight()
+        results = await asyncio.gather(*(group.do("k", fetch, "ok") for _ in range(4)))
+        errors = await asyncio.gather(
+            *(group.do("k", fetch, "bad") for _ in range(2)), return_exceptions=True
+        )
+        return group, results, errors
+
+    group, results, errors = asyncio.run(run())
+    assert calls == ["ok", "bad"]
+    assert [shared for _, shared in results] == [False, True, True, True]
+    assert all(result is results[0][0] for result, _ in results)
+    assert all(isinstance(error, ValueError) for error in errors)
+    assert len(group) == 0
+
+
+def test_async_waiter_takes_over_a_cancelled_call():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return len(calls)
+
+    async def run():
+        group = AsyncSingleFlight()
+        leader = asyncio.ensure_future(group.do("k", fetch))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(group.do("k", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await waiter
+
+    assert asyncio.run(run()) == (2, False)
+
+
+def test_client_coalesces_identical_requests():
+    api = BlaseballAPI()
+    api.sess = SlowSession({"day": 1})
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: api.get_simulation_data(), range(8)))
+    assert api.sess.calls == 1
+    assert all(r == {"day": 1} for r in results)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+import pytest
+
+from blaser.blaseball_api import BlaseballReferenceAPI
+from blaser.snapshots import PlayerSnapshots, apply, diff
+
+from . import FakeResponse
+
+
+def _player(player_id, team, moxie, **extra):
+    return dict(player_id=player_id, team_id=team, moxie=moxie, **extra)
+
+
+DAYS = {
+    1: [_player("a", "T1", 0.5), _player("b", "T1", 0.7)],
+    2: [_player("a", "T1", 0.5), _player("b", "T2", 0.7)],
+    3: [_player("a", "T1", 0.9), _player("c", "T2", 0.1)],
+    4: [_player("a", "T1", 0.9), _player("c", "T2", 0.1, fate=3)],
+}
+
+
+@pytest.fixture
+def store(tmp_path):
+    with PlayerSnapshots(str(tmp_path / "players.db")) as snapshots:
+        for day, players in DAYS.items():
+            snapshots.add_day(5, day, players)
+        yield snapshots
+
+
+def test_diff_and_apply():
+    old, new = _player("a", "T1", 0.5, fate=1), _player("a", "T2", 0.5)
+    delta = diff(old, new)
+    assert delta == [{"team_id": "T2"}, ["fate"]]
+    assert apply(old, delta) == new
+    assert diff(new, new) is None
+    assert apply(new, diff(new, None)) is None
+
+
+def test_only_changes_are_stored(store):
+    counts = dict(store.conn.execute("SELECT day, COUNT(*) FROM deltas GROUP BY day"))
+    assert counts == {2: 1, 3: 3, 4: 1}
+    assert store.days(5) == [1, 2, 3, 4] and store.seasons() == [5]
+
+
+def test_point_in_time_reads(store):
+    for day, players in DAYS.items():
+        assert store.as_of(5, day) == {p["player_id"]: p for p in players}
+    assert store.as_of(5, 0) == {} and store.as_of(6, 1) == {}
+    assert store.as_of(5, 99) == store.as_of(5, 4)
+    assert list(store.roster(5, 2, "T2")) == ["b"]
+    assert store.player("a", 5, 2)["moxie"] == 0.5
+    assert store.player("b", 5, 3) is None
+    assert store.player("c", 5, 1) is None
+    assert store.player("nobody", 5, 1) is None
+
+
+def test_model_rows(tmp_path):
+    from blaser.models import Player
+
+    with PlayerSnapshots(str(tmp_path / "players.db")) as snapshots:
+        snapshots.add_day(5, 1, DAYS[1])
+        changed = snapshots.add_day(5, 2, Player.from_list(DAYS[2]))
+        snapshots.add_day(5, 3, Player.from_list(DAYS[3]))
+        assert changed == 1
+        assert list(snapshots.roster(5, 2, "T2")) == ["b"]
+        assert snapshots.as_of(5, 3) == {p["player_id"]: p for p in DAYS[3]}
+
+
+def test_range_scans(store):
+    assert [(d, r and r["moxie"]) for d, r in store.history("a", 5)] == [
+        (1, 0.5),
+        (3, 0.9),
+    ]
+    assert [d for d, _ in store.history("a", 5, start=2, end=2)] == [2]
+    assert [(d, r) for d, r in store.history("b", 5, start=2)] == [
+        (2, DAYS[2][1]),
+        (3, None),
+    ]
+    scanned = list(store.scan(5, start=2, end=3))
+    assert [day for day, _ in scanned] == [2, 3]
+    assert scanned[0][1] == store.as_of(5, 2) and scanned[1][1] == store.as_of(5, 3)
+
+
+def test_days_must_be_added_in_order(store, tmp_path):
+    with pytest.raises(ValueError):
+        store.add_day(5, 3, DAYS[3])
+    store.close()
+    with PlayerSnapshots(str(tmp_path / "players.db")) as reopened:
+        assert reopened.add_day(5, 5, DAYS[4]) == 0
+        assert reopened.as_of(5, 5) == reopened.as_of(5, 4)
+
+
+class GamedaySession:
+    def __init__(self):
+        self.days = []
+
+    def get(self, url, params=None, headers=None):
+        day = params["day"] + 1
+        self.days.append(day)
+        return FakeResponse(DAYS.get(day, []))
+
+
+def test_fetch_skips_stored_days(tmp_path):
+    api = BlaseballReferenceAPI(limiter=False)
+    api.sess = GamedaySession()
+    with PlayerSnapshots(str(tmp_path / "players.db")) as store:
+        assert store.fetch(5, days=[1, 2], api=api) == 2
+        assert store.fetch(5, api=api) == 2
+        assert store.fetch(5, days=[1, 2, 3], api=api) == 0
+        assert api.sess.days == [1, 2, 3, 4, 5]
+        assert store.as_of(5, 4)["c"]["fate"] == 3
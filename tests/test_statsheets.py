@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+import pytest
+
+from blaser.blaseball_api import BlaseballAPI
+from blaser.metrics import MetricsRegistry
+from blaser.statsheets import StatsheetLoader, flatten
+
+from . import FakeResponse
+
+SHEETS = {
+    "G1": {"id": "G1", "homeTeamStats": "T1", "awayTeamStats": "T2"},
+    "G2": {"id": "G2", "homeTeamStats": "T3", "awayTeamStats": "T1"},
+    "T1": {"id": "T1", "name": "Crabs", "wins": 1, "playerStats": ["P1", "P2"]},
+    "T2": {"id": "T2", "name": "Pies", "wins": 0, "playerStats": ["P3"]},
+    "T3": {"id": "T3", "name": "Moist", "wins": 1, "playerStats": []},
+}
+for n in range(1, 4):
+    SHEETS[f"P{n}"] = {"id": f"P{n}", "name": f"Player {n}", "hits": n, "atBats": 4}
+
+
+class SheetSession:
+    def __init__(self):
+        self.requests = []
+
+    def get(self, url, params=None, headers=None):
+        ids = params["ids"].split(",")
+        self.requests.append(ids)
+        # Answer in reverse to check the requested order is restored.
+        return FakeResponse([SHEETS[i] for i in reversed(ids) if i in SHEETS])
+
+
+class AsyncAPI(BlaseballAPI):
+    async def _get(self, request, payload=None):
+        return super()._get(request, payload)
+
+
+def _api(**kwargs):
+    api = BlaseballAPI(limiter=False, **kwargs)
+    api.sess = SheetSession()
+    return api
+
+
+def test_flatten():
+    sheet = {"id": "x", "teamStats": {"homeRuns": 2}, "playerStats": ["a", "b"]}
+    assert flatten(sheet) == {
+        "id": "x",
+        "team_stats_home_runs": 2,
+        "player_stats": ("a", "b"),
+    }
+
+
+def test_load_chunks_and_keeps_order():
+    api = _api(chunk_size=2)
+    registry = MetricsRegistry()
+    api.add_hook(registry)
+    loader = StatsheetLoader(api, processes=0)
+    table = loader.players(["P3", "P1", "P3", "P2", "missing"], fields=("id", "hits"))
+    assert table.rows == [("P3", 3), ("P1", 1), ("P2", 2)]
+    assert sorted(api.sess.requests) == [["P2", "missing"], ["P3", "P1"]]
+    assert table.columns() == {"id": ("P3", "P1", "P2"), "hits": (3, 1, 2)}
+    (endpoint,) = registry.snapshot().values()
+    assert endpoint["cache"] == {"miss": 2}
+    assert "decode" not in endpoint
+
+
+def test_load_all_walks_games_teams_and_players():
+    with StatsheetLoader(_api(), processes=0) as loader:
+        tables = loader.load_all(["G1", "G2"])
+    assert tables["game"].column("home_team_stats") == ("T1", "T3")
+    assert tables["team"].column("id") == ("T1", "T3", "T2")
+    assert tables["team"].column("player_stats")[0] == ("P1", "P2")
+    players = tables["player"]
+    assert players.column("at_bats") == (4, 4, 4)
+    assert players.column("hits") == (1, 2, 3)
+    assert players.column("walks") == (None, None, None)
+
+
+def test_load_in_worker_processes():
+    with StatsheetLoader(_api(chunk_size=1), processes=2, decoder="json") as loader:
+        table = loader.teams(["T2", "T1"])
+        assert loader._pool is not None
+    assert loader._pool is None
+    assert table.column("name") == ("Pies", "Crabs")
+
+
+def test_load_empty_and_invalid():
+    loader = StatsheetLoader(_api(), processes=0)
+    assert loader.games([]).rows == []
+    assert loader.games([]).columns()["id"] == ()
+    with pytest.raises(ValueError):
+        loader.load("season", ["S1"])
+    with pytest.raises(ValueError):
+        StatsheetLoader(_api(), processes=-1)
+    with pytest.raises(ValueError):
+        StatsheetLoader(AsyncAPI())
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+import asyncio
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+import sseclient
+
+from blaser.blaseball_api import BlaseballAPI
+from blaser.stream import (
+    BLOCK,
+    COALESCE,
+    DROP_OLDEST,
+    AsyncSubscription,
+    BufferedStream,
+    DeltaStream,
+    StreamChange,
+    StreamHub,
+    diff_snapshots,
+)
+
+from . import GAME_ID, TEAM_ID
+
+
+def _snapshot(home_score=0, wins=10, day=1):
+    return {
+        "value": {
+            "games": {
+                "sim": {"day": day, "season": 7},
+                "schedule": [{"id": GAME_ID, "homeScore": home_score, "inning": 3}],
+            },
+            "leagues": {"teams": [{"id": TEAM_ID, "wins": wins, "losses": 4}]},
+        }
+    }
+
+
+def test_diff_snapshots_unchanged():
+    assert diff_snapshots(_snapshot(), _snapshot()) == []
+
+
+def test_diff_snapshots_game_updated():
+    changes = diff_snapshots(_snapshot(), _snapshot(home_score=2))
+    assert changes == [
+        StreamChange(
+            "update", ("value", "games", "schedule"), GAME_ID, {"homeScore": 2}
+        )
+    ]
+    assert changes[0].kind == "game"
+
+
+def test_diff_snapshots_team_record_and_sim():
+    changes = diff_snapshots(_snapshot(), _snapshot(wins=11, day=2))
+    kinds = {(c.kind, c.op) for c in changes}
+    assert kinds == {("day", "set"), ("team", "update")}
+
+
+def test_diff_snapshots_added_and_removed():
+    old = {"schedule": [{"id": "a"}, {"id": "b"}]}
+    new = {"schedule": [{"id": "b"}, {"id": "c"}]}
+    changes = diff_snapshots(old, new)
+    assert {(c.op, c.id) for c in changes} == {("add", "c"), ("remove", "a")}
+
+
+def test_delta_stream_skips_unchanged_events():
+    events = [_snapshot(), _snapshot(), _snapshot(home_score=1)]
+    stream = DeltaStream(iter(events))
+    batches = list(stream)
+    assert len(batches) == 2
+    assert batches[0][0].kind == "snapshot"
+    assert stream.snapshot == events[-1]
+
+
+def test_stream_data_delta():
+    api = BlaseballAPI()
+    api._sse = lambda request: iter([_snapshot(), _snapshot(day=2)])
+    batches = list(api.stream_data(delta=True))
+    assert batches[1] == [
+        StreamChange("set", ("value", "games", "sim", "day"), None, 2)
+    ]
+
+
+def test_stream_data_decodes_events(monkeypatch):
+    messages = [json.dumps(_snapshot()), "", json.dumps(_snapshot(day=2))]
+    monkeypatch.setattr(
+        sseclient,
+        "SSEClient",
+        lambda url, **kwargs: iter(SimpleNamespace(data=m) for m in messages),
+    )
+    events = list(BlaseballAPI().stream_data())
+    assert events == [_snapshot(), _snapshot(day=2)]
+
+
+def _message(event_id, event):
+    return SimpleNamespace(id=event_id, data=json.dumps(event))
+
+
+class FlakyUpstream:
+    """Sends two events, drops the connection, then resumes from Last-Event-ID."""
+
+    def __init__(self):
+        self.last_event_ids = []
+        self.start = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, last_event_id):
+        self.last_event_ids.append(last_event_id)
+        if last_event_id is None:
+            return self._first()
+        return self._resumed()
+
+    def _first(self):
+        self.start.wait(5)
+        yield _message("1", _snapshot())
+        yield _message("2", _snapshot(home_score=1))
+        raise ConnectionError("dropped")
+
+    def _resumed(self):
+        yield _message("3", _snapshot(home_score=2))
+        self.release.wait(5)
+
+
+def test_hub_fans_out_and_resumes():
+    upstream = FlakyUpstream()
+    hub = StreamHub(upstream, retry=0.01)
+    first, second = hub.subscribe(), hub.subscribe()
+    upstream.start.set()
+    received = [first.get(timeout=5) for _ in range(3)]
+    scores = [e["value"]["games"]["schedule"][0]["homeScore"] for e in received]
+    assert scores == [0, 1, 2]
+    assert [second.get(timeout=5) for _ in range(3)] == received
+    assert second.queue.empty()
+    assert hub.latest is received[2]
+    assert upstream.last_event_ids == [None, "2"]
+    assert (hub.events, hub.reconnects, hub.errors) == (3, 1, 1)
+
+    late = hub.subscribe()
+    assert late.get(timeout=5) is received[2]
+    first.close()
+    assert list(first) == []
+    hub.close()
+    upstream.release.set()
+    assert list(second) == []
+    assert list(late) == []
+
+
+def test_hub_async_subscription():
+    upstream = FlakyUpstream()
+    hub = StreamHub(upstream, retry=0.01)
+
+    async def run():
+        subscription = hub.subscribe_async()
+        upstream.start.set()
+        events = []
+        async for event in subscription:
+            events.append(event)
+            if len(events) == 3:
+                hub.close()
+        return events
+
+    events = asyncio.run(asyncio.wait_for(run(), 5))
+    upstream.release.set()
+    assert len(events) == 3
+
+
+def test_async_subscription_drops_oldest_for_slow_subscriber():
+    hub = StreamHub(FlakyUpstream())
+
+    async def run():
+        subscription = AsyncSubscription(hub, maxsize=2)
+        hub._subscribers.append(subscription)
+        for event in range(5):
+            subscription._deliver(event)
+        subscription.close()
+        await asyncio.sleep(0)
+        return [event async for event in subscription], subscription.dropped
+
+    assert asyncio.run(asyncio.wait_for(run(), 5)) == ([4], 4)
+    with pytest.raises(RuntimeError):
+        hub.subscribe_async()
+    with pytest.raises(ValueError):
+        AsyncSubscription(hub, maxsize=0)
+
+
+def test_stream_data_shared():
+    api = BlaseballAPI()
+    connections = []
+    start = threading.Event()
+
+    def messages(request, payload=None, last_event_id=None):
+        connections.append(request)
+        start.wait(5)
+        yield _message(None, _snapshot())
+        yield _message(None, _snapshot(day=2))
+        threading.Event().wait(5)
+
+    api._sse_messages = messages
+    snapshots = api.stream_data(shared=True)
+    deltas = iter(api.stream_data(delta=True, shared=True))
+    start.set()
+    assert next(snapshots) == _snapshot()
+    next(deltas)
+    assert next(deltas) == [
+        StreamChange("set", ("value", "games", "sim", "day"), None, 2)
+    ]
+    assert connections == ["database/streamData"]
+    api.stream_hub().close()
+
+
+class GatedSource:
+    """Sends one event, waits for it to be taken, then sends the rest at once."""
+
+    def __init__(self, count=6):
+        self.count = count
+        self.taken = threading.Event()
+        self.sent = threading.Event()
+
+    def __iter__(self):
+        yield 0
+        self.taken.wait(5)
+        yield from range(1, self.count)
+        self.sent.set()
+
+
+@pytest.mark.parametrize(
+    "policy,key,rest",
+    [
+        (DROP_OLDEST, None, [4, 5]),
+        (COALESCE, None, [5]),
+        (COALESCE, lambda event: event % 2, [5, 4]),
+    ],
+)
+def test_buffered_stream_policies(policy, key, rest):
+    source = GatedSource()
+    stream = BufferedStream(source, maxsize=2, policy=policy, key=key)
+    events = iter(stream)
+    assert next(events) == 0
+    source.taken.set()
+    assert source.sent.wait(5)
+    time.sleep(0.02)
+    assert stream.backlog == len(rest)
+    assert list(events) == rest
+    assert (stream.received, stream.delivered) == (6, 1 + len(rest))
+    assert stream.dropped == 5 - len(rest)
+    assert stream.max_lag >= 0.02
+
+
+def test_buffered_stream_coalesce_keeps_arrival_time():
+    def source():
+        yield 0
+        taken.wait(5)
+        yield 1
+        time.sleep(0.05)
+        yield 2
+        sent.set()
+
+    taken, sent = threading.Event(), threading.Event()
+    stream = BufferedStream(source(), maxsize=1, policy=COALESCE)
+    events = iter(stream)
+    assert next(events) == 0
+    taken.set()
+    assert sent.wait(5)
+    assert next(events) == 2
+    # The lag counts from when the superseded event arrived, not the newest one.
+    assert stream.lag >= 0.05
+    assert list(events) == []
+
+
+def test_buffered_stream_blocks_when_full():
+    source = GatedSource()
+    stream = BufferedStream(source, maxsize=2, policy=BLOCK)
+    events = iter(stream)
+    assert next(events) == 0
+    source.taken.set()
+    time.sleep(0.05)
+    # The reader holds one event it has no room for and waits.
+    assert (stream.backlog, stream.received) == (2, 4)
+    assert not source.sent.is_set()
+    assert list(events) == [1, 2, 3, 4, 5]
+    assert stream.dropped == 0
+
+
+def test_buffered_stream_errors_and_validation():
+    def failing():
+        yield 1
+        raise ConnectionError("dropped")
+
+    events = iter(BufferedStream(failing()))
+    assert next(events) == 1
+    with pytest.raises(ConnectionError):
+        next(events)
+    with pytest.raises(ValueError):
+        BufferedStream([], maxsize=0)
+    with pytest.raises(ValueError):
+        BufferedStream([], policy="latest")
+    with pytest.raises(ValueError):
+        BlaseballAPI().stream_data(buffer=-1)
+    with pytest.raises(ValueError):
+        BlaseballAPI().stream_data(buffer=4, policy="latest")
+
+
+def test_buffered_stream_async():
+    async def source():
+        for n in range(5):
+            yield n
+
+    async def run():
+        stream = BufferedStream(source(), maxsize=2, policy=DROP_OLDEST)
+        events = [event async for event in stream]
+        return stream, events
+
+    stream, events = asyncio.run(asyncio.wait_for(run(), 5))
+    assert events[-1] == 4
+    assert stream.received == 5
+    assert stream.dropped == 5 - len(events)
+
+
+def test_stream_data_buffered_delta():
+    api = BlaseballAPI()
+    api._sse = lambda request: iter([_snapshot(day=d) for d in range(1, 4)])
+    stream = api.stream_data(delta=True, buffer=1, policy=COALESCE)
+    assert isinstance(stream.messages, BufferedStream)
+    batches = list(stream)
+    assert stream.snapshot == _snapshot(day=3)
+    assert stream.messages.received == 3
+    assert len(batches) == stream.messages.delivered
+
+
+def test_stream_data_passes_key():
+    api = BlaseballAPI()
+    api._sse = lambda request: iter([{"n": n} for n in range(4)])
+
+    def key(event):
+        return event["n"] % 2
+
+    stream = api.stream_data(buffer=2, policy=COALESCE, key=key)
+    assert stream.key is key
+    # Whatever the reader coalesced, the latest odd event is always delivered last.
+    assert [event["n"] for event in stream][-1] == 3
+
+
+def test_stream_data_buffered_shared_unsubscribes():
+    api = BlaseballAPI()
+
+    def messages(request, payload=None, last_event_id=None):
+        yield _message(None, _snapshot())
+        threading.Event().wait(5)
+
+    api._sse_messages = messages
+    stream = api.stream_data(shared=True, buffer=4, policy=DROP_OLDEST)
+    events = iter(stream)
+    assert next(events) == _snapshot()
+    events.close()
+    assert api.stream_hub()._subscribers == []
+    api.stream_hub().close()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+import json
+
+import pytest
+
+from blaser.streamlog import StreamLog, StreamRecorder
+
+GAMES = ["game-a", "game-b"]
+
+
+def _event(scores):
+    schedule = [{"id": g, "homeScore": s} for g, s in zip(GAMES, scores)]
+    return {"value": {"games": {"sim": {"day": 1}, "schedule": schedule}}}
+
+
+EVENTS = [_event([0, 0]), _event([1, 0]), _event([1, 0]), _event([1, 2])]
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    path = str(tmp_path / "day.log")
+    with StreamRecorder(path) as recorder:
+        for second, event in enumerate(EVENTS):
+            recorder.append(event, timestamp=100.0 + second)
+    return path
+
+
+def test_replay_all(log_path):
+    with StreamLog(log_path) as log:
+        assert len(log) == 4
+        assert list(log.replay()) == [(100.0 + n, e) for n, e in enumerate(EVENTS)]
+        timestamp, raw = next(log.iter_raw())
+        assert json.loads(bytes(raw)) == EVENTS[0]
+
+
+def test_seek_by_timestamp(log_path):
+    with StreamLog(log_path, decoder="json") as log:
+        assert log.seek(101.5) == 2
+        assert [t for t, _ in log.replay(start=101.5)] == [102.0, 103.0]
+        assert [t for t, _ in log.replay(start=100.5, end=102)] == [101.0, 102.0]
+
+
+def test_replay_game_only_yields_changes(log_path):
+    with StreamLog(log_path) as log:
+        assert sorted(log.games) == GAMES
+        assert [(t, g["homeScore"]) for t, g in log.replay(game="game-a")] == [
+            (100.0, 0),
+            (101.0, 1),
+        ]
+        assert [t for t, _ in log.replay(game="game-b", start=101)] == [103.0]
+        assert list(log.replay(game="unknown")) == []
+
+
+def test_raw_events_and_reopening(log_path):
+    with StreamRecorder(log_path) as recorder:
+        assert recorder.count == 4
+        assert recorder.append(json.dumps(_event([5, 5])), timestamp=104.0) == 4
+    with StreamLog(log_path) as log:
+        assert len(log) == 5
+        assert log.event(4) == _event([5, 5])
+
+
+def test_truncated_tail_is_ignored(log_path):
+    with open(log_path, "r+b") as f:
+        f.truncate(f.seek(0, 2) - 3)
+    with StreamLog(log_path) as log:
+        assert len(log) == 3
+        assert log.event(2) == EVENTS[2]
+
+
+def test_empty_and_invalid_logs(tmp_path):
+    path = str(tmp_path / "empty.log")
+    StreamRecorder(path).close()
+    with StreamLog(path) as log:
+        assert len(log) == 0
+        assert list(log.replay()) == []
+    (tmp_path / "bad.log").write_bytes(b"not a log")
+    with pytest.raises(ValueError):
+        StreamLog(str(tmp_path / "bad.log"))
+
+
+def test_record_limit(tmp_path):
+    path = str(tmp_path / "limited.log")
+    with StreamRecorder(path) as recorder:
+        assert recorder.record(iter(EVENTS), limit=2) == 2
+    with StreamLog(path) as log:
+        assert [e for _, e in log.replay()] == EVENTS[:2]
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+import pytest
+import requests
+
+from blaser.blaseball_api import BlaseballAPI, BlaseballReferenceAPI
+from blaser.transport import (
+    ReplayMissError,
+    ReplayTransport,
+    RequestsTransport,
+    accept_encoding,
+)
+
+from . import FakeResponse, TEAM_ID
+
+TEAM = {"id": TEAM_ID, "fullName": "Hades Tigers"}
+
+
+class RecordingUpstream:
+    def __init__(self, data):
+        self.data = data
+        self.requests = []
+
+    def get(self, url, params=None, headers=None, stream=False):
+        self.requests.append((url, params, headers))
+        headers = {"ETag": '"v1"', "Content-Encoding": "gzip"}
+        return FakeResponse(self.data, headers=headers)
+
+
+def test_accept_encoding():
+    assert "gzip" in accept_encoding()
+    assert accept_encoding(False) == "identity"
+    assert accept_encoding("gzip, identity") == "gzip, identity"
+    with pytest.raises(ValueError):
+        accept_encoding("gzip, snappy")
+
+
+def test_requests_transport_pool():
+    transport = RequestsTransport(pool_size=32, keep_alive=False, compression="gzip")
+    adapter = transport.session.get_adapter("https://www.blaseball.com")
+    assert adapter._pool_maxsize == 32
+    assert transport.session.headers["Connection"] == "close"
+    assert transport.session.headers["Accept-Encoding"] == "gzip"
+    with pytest.raises(ValueError):
+        RequestsTransport(pool_size=0)
+
+
+def test_clients_share_a_transport():
+    transport = RequestsTransport()
+    main = BlaseballAPI(transport=transport)
+    reference = BlaseballReferenceAPI(transport=transport)
+    assert main.sess is reference.sess is transport
+    default = BlaseballAPI(max_workers=24).sess
+    assert default.session.get_adapter("https://x")._pool_maxsize == 24
+
+
+def test_record_then_replay(tmp_path):
+    upstream = RecordingUpstream(TEAM)
+    recorder = ReplayTransport(str(tmp_path), record=True, upstream=upstream)
+    api = BlaseballAPI(limiter=False, transport=recorder)
+    assert api.get_team_info(TEAM_ID) == TEAM
+    # The second request carries If-None-Match, which is not passed upstream.
+    assert api.get_team_info(TEAM_ID) == TEAM
+    assert len(upstream.requests) == 1
+    assert "If-None-Match" not in upstream.requests[0][2]
+
+    replay = ReplayTransport(str(tmp_path))
+    api = BlaseballAPI(limiter=False, transport=replay)
+    assert api.get_team_info(TEAM_ID) == TEAM
+    response = replay.get(f"{api.base_url}/database/team", {"id": TEAM_ID})
+    assert response.headers["etag"] == '"v1"'
+    assert "Content-Encoding" not in response.headers
+    assert response.elapsed.total_seconds() == 0
+    with pytest.raises(ReplayMissError):
+        api.get_team_info("another-team")
+
+
+def test_replay_errors_and_streams(tmp_path):
+    class FailingUpstream(RecordingUpstream):
+        def get(self, url, params=None, headers=None, stream=False):
+            return FakeResponse({"error": "nope"}, status_code=404)
+
+    recorder = ReplayTransport(str(tmp_path), record=True, upstream=FailingUpstream(0))
+    api = BlaseballReferenceAPI(limiter=False, transport=recorder)
+    with pytest.raises(requests.HTTPError):
+        api.get_game_events()
+
+    events = [{"id": 1}, {"id": 2}]
+    recorder.upstream = RecordingUpstream(events)
+    assert list(api.iter_raw_data(8)) == events
+    api.sess = ReplayTransport(str(tmp_path))
+    assert list(api.iter_raw_data(8)) == events
+    with pytest.raises(requests.HTTPError):
+        api.get_game_events()
+
+
+def test_httpx_transport():
+    httpx = pytest.importorskip("httpx")
+    from blaser.transport import HTTPXTransport
+
+    def handler(request):
+        assert request.url.params["id"] == TEAM_ID
+        return httpx.Response(200, json=TEAM)
+
+    transport = HTTPXTransport(http2=False)
+    transport.client = httpx.Client(transport=httpx.MockTransport(handler))
+    api = BlaseballAPI(limiter=False, transport=transport)
+    assert api.get_team_info(TEAM_ID) == TEAM
+    transport.close()